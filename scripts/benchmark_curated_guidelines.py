@@ -0,0 +1,414 @@
+"""Benchmarks for curated-guideline ingestion.
+
+Database benchmarks run inside a temporary PostgreSQL schema that is dropped
+afterwards, and use a deterministic fake embedder so no provider is called.
+"""
+import argparse
+import hashlib
+import json
+import statistics
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import psycopg
+from psycopg import sql
+
+from src.config.settings import Config
+from src.handlers.curated_guidelines import (
+    DEFAULT_PREWARM_TOPICS,
+    CuratedGuidelineStore,
+    DocumentMetadata,
+    DownloadedDocument,
+    PDF_EXTRACTION_WORKERS,
+    _copy_document_sections,
+    _document_section_rows,
+    _pack_sentence_units,
+    _sentence_units,
+    build_child_chunks,
+    extract_document_sections,
+    prewarm_guideline_corpus,
+)
+from tests.guideline_fixtures import reference_pack_sentence_units, synthetic_pdf
+
+
+class _HashEmbedder:
+    """Deterministic pseudo-embeddings derived from each text's SHA-256."""
+
+    model = "benchmark-embedding-v1"
+
+    def __init__(self, dimensions: int) -> None:
+        self.dimensions = dimensions
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            seed = hashlib.sha256(text.encode("utf-8")).digest()
+            vectors.append([
+                (seed[index % len(seed)] - 127.5 + index % 7) / 128.0
+                for index in range(self.dimensions)
+            ])
+        return vectors
+
+
+def _synthetic_document(index: int, sections: int) -> DownloadedDocument:
+    body = "".join(
+        f"<h2>Section {number}</h2><p>"
+        + " ".join(
+            f"Recommendation {number}.{sentence} of edition {index} covers blood "
+            f"pressure targets, metformin titration and follow-up interval {sentence}."
+            for sentence in range(12)
+        )
+        + "</p>"
+        for number in range(sections)
+    )
+    url = f"https://guidelines.example.org/benchmark/{index}"
+    return DownloadedDocument(
+        source_url=url,
+        final_url=url,
+        content_type="text/html",
+        content=f"<html><body>{body}</body></html>".encode("utf-8"),
+    )
+
+
+def _insert_document_sections(
+    connection: Any,
+    parent_rows: Sequence[Tuple[Any, ...]],
+    section_rows: Sequence[Tuple[Any, ...]],
+    posting_rows: Sequence[Tuple[Any, ...]],
+) -> None:
+    """Reference writer: one ``INSERT`` round trip per row."""
+    for row in parent_rows:
+        connection.execute(
+            """
+            INSERT INTO guideline_parent_sections (
+                parent_section_id, document_id, ordinal, heading,
+                section_path, section_level, content, content_hash,
+                token_count
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            row,
+        )
+    for row in section_rows:
+        connection.execute(
+            """
+            INSERT INTO guideline_sections (
+                section_id, document_id, ordinal, heading, content,
+                content_hash, embedding, parent_section_id, chunk_index,
+                section_path, token_count, previous_section_id,
+                next_section_id, lexical_length
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            """,
+            row,
+        )
+    for row in posting_rows:
+        connection.execute(
+            """
+            INSERT INTO guideline_lexical_postings (
+                term, section_id, term_frequency
+            ) VALUES (%s, %s, %s)
+            """,
+            row,
+        )
+
+
+def _time_writer(
+    store: CuratedGuidelineStore,
+    writer: Callable[..., None],
+    document_id: str,
+    rows: Tuple[Any, Any, Any],
+    repeats: int,
+) -> List[float]:
+    """Time ``writer`` inside a transaction that is always rolled back."""
+    timings = []
+    for _repeat in range(repeats):
+        with store.pool.connection() as connection:
+            connection.execute(
+                "SELECT 1 FROM guideline_documents WHERE document_id = %s FOR UPDATE",
+                (document_id,),
+            )
+            started = time.perf_counter()
+            writer(connection, *rows)
+            timings.append(time.perf_counter() - started)
+            connection.rollback()
+    return timings
+
+
+def _summary(timings: Sequence[float]) -> Dict[str, float]:
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+    }
+
+
+def benchmark_activation(
+    postgres_uri: str, sections: int, dimensions: int, repeats: int
+) -> Dict[str, Any]:
+    """Compare per-row ``INSERT`` with binary ``COPY`` for one activation."""
+    embedder = _HashEmbedder(dimensions)
+    store = CuratedGuidelineStore(
+        postgres_uri, vector_backend="array", vector_dimensions=dimensions
+    )
+    try:
+        metadata = DocumentMetadata(
+            title="Benchmark guideline",
+            publisher="Benchmark publisher",
+            publication_date="2026-01-01",
+            version="1",
+            effective_from="2026-01-01",
+        )
+        downloaded = _synthetic_document(0, sections)
+        document = store.add_pending_document(downloaded, metadata, embedder.model)
+        parents = extract_document_sections(
+            downloaded.content, downloaded.content_type
+        )
+        chunks = build_child_chunks(parents, document_title=metadata.title)
+        embeddings = embedder.embed([chunk.embedding_text for chunk in chunks])
+        rows = _document_section_rows(
+            document["document_id"], parents, chunks, embeddings
+        )
+        results: Dict[str, Any] = {
+            "parent_sections": len(rows[0]),
+            "sections": len(rows[1]),
+            "postings": len(rows[2]),
+            "dimensions": dimensions,
+            "lock_held_write": {
+                "insert": _summary(_time_writer(
+                    store, _insert_document_sections,
+                    document["document_id"], rows, repeats,
+                )),
+                "copy": _summary(_time_writer(
+                    store, _copy_document_sections,
+                    document["document_id"], rows, repeats,
+                )),
+            },
+        }
+
+        activations = []
+        for index in range(1, repeats + 1):
+            pending = store.add_pending_document(
+                _synthetic_document(index, sections), metadata, embedder.model
+            )
+            started = time.perf_counter()
+            store.approve(
+                pending["document_id"],
+                "benchmark",
+                pending["content_hash"],
+                embedder,
+            )
+            activations.append(time.perf_counter() - started)
+        results["approve_end_to_end"] = _summary(activations)
+        return results
+    finally:
+        store.close()
+
+
+def benchmark_pdf_extraction(
+    pages: int, workers: int, repeats: int
+) -> Dict[str, Any]:
+    """Compare serial and process-pool extraction of one synthetic PDF."""
+    content = synthetic_pdf(pages, outline_every=10)
+    results: Dict[str, Any] = {"pages": pages, "workers": workers}
+    reference = None
+    for label, pool_workers in (("serial", 1), ("parallel", workers)):
+        # The first parallel call also starts the pool; it is not timed.
+        sections = extract_document_sections(
+            content, "application/pdf", pdf_workers=pool_workers
+        )
+        if reference is None:
+            reference = sections
+        else:
+            results["matches_serial"] = sections == reference
+        timings = []
+        for _repeat in range(repeats):
+            started = time.perf_counter()
+            extract_document_sections(
+                content, "application/pdf", pdf_workers=pool_workers
+            )
+            timings.append(time.perf_counter() - started)
+        results[label] = _summary(timings)
+    results["sections"] = len(reference or [])
+    serial_ms = results["serial"]["median_ms"]
+    parallel_ms = results["parallel"]["median_ms"]
+    results["speedup"] = round(serial_ms / parallel_ms, 2) if parallel_ms else None
+    return results
+
+
+def benchmark_chunking(
+    sentences: int, max_tokens: int, overlap_tokens: int, repeats: int
+) -> Dict[str, Any]:
+    """Compare the reference and running-count packers on one long section."""
+    text = " ".join(
+        f"Recommendation {index} adjusts the dose after {index % 9 + 1} weeks, "
+        f"reviews renal function; and records adverse events."
+        for index in range(sentences)
+    )
+    units = _sentence_units(text, max_tokens)
+    texts = [unit for unit, _count in units]
+    results: Dict[str, Any] = {
+        "units": len(units),
+        "tokens": sum(count for _unit, count in units),
+    }
+    expected = reference_pack_sentence_units(texts, max_tokens, overlap_tokens)
+    results["matches_reference"] = (
+        _pack_sentence_units(units, max_tokens, overlap_tokens) == expected
+    )
+    results["chunks"] = len(expected)
+    for label, pack in (
+        ("reference", lambda: reference_pack_sentence_units(
+            texts, max_tokens, overlap_tokens
+        )),
+        ("running_count", lambda: _pack_sentence_units(
+            units, max_tokens, overlap_tokens
+        )),
+    ):
+        timings = []
+        for _repeat in range(repeats):
+            started = time.perf_counter()
+            pack()
+            timings.append(time.perf_counter() - started)
+        results[label] = _summary(timings)
+        results[f"{label}_tokens_per_second"] = round(
+            results["tokens"] / max(statistics.median(timings), 1e-9)
+        )
+    return results
+
+
+def benchmark_prewarm(
+    workers: int, latency_seconds: float, repeats: int
+) -> Dict[str, Any]:
+    """Time serial and parallel prewarm of the default topics.
+
+    The retriever sleeps for a per-topic latency between one and two times
+    ``latency_seconds``, standing in for discovery, download and embedding.
+    """
+    latencies = {
+        topic: latency_seconds * (1 + index / len(DEFAULT_PREWARM_TOPICS))
+        for index, topic in enumerate(DEFAULT_PREWARM_TOPICS)
+    }
+
+    def retriever(question: str, **_options: Any) -> Dict[str, Any]:
+        time.sleep(latencies[question])
+        return {
+            "status": "success",
+            "auto_ingest": {"status": "success", "ingested": [{}]},
+        }
+
+    results: Dict[str, Any] = {
+        "topics": len(latencies),
+        "slowest_topic_seconds": round(max(latencies.values()), 4),
+    }
+    for label, max_workers in (("serial", 1), ("parallel", workers)):
+        timings = []
+        for _repeat in range(repeats):
+            started = time.perf_counter()
+            prewarm_guideline_corpus(
+                DEFAULT_PREWARM_TOPICS,
+                {},
+                retriever=retriever,
+                max_workers=max_workers,
+            )
+            timings.append(time.perf_counter() - started)
+        results[label] = _summary(timings)
+    return results
+
+
+def _scratch_schema_uri(postgres_uri: str, schema: str) -> str:
+    separator = "&" if "?" in postgres_uri else "?"
+    return f"{postgres_uri}{separator}options=-csearch_path%3D{schema}"
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark curated-guideline ingestion in a scratch schema"
+    )
+    parser.add_argument(
+        "--postgres-uri",
+        help="Override POSTGRES_URI for this benchmark",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    activation = subparsers.add_parser(
+        "activation", help="Per-row INSERT versus binary COPY on approval"
+    )
+    activation.add_argument("--sections", type=int, default=200)
+    activation.add_argument("--dimensions", type=int, default=1536)
+    activation.add_argument("--repeats", type=int, default=5)
+
+    pdf = subparsers.add_parser(
+        "pdf-extraction", help="Serial versus process-pool PDF page extraction"
+    )
+    pdf.add_argument("--pages", type=int, default=300)
+    pdf.add_argument("--workers", type=int, default=PDF_EXTRACTION_WORKERS)
+    pdf.add_argument("--repeats", type=int, default=3)
+
+    chunking = subparsers.add_parser(
+        "chunking", help="Reference versus running-count sentence packing"
+    )
+    chunking.add_argument("--sentences", type=int, default=2000)
+    chunking.add_argument("--max-tokens", type=int, default=400)
+    chunking.add_argument("--overlap-tokens", type=int, default=50)
+    chunking.add_argument("--repeats", type=int, default=3)
+
+    prewarm = subparsers.add_parser(
+        "prewarm", help="Serial versus parallel prewarm with simulated latency"
+    )
+    prewarm.add_argument("--workers", type=int, default=10)
+    prewarm.add_argument("--latency", type=float, default=0.2)
+    prewarm.add_argument("--repeats", type=int, default=3)
+    return parser
+
+
+def main() -> int:
+    args = _build_parser().parse_args()
+    if args.command == "pdf-extraction":
+        print(json.dumps(benchmark_pdf_extraction(
+            max(1, args.pages), max(1, args.workers), max(1, args.repeats)
+        ), indent=2))
+        return 0
+    if args.command == "chunking":
+        print(json.dumps(benchmark_chunking(
+            max(1, args.sentences),
+            max(64, args.max_tokens),
+            max(0, args.overlap_tokens),
+            max(1, args.repeats),
+        ), indent=2))
+        return 0
+    if args.command == "prewarm":
+        print(json.dumps(benchmark_prewarm(
+            max(1, args.workers), max(0.0, args.latency), max(1, args.repeats)
+        ), indent=2))
+        return 0
+    postgres_uri = args.postgres_uri or Config().postgres_uri
+    schema = f"curated_guideline_benchmark_{uuid.uuid4().hex}"
+    try:
+        with psycopg.connect(postgres_uri, autocommit=True) as connection:
+            connection.execute(
+                sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(schema))
+            )
+    except psycopg.Error as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
+    try:
+        scratch_uri = _scratch_schema_uri(postgres_uri, schema)
+        if args.command == "activation":
+            result = benchmark_activation(
+                scratch_uri,
+                max(1, args.sections),
+                max(1, args.dimensions),
+                max(1, args.repeats),
+            )
+        print(json.dumps(result, indent=2))
+    finally:
+        with psycopg.connect(postgres_uri, autocommit=True) as connection:
+            connection.execute(
+                sql.SQL("DROP SCHEMA {} CASCADE").format(sql.Identifier(schema))
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
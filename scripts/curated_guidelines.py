@@ -2,7 +2,7 @@
 import argparse
 import json
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from psycopg import Error as PostgresError
 from psycopg_pool import PoolTimeout
@@ -17,8 +17,17 @@ from src.handlers.curated_guidelines import (
     OpenAIEmbedder,
     ingest_guideline,
     prewarm_guideline_corpus,
+    run_guideline_ingestion_worker,
 )
+from src.handlers.guideline_bulk_ingest import (
+    BULK_BATCH_DOCUMENTS,
+    BULK_EXTRACTION_WORKERS,
+    bulk_ingest_guidelines,
+    read_bulk_manifest,
+)
+from src.handlers.guideline_embedding_cache import CachingEmbedder
 from src.handlers.medical_guideline_search import search_medical_guidelines
+from src.handlers.medical_search_cache import POSTGRES_SEARCH_CACHE_BACKEND
 
 
 def _print(value: Any) -> None:
@@ -54,6 +63,56 @@ def _search_options(config: Config, actor_id: str) -> Dict[str, Any]:
     }
 
 
+def _search_cache_options(config: Config) -> Optional[Dict[str, Any]]:
+    if config.medical_search_cache_backend != POSTGRES_SEARCH_CACHE_BACKEND:
+        return None
+    return {"max_entries": config.medical_search_cache_max_entries}
+
+
+def _store_options(config: Config) -> Dict[str, Any]:
+    return {
+        "vector_backend": config.curated_vector_backend,
+        "vector_dimensions": config.curated_vector_dimensions,
+        "index_directory": config.curated_index_directory or None,
+        "vector_precision": config.curated_vector_precision,
+    }
+
+
+def _retrieval_options(
+    config: Config,
+    postgres_uri: str,
+    store: CuratedGuidelineStore,
+    actor_id: str,
+) -> Dict[str, Any]:
+    embedder = CachingEmbedder(
+        OpenAIEmbedder(
+            config.curated_embedding_endpoint,
+            config.github_token,
+            config.curated_embedding_model,
+        ),
+        store.pool,
+        ttl_seconds=config.curated_query_cache_ttl_seconds,
+        max_entries=config.curated_query_cache_max_entries,
+    )
+    return {
+        "postgres_uri": postgres_uri,
+        "endpoint": config.curated_embedding_endpoint,
+        "api_key": config.github_token,
+        "embedding_model": config.curated_embedding_model,
+        "tavily_api_key": config.tavily_api_key,
+        "top_k": config.curated_retrieval_top_k,
+        "min_score": config.curated_retrieval_min_score,
+        "retrieval_mode": config.curated_retrieval_mode,
+        "discovery_max_results": config.curated_discovery_max_results,
+        "auto_ingest_max_documents": config.curated_auto_ingest_max_documents,
+        "search_options": _search_options(config, actor_id),
+        "search_cache_options": _search_cache_options(config),
+        "search_guard_backend": config.medical_search_guard_backend,
+        "embedder": embedder,
+        "store": store,
+    }
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Manage the reviewed medical-guideline corpus"
@@ -79,6 +138,22 @@ def _build_parser() -> argparse.ArgumentParser:
         action="append",
         help="Custom de-identified topic; repeat for multiple topics",
     )
+    prewarm.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Topics to warm concurrently (default: 1)",
+    )
+
+    worker = subparsers.add_parser(
+        "worker",
+        help="Run queued corpus-miss ingestion jobs outside the chat path",
+    )
+    worker.add_argument(
+        "--once",
+        action="store_true",
+        help="Process every ready job, then exit instead of polling",
+    )
 
     ingest = subparsers.add_parser(
         "ingest", help="Download and hash a candidate as pending_review"
@@ -91,6 +166,30 @@ def _build_parser() -> argparse.ArgumentParser:
     ingest.add_argument("--effective-from", required=True)
     ingest.add_argument("--effective-until")
 
+    bulk = subparsers.add_parser(
+        "bulk-ingest",
+        help="Ingest and activate reviewed local files listed in a JSONL manifest",
+    )
+    bulk.add_argument("manifest")
+    bulk.add_argument(
+        "--documents-dir",
+        help="Directory the manifest paths are relative to (default: its own)",
+    )
+    bulk.add_argument("--reviewer", required=True)
+    bulk.add_argument(
+        "--workers",
+        type=int,
+        default=BULK_EXTRACTION_WORKERS,
+        help="Extraction processes (default: %(default)s)",
+    )
+    bulk.add_argument(
+        "--batch-documents",
+        type=int,
+        default=BULK_BATCH_DOCUMENTS,
+        help="Documents embedded and activated per transaction "
+        "(default: %(default)s)",
+    )
+
     list_parser = subparsers.add_parser("list", help="List corpus documents")
     list_parser.add_argument("--status")
 
@@ -134,33 +233,22 @@ def main() -> int:
             }
             _print(candidates)
         else:
-            store = CuratedGuidelineStore(postgres_uri)
+            store = CuratedGuidelineStore(postgres_uri, **_store_options(config))
         if args.command == "prewarm":
-            embedder = OpenAIEmbedder(
-                config.curated_embedding_endpoint,
-                config.github_token,
-                config.curated_embedding_model,
-            )
             _print(prewarm_guideline_corpus(
                 topics=args.topics or DEFAULT_PREWARM_TOPICS,
-                retrieval_options={
-                    "postgres_uri": postgres_uri,
-                    "endpoint": config.curated_embedding_endpoint,
-                    "api_key": config.github_token,
-                    "embedding_model": config.curated_embedding_model,
-                    "tavily_api_key": config.tavily_api_key,
-                    "top_k": config.curated_retrieval_top_k,
-                    "min_score": config.curated_retrieval_min_score,
-                    "discovery_max_results": config.curated_discovery_max_results,
-                    "auto_ingest_max_documents": (
-                        config.curated_auto_ingest_max_documents
-                    ),
-                    "search_options": _search_options(
-                        config, "curated-prewarm-admin"
-                    ),
-                    "embedder": embedder,
-                    "store": store,
-                },
+                retrieval_options=_retrieval_options(
+                    config, postgres_uri, store, "curated-prewarm-admin"
+                ),
+                max_workers=args.workers,
+            ))
+        elif args.command == "worker":
+            _print(run_guideline_ingestion_worker(
+                store,
+                _retrieval_options(
+                    config, postgres_uri, store, "curated-ingestion-worker"
+                ),
+                drain=args.once,
             ))
         elif args.command == "ingest":
             _print(ingest_guideline(
@@ -169,6 +257,22 @@ def main() -> int:
                 _metadata(args),
                 config.curated_embedding_model,
             ))
+        elif args.command == "bulk-ingest":
+            _print(bulk_ingest_guidelines(
+                store,
+                read_bulk_manifest(args.manifest, args.documents_dir),
+                OpenAIEmbedder(
+                    config.curated_embedding_endpoint,
+                    config.github_token,
+                    config.curated_embedding_model,
+                ),
+                args.reviewer,
+                workers=args.workers,
+                batch_documents=args.batch_documents,
+                progress=lambda report: print(
+                    json.dumps(report), file=sys.stderr, flush=True
+                ),
+            ))
         elif args.command == "list":
             _print(store.list_documents(args.status))
         elif args.command == "show":
@@ -198,6 +302,8 @@ def main() -> int:
     ) as error:
         print(f"Error: {error}", file=sys.stderr)
         return 2
+    except KeyboardInterrupt:
+        return 130
     finally:
         if store is not None:
             store.close()
@@ -50,6 +50,15 @@ class Config:
     medical_search_cache_ttl_seconds: int = int(
         os.getenv("MEDICAL_SEARCH_CACHE_TTL_SECONDS", "300")
     )
+    medical_search_cache_backend: str = os.getenv(
+        "MEDICAL_SEARCH_CACHE_BACKEND", "memory"
+    ).strip().lower()
+    medical_search_cache_max_entries: int = int(
+        os.getenv("MEDICAL_SEARCH_CACHE_MAX_ENTRIES", "10000")
+    )
+    medical_search_guard_backend: str = os.getenv(
+        "MEDICAL_SEARCH_GUARD_BACKEND", "memory"
+    ).strip().lower()
     medical_search_rate_limit_per_minute: int = int(
         os.getenv("MEDICAL_SEARCH_RATE_LIMIT_PER_MINUTE", "10")
     )
@@ -83,12 +92,36 @@ class Config:
     curated_auto_ingest_enabled: bool = os.getenv(
         "CURATED_AUTO_INGEST_ENABLED", "true"
     ).strip().lower() in {"1", "true", "yes", "on"}
+    curated_auto_ingest_mode: str = os.getenv(
+        "CURATED_AUTO_INGEST_MODE", "sync"
+    ).strip().lower()
     curated_discovery_max_results: int = int(
         os.getenv("CURATED_DISCOVERY_MAX_RESULTS", "5")
     )
     curated_auto_ingest_max_documents: int = int(
         os.getenv("CURATED_AUTO_INGEST_MAX_DOCUMENTS", "3")
     )
+    curated_vector_backend: str = os.getenv(
+        "CURATED_VECTOR_BACKEND", "array"
+    ).strip().lower()
+    curated_vector_dimensions: int = int(
+        os.getenv("CURATED_VECTOR_DIMENSIONS", "1536")
+    )
+    curated_index_directory: str = os.getenv(
+        "CURATED_INDEX_DIRECTORY", ""
+    ).strip()
+    curated_vector_precision: str = os.getenv(
+        "CURATED_VECTOR_PRECISION", "float32"
+    ).strip().lower()
+    curated_retrieval_mode: str = os.getenv(
+        "CURATED_RETRIEVAL_MODE", "vector"
+    ).strip().lower()
+    curated_query_cache_ttl_seconds: int = int(
+        os.getenv("CURATED_QUERY_CACHE_TTL_SECONDS", "604800")
+    )
+    curated_query_cache_max_entries: int = int(
+        os.getenv("CURATED_QUERY_CACHE_MAX_ENTRIES", "10000")
+    )
 
     _instance = None
 
@@ -137,6 +170,15 @@ class Config:
             self.medical_search_cache_ttl_seconds = int(
                 os.getenv("MEDICAL_SEARCH_CACHE_TTL_SECONDS", "300")
             )
+            self.medical_search_cache_backend = os.getenv(
+                "MEDICAL_SEARCH_CACHE_BACKEND", "memory"
+            ).strip().lower()
+            self.medical_search_cache_max_entries = int(
+                os.getenv("MEDICAL_SEARCH_CACHE_MAX_ENTRIES", "10000")
+            )
+            self.medical_search_guard_backend = os.getenv(
+                "MEDICAL_SEARCH_GUARD_BACKEND", "memory"
+            ).strip().lower()
             self.medical_search_rate_limit_per_minute = int(
                 os.getenv("MEDICAL_SEARCH_RATE_LIMIT_PER_MINUTE", "10")
             )
@@ -171,12 +213,36 @@ class Config:
             self.curated_auto_ingest_enabled = os.getenv(
                 "CURATED_AUTO_INGEST_ENABLED", "true"
             ).strip().lower() in {"1", "true", "yes", "on"}
+            self.curated_auto_ingest_mode = os.getenv(
+                "CURATED_AUTO_INGEST_MODE", "sync"
+            ).strip().lower()
             self.curated_discovery_max_results = int(
                 os.getenv("CURATED_DISCOVERY_MAX_RESULTS", "5")
             )
             self.curated_auto_ingest_max_documents = int(
                 os.getenv("CURATED_AUTO_INGEST_MAX_DOCUMENTS", "3")
             )
+            self.curated_vector_backend = os.getenv(
+                "CURATED_VECTOR_BACKEND", "array"
+            ).strip().lower()
+            self.curated_vector_dimensions = int(
+                os.getenv("CURATED_VECTOR_DIMENSIONS", "1536")
+            )
+            self.curated_index_directory = os.getenv(
+                "CURATED_INDEX_DIRECTORY", ""
+            ).strip()
+            self.curated_vector_precision = os.getenv(
+                "CURATED_VECTOR_PRECISION", "float32"
+            ).strip().lower()
+            self.curated_retrieval_mode = os.getenv(
+                "CURATED_RETRIEVAL_MODE", "vector"
+            ).strip().lower()
+            self.curated_query_cache_ttl_seconds = int(
+                os.getenv("CURATED_QUERY_CACHE_TTL_SECONDS", "604800")
+            )
+            self.curated_query_cache_max_entries = int(
+                os.getenv("CURATED_QUERY_CACHE_MAX_ENTRIES", "10000")
+            )
             self._initialized = True
 
     def validate(self) -> None:
@@ -232,6 +298,40 @@ class Config:
                 "CURATED_AUTO_INGEST_MAX_DOCUMENTS cannot exceed "
                 "CURATED_DISCOVERY_MAX_RESULTS"
             )
+        if self.curated_auto_ingest_mode not in {"sync", "queue"}:
+            raise ValueError(
+                "CURATED_AUTO_INGEST_MODE must be 'sync' or 'queue'"
+            )
+        if self.medical_search_cache_backend not in {"memory", "postgres"}:
+            raise ValueError(
+                "MEDICAL_SEARCH_CACHE_BACKEND must be 'memory' or 'postgres'"
+            )
+        if self.medical_search_cache_max_entries < 1:
+            raise ValueError("MEDICAL_SEARCH_CACHE_MAX_ENTRIES must be positive")
+        if self.medical_search_guard_backend not in {"memory", "postgres"}:
+            raise ValueError(
+                "MEDICAL_SEARCH_GUARD_BACKEND must be 'memory' or 'postgres'"
+            )
+        if self.curated_vector_backend not in {"array", "pgvector"}:
+            raise ValueError(
+                "CURATED_VECTOR_BACKEND must be 'array' or 'pgvector'"
+            )
+        if not 1 <= self.curated_vector_dimensions <= 2000:
+            raise ValueError(
+                "CURATED_VECTOR_DIMENSIONS must be between 1 and 2000"
+            )
+        if self.curated_vector_precision not in {"float32", "float16", "int8"}:
+            raise ValueError(
+                "CURATED_VECTOR_PRECISION must be 'float32', 'float16' or 'int8'"
+            )
+        if self.curated_retrieval_mode not in {"vector", "hybrid"}:
+            raise ValueError(
+                "CURATED_RETRIEVAL_MODE must be 'vector' or 'hybrid'"
+            )
+        if self.curated_query_cache_ttl_seconds < 0:
+            raise ValueError("CURATED_QUERY_CACHE_TTL_SECONDS cannot be negative")
+        if self.curated_query_cache_max_entries < 1:
+            raise ValueError("CURATED_QUERY_CACHE_MAX_ENTRIES must be positive")
 
 
 # Configure LangSmith only when explicitly enabled. Forcing tracing on can send
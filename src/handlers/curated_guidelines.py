@@ -9,16 +9,39 @@ deterministic: the model never rewrites a guideline claim.
 import atexit
 import hashlib
 import hmac
-import ipaddress
 import math
+import multiprocessing
+import os
 import re
-import socket
-from dataclasses import dataclass
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
 from datetime import date, datetime, timezone
 from functools import lru_cache
 from html.parser import HTMLParser
 from io import BytesIO
-from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from threading import Event, Lock
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlparse
 from urllib.request import HTTPRedirectHandler, Request, build_opener
@@ -28,6 +51,37 @@ from psycopg import IntegrityError
 from psycopg.rows import dict_row
 from psycopg_pool import ConnectionPool, PoolTimeout
 
+import numpy as np
+
+from src.handlers.guideline_embedding_cache import CachingEmbedder
+from src.handlers.guideline_ingestion_queue import (
+    INGESTION_JOB_LEASE_SECONDS,
+    INGESTION_JOB_MAX_ATTEMPTS,
+    INGESTION_JOB_RETRY_DELAY_SECONDS,
+    INGESTION_WORKER_POLL_SECONDS,
+    claim_ingestion_job,
+    enqueue_ingestion_job,
+    finish_ingestion_job,
+    ingestion_topic_hash,
+)
+from src.handlers.guideline_lexical_index import (
+    MIN_LEXICAL_COVERAGE,
+    bm25_ranking,
+    first_per_group,
+    query_terms,
+    reciprocal_rank_fusion,
+    term_frequencies,
+)
+from src.handlers.guideline_vector_index import (
+    FLOAT32_PRECISION,
+    VECTOR_PRECISIONS,
+    CorpusSnapshot,
+    EmbeddingMatrix,
+    cosine_similarity,
+    read_index_bundle,
+    select_top_matches,
+    write_index_bundle,
+)
 from src.handlers.medical_guideline_search import (
     SENSITIVE_SEARCH_REFUSAL,
     contains_sensitive_patient_data,
@@ -35,17 +89,64 @@ from src.handlers.medical_guideline_search import (
     resolve_approved_final_url,
     search_medical_guidelines,
 )
+from src.handlers.medical_search_cache import get_shared_search_cache
+from src.handlers.medical_search_guard import (
+    MEMORY_SEARCH_GUARD_BACKEND,
+    POSTGRES_SEARCH_GUARD_BACKEND,
+    SEARCH_GUARD_BACKENDS,
+    get_shared_provider_guard,
+)
 from src.handlers.security_guardrails import audit_event
+from src.helpers.host_resolution import host_has_only_public_addresses
+from src.helpers.single_flight import SingleFlight
 from src.helpers.logging_config import logger
 
 
 MAX_DOCUMENT_BYTES = 10_000_000
+# PDFs with at least this many pages are extracted in page ranges across a
+# process pool; smaller ones are not worth the inter-process transfer.
+PDF_PARALLEL_MIN_PAGES = 16
+PDF_EXTRACTION_WORKERS = min(4, os.cpu_count() or 1)
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# Streamed bodies above this size spill from memory to a temporary file.
+DOWNLOAD_SPOOL_MEMORY_BYTES = 1_000_000
 MAX_SECTIONS_PER_DOCUMENT = 1000
 MAX_PREWARM_TOPICS = 20
 DEFAULT_CHUNK_MAX_TOKENS = 400
 DEFAULT_CHUNK_OVERLAP_TOKENS = 50
 DEFAULT_PARENT_CONTEXT_MAX_TOKENS = 1200
 DEFAULT_NEIGHBOR_WINDOW = 1
+TOKEN_COUNT_CACHE_ENTRIES = 8192
+# Texts encoded per call before tiktoken's threaded batch path pays off.
+TOKENIZER_BATCH_MIN_TEXTS = 16
+TOKENIZER_THREADS = 4
+# Provider request bounds for document embedding batches.
+EMBEDDING_BATCH_MAX_ITEMS = 64
+EMBEDDING_BATCH_MAX_TOKENS = 16_000
+EMBEDDING_MAX_WORKERS = 4
+EMBEDDING_MAX_RETRIES = 2
+EMBEDDING_MAX_RETRY_DELAY_SECONDS = 2.0
+ARRAY_VECTOR_BACKEND = "array"
+PGVECTOR_BACKEND = "pgvector"
+VECTOR_BACKENDS = (ARRAY_VECTOR_BACKEND, PGVECTOR_BACKEND)
+DEFAULT_VECTOR_DIMENSIONS = 1536
+MAX_PGVECTOR_INDEX_DIMENSIONS = 2000
+PGVECTOR_CANDIDATES_PER_RESULT = 10
+PGVECTOR_MIN_EF_SEARCH = 100
+VECTOR_RETRIEVAL_MODE = "vector"
+HYBRID_RETRIEVAL_MODE = "hybrid"
+RETRIEVAL_MODES = (VECTOR_RETRIEVAL_MODE, HYBRID_RETRIEVAL_MODE)
+SYNC_AUTO_INGEST_MODE = "sync"
+QUEUE_AUTO_INGEST_MODE = "queue"
+AUTO_INGEST_MODES = (SYNC_AUTO_INGEST_MODE, QUEUE_AUTO_INGEST_MODE)
+# Discovery outcomes that say nothing about the topic itself; prewarm stops on
+# them and the ingestion worker retries them later.
+TRANSIENT_INGESTION_STATUSES = frozenset({
+    "unavailable", "rate_limited", "budget_exhausted", "circuit_open"
+})
+# Each ranking contributes this many candidates per requested result to
+# reciprocal-rank fusion.
+FUSION_DEPTH_PER_RESULT = 4
 TRUSTED_OFFICIAL_STATUS = "trusted_official"
 INTERNAL_APPROVED_STATUS = "approved"
 TRUSTED_OFFICIAL_ACTOR = "system:trusted-official-policy-v1"
@@ -71,6 +172,10 @@ CURATED_NO_RESULT = (
     "Không tìm thấy section đủ liên quan trong các hướng dẫn đang được phép "
     "sử dụng. Vui lòng hỏi cụ thể hơn hoặc kiểm tra tài liệu nguồn."
 )
+CURATED_INDEXING_IN_PROGRESS = (
+    "Chưa có section phù hợp trong kho hướng dẫn. Chủ đề này đang được lập chỉ "
+    "mục từ nguồn chính thức ở nền; vui lòng hỏi lại sau ít phút."
+)
 SOURCE_DIFFERENCE_WARNING = (
     "Các section được hiển thị riêng theo thứ tự relevance; hệ thống không tự "
     "giải quyết khác biệt giữa các guideline."
@@ -104,16 +209,48 @@ class _NoRedirectHandler(HTTPRedirectHandler):
 
 
 _DOWNLOAD_OPENER = build_opener(_NoRedirectHandler())
+_AUTO_INGEST_FLIGHTS = SingleFlight()
 
 
 @dataclass(frozen=True)
 class DownloadedDocument:
-    """Bounded content downloaded from a validated final URL."""
+    """Bounded content downloaded from a validated final URL.
+
+    Streaming downloads leave ``content`` empty and keep the body in a spooled
+    temporary ``body`` with the ``content_hash`` and ``size`` computed while
+    reading; in-memory documents only set ``content``.
+    """
 
     source_url: str
     final_url: str
     content_type: str
-    content: bytes
+    content: bytes = b""
+    body: Optional[IO[bytes]] = field(default=None, compare=False, repr=False)
+    content_hash: str = ""
+    size: int = 0
+
+    def sha256(self) -> str:
+        return self.content_hash or hashlib.sha256(self.content).hexdigest()
+
+    def iter_chunks(self, chunk_size: int = DOWNLOAD_CHUNK_BYTES) -> Iterator[bytes]:
+        """Yield the body in order without materializing a spooled file."""
+        if self.body is None:
+            for start in range(0, len(self.content), chunk_size):
+                yield self.content[start:start + chunk_size]
+            return
+        self.body.seek(0)
+        while True:
+            chunk = self.body.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def read_content(self) -> bytes:
+        return b"".join(self.iter_chunks()) if self.body is not None else self.content
+
+    def close(self) -> None:
+        if self.body is not None:
+            self.body.close()
 
 
 @dataclass(frozen=True)
@@ -151,10 +288,35 @@ class GuidelineChunk:
     token_count: int
 
 
+@dataclass(frozen=True)
+class PreparedDocument:
+    """A pending document whose sections were extracted ahead of activation."""
+
+    document_id: str
+    content_hash: str
+    parents: Tuple[ExtractedSection, ...]
+    chunks: Tuple[GuidelineChunk, ...]
+
+
 class OpenAIEmbedder:
-    """Minimal batched embedding adapter using the repository's OpenAI client."""
+    """Token-aware, concurrent embedding adapter using the OpenAI client.
 
-    def __init__(self, endpoint: str, api_key: str, model: str):
+    Texts are split into consecutive batches bounded by item count and total
+    tokens, sent through a small thread pool, retried per batch on rate limits
+    and transient failures, and reassembled in input order.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        api_key: str,
+        model: str,
+        max_workers: int = EMBEDDING_MAX_WORKERS,
+        batch_max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+        max_retry_delay_seconds: float = EMBEDDING_MAX_RETRY_DELAY_SECONDS,
+        sleeper: Callable[[float], None] = time.sleep,
+    ):
         if not api_key:
             raise ValueError("Embedding API key is not configured")
         try:
@@ -162,47 +324,136 @@ class OpenAIEmbedder:
         except ImportError as error:
             raise EmbeddingProviderError("OpenAI dependency is unavailable") from error
         self.model = model
-        self.client = OpenAI(base_url=endpoint, api_key=api_key)
+        # Retries are owned here, per batch, instead of inside the SDK.
+        self.client = OpenAI(base_url=endpoint, api_key=api_key, max_retries=0)
+        self.max_workers = max(1, int(max_workers))
+        self.batch_max_tokens = max(1, int(batch_max_tokens))
+        self.max_retries = max(0, int(max_retries))
+        self.max_retry_delay_seconds = max(0.0, float(max_retry_delay_seconds))
+        self.sleeper = sleeper
 
     def embed(self, texts: Sequence[str]) -> List[List[float]]:
         if not texts:
             return []
-        vectors: List[List[float]] = []
-        for start in range(0, len(texts), 64):
+        texts = list(texts)
+        batches = _embedding_batches(
+            texts, EMBEDDING_BATCH_MAX_ITEMS, self.batch_max_tokens
+        )
+        workers = min(self.max_workers, len(batches))
+        if workers <= 1:
+            results = [self._embed_batch(texts[start:end]) for start, end in batches]
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="guideline-embed"
+            )
+            try:
+                futures = [
+                    executor.submit(self._embed_batch, texts[start:end])
+                    for start, end in batches
+                ]
+                results = [future.result() for future in futures]
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+        vectors = [vector for batch in results for vector in batch]
+        if len(vectors) != len(texts):
+            raise EmbeddingProviderError(
+                "Embedding provider returned an incomplete batch"
+            )
+        return vectors
+
+    def _embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
             try:
                 response = self.client.embeddings.create(
                     model=self.model,
-                    input=list(texts[start:start + 64]),
+                    input=list(texts),
                 )
             except Exception as error:  # provider SDK exposes versioned exceptions
-                raise EmbeddingProviderError("Embedding request failed") from error
-            vectors.extend(
+                status = getattr(error, "status_code", None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt >= self.max_retries:
+                    raise EmbeddingProviderError("Embedding request failed") from error
+                self.sleeper(min(self.max_retry_delay_seconds, 0.25 * (2 ** attempt)))
+                continue
+            vectors = [
                 list(item.embedding)
                 for item in sorted(response.data, key=lambda item: item.index)
-            )
-        if len(vectors) != len(texts):
-            raise EmbeddingProviderError(
-                "Embedding provider returned an incomplete batch"
-            )
-        return vectors
+            ]
+            if len(vectors) != len(texts):
+                raise EmbeddingProviderError(
+                    "Embedding provider returned an incomplete batch"
+                )
+            return vectors
+        raise EmbeddingProviderError("Embedding retry loop ended unexpectedly")
+
+
+def _embedding_batches(
+    texts: Sequence[str], max_items: int, max_tokens: int
+) -> List[Tuple[int, int]]:
+    """Split texts into consecutive ``(start, end)`` ranges within both budgets.
+
+    A single text above the token budget still gets its own batch so the
+    provider, not this adapter, decides whether it is too long.
+    """
+    batches: List[Tuple[int, int]] = []
+    start = 0
+    tokens = 0
+    for index, (text, count) in enumerate(zip(texts, _count_tokens_batch(texts))):
+        if index > start and (
+            index - start >= max_items or tokens + count > max_tokens
+        ):
+            batches.append((start, index))
+            start = index
+            tokens = 0
+        tokens += count
+    batches.append((start, len(texts)))
+    return batches
 
 
 class CuratedGuidelineStore:
     """PostgreSQL catalog containing immutable versions and embeddings.
 
-    Embeddings remain ordinary PostgreSQL arrays and are ranked in Python. This
-    keeps the current small-corpus behavior while removing the single-host
-    SQLite dependency; pgvector can be added later without changing callers.
+    Embeddings remain ordinary PostgreSQL arrays, which stay the source of
+    truth. The default ``array`` backend ranks them in process with a
+    normalized float32 matrix per embedding model, cached as a corpus snapshot
+    until a write path bumps the corpus generation. With ``index_directory``
+    that snapshot is also published as a memory-mapped bundle so every worker
+    process on the host shares one copy of the vectors, and
+    ``vector_precision`` can store that matrix as float16 or int8 because the
+    exact re-rank still decides every result. The opt-in ``pgvector``
+    backend mirrors them into a ``vector`` column with an HNSW index so the
+    candidate window, effective-date filter and ``LIMIT`` run in SQL; callers
+    see the same result shape in both modes.
     """
 
     def __init__(
         self,
         postgres_uri: str,
         pool: Optional[ConnectionPool] = None,
+        vector_backend: str = ARRAY_VECTOR_BACKEND,
+        vector_dimensions: int = DEFAULT_VECTOR_DIMENSIONS,
+        index_directory: Optional[str] = None,
+        vector_precision: str = FLOAT32_PRECISION,
     ) -> None:
         if not postgres_uri and pool is None:
             raise ValueError("PostgreSQL URI is required")
+        if vector_backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unsupported vector backend: {vector_backend}")
+        if vector_precision not in VECTOR_PRECISIONS:
+            raise ValueError(f"Unsupported vector precision: {vector_precision}")
+        if not 1 <= int(vector_dimensions) <= MAX_PGVECTOR_INDEX_DIMENSIONS:
+            raise ValueError(
+                "Vector dimensions must be between 1 and "
+                f"{MAX_PGVECTOR_INDEX_DIMENSIONS}"
+            )
+        self.vector_backend = vector_backend
+        self.vector_dimensions = int(vector_dimensions)
+        self.index_directory = index_directory or None
+        self.vector_precision = vector_precision
+        self._has_vector_column = False
         self._owns_pool = pool is None
+        self._snapshot_lock = Lock()
+        self._snapshots: Dict[str, CorpusSnapshot] = {}
         self.pool = pool or ConnectionPool(
             conninfo=postgres_uri,
             min_size=1,
@@ -243,7 +494,6 @@ class CuratedGuidelineStore:
                     effective_status TEXT NOT NULL,
                     content_type TEXT NOT NULL,
                     content_hash TEXT NOT NULL,
-                    raw_content BYTEA NOT NULL,
                     embedding_model TEXT NOT NULL,
                     downloaded_at TIMESTAMPTZ NOT NULL,
                     reviewed_at TIMESTAMPTZ,
@@ -251,6 +501,22 @@ class CuratedGuidelineStore:
                     UNIQUE(source_url, version)
                 )
             """,
+            """
+                ALTER TABLE guideline_documents
+                ADD COLUMN IF NOT EXISTS section_count INTEGER
+            """,
+            """
+                ALTER TABLE guideline_documents
+                ADD COLUMN IF NOT EXISTS parent_section_count INTEGER
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS guideline_document_blobs (
+                    document_id TEXT PRIMARY KEY
+                        REFERENCES guideline_documents(document_id)
+                        ON DELETE CASCADE,
+                    content BYTEA NOT NULL
+                )
+            """,
             """
                 CREATE TABLE IF NOT EXISTS guideline_parent_sections (
                     parent_section_id TEXT PRIMARY KEY,
@@ -316,10 +582,179 @@ class CuratedGuidelineStore:
                 CREATE INDEX IF NOT EXISTS idx_guideline_child_position
                 ON guideline_sections(parent_section_id, chunk_index)
             """,
+            """
+                ALTER TABLE guideline_sections
+                ADD COLUMN IF NOT EXISTS lexical_length INTEGER
+            """,
+            """
+                ALTER TABLE guideline_parent_sections
+                ADD COLUMN IF NOT EXISTS token_count INTEGER
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS guideline_lexical_postings (
+                    term TEXT NOT NULL,
+                    section_id TEXT NOT NULL
+                        REFERENCES guideline_sections(section_id)
+                        ON DELETE CASCADE,
+                    term_frequency INTEGER NOT NULL,
+                    PRIMARY KEY(term, section_id)
+                )
+            """,
+            """
+                CREATE INDEX IF NOT EXISTS idx_guideline_postings_section
+                ON guideline_lexical_postings(section_id)
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS guideline_query_embeddings (
+                    embedding_model TEXT NOT NULL,
+                    query_hash TEXT NOT NULL,
+                    embedding DOUBLE PRECISION[] NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL,
+                    expires_at TIMESTAMPTZ NOT NULL,
+                    PRIMARY KEY(embedding_model, query_hash)
+                )
+            """,
+            """
+                CREATE INDEX IF NOT EXISTS idx_guideline_query_embeddings_expires
+                ON guideline_query_embeddings(expires_at)
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS guideline_chunk_embeddings (
+                    embedding_model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    embedding DOUBLE PRECISION[] NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL,
+                    PRIMARY KEY(embedding_model, text_hash)
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS guideline_ingestion_jobs (
+                    topic_hash TEXT PRIMARY KEY,
+                    topic TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    available_at TIMESTAMPTZ NOT NULL,
+                    lease_expires_at TIMESTAMPTZ,
+                    enqueued_at TIMESTAMPTZ NOT NULL,
+                    finished_at TIMESTAMPTZ,
+                    result_status TEXT,
+                    documents_ingested INTEGER NOT NULL
+                )
+            """,
+            """
+                CREATE INDEX IF NOT EXISTS idx_guideline_ingestion_jobs_ready
+                ON guideline_ingestion_jobs(status, available_at)
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS medical_search_results (
+                    cache_key TEXT PRIMARY KEY,
+                    result JSONB NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL,
+                    expires_at TIMESTAMPTZ NOT NULL
+                )
+            """,
+            """
+                CREATE INDEX IF NOT EXISTS idx_medical_search_results_expires
+                ON medical_search_results(expires_at)
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS medical_search_rate_limits (
+                    actor_hash TEXT PRIMARY KEY,
+                    tokens DOUBLE PRECISION NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS medical_search_budget (
+                    utc_day DATE PRIMARY KEY,
+                    used INTEGER NOT NULL
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS medical_search_circuit (
+                    id SMALLINT PRIMARY KEY CHECK (id = 1),
+                    failures INTEGER NOT NULL,
+                    open_until TIMESTAMPTZ
+                )
+            """,
+            """
+                INSERT INTO medical_search_circuit (id, failures, open_until)
+                VALUES (1, 0, NULL) ON CONFLICT (id) DO NOTHING
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS guideline_corpus_state (
+                    id SMALLINT PRIMARY KEY CHECK (id = 1),
+                    generation BIGINT NOT NULL
+                )
+            """,
+            """
+                INSERT INTO guideline_corpus_state (id, generation)
+                VALUES (1, 0) ON CONFLICT (id) DO NOTHING
+            """,
         )
         with self.pool.connection() as connection:
             for statement in statements:
                 connection.execute(statement)
+            _prefer_lz4_blob_compression(connection)
+            _migrate_inline_raw_content(connection)
+            _backfill_document_counts(connection)
+            _index_lexical_terms(
+                connection,
+                [
+                    (row["section_id"], row["content"])
+                    for row in connection.execute(
+                        """
+                        SELECT section_id, content FROM guideline_sections
+                        WHERE lexical_length IS NULL
+                        """
+                    )
+                ],
+            )
+            _backfill_parent_token_counts(connection)
+            if self.vector_backend == PGVECTOR_BACKEND:
+                self._initialize_pgvector(connection)
+            self._has_vector_column = connection.execute(
+                """
+                SELECT 1 FROM pg_attribute
+                WHERE attrelid = 'guideline_sections'::regclass
+                  AND attname = 'embedding_vector' AND NOT attisdropped
+                """
+            ).fetchone() is not None
+
+    def _initialize_pgvector(self, connection: Any) -> None:
+        """Mirror array embeddings into an HNSW-indexed ``vector`` column.
+
+        The untyped column accepts any dimension; the partial expression index
+        covers the configured dimension. Backfilling only fills missing mirror
+        values and never rewrites the approved array embedding.
+        """
+        dimensions = self.vector_dimensions
+        connection.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        connection.execute(
+            """
+            ALTER TABLE guideline_sections
+            ADD COLUMN IF NOT EXISTS embedding_vector vector
+            """
+        )
+        connection.execute(
+            """
+            UPDATE guideline_sections SET embedding_vector = embedding::vector
+            WHERE embedding_vector IS NULL
+              AND cardinality(embedding) > 0
+              AND NOT (
+                  embedding && ARRAY['NaN', 'Infinity', '-Infinity']
+                      ::DOUBLE PRECISION[]
+              )
+            """
+        )
+        connection.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_guideline_sections_hnsw_{dimensions}
+            ON guideline_sections
+            USING hnsw ((embedding_vector::vector({dimensions})) vector_cosine_ops)
+            WHERE vector_dims(embedding_vector) = {dimensions}
+            """
+        )
 
     def add_pending_document(
         self,
@@ -333,27 +768,18 @@ class CuratedGuidelineStore:
         if not embedding_model.strip():
             raise GuidelineIngestionError("Embedding model is required")
 
-        content_hash = hashlib.sha256(downloaded.content).hexdigest()
-        identity = f"{downloaded.source_url}|{metadata.version}|{content_hash}"
-        document_id = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+        content_hash = downloaded.sha256()
+        document_id = guideline_document_id(
+            downloaded.source_url, metadata.version, content_hash
+        )
         timestamp = (downloaded_at or datetime.now(timezone.utc)).astimezone(
             timezone.utc
         )
 
         try:
             with self.pool.connection() as connection:
-                connection.execute(
-                    """
-                    INSERT INTO guideline_documents (
-                        document_id, source_url, final_url, title, publisher,
-                        publication_date, version, effective_from, effective_until,
-                        review_status, effective_status, content_type, content_hash,
-                        raw_content, embedding_model, downloaded_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                    """,
+                _copy_pending_document(
+                    connection,
                     (
                         document_id,
                         downloaded.source_url,
@@ -368,10 +794,10 @@ class CuratedGuidelineStore:
                         "pending",
                         downloaded.content_type,
                         content_hash,
-                        downloaded.content,
                         embedding_model,
-                        timestamp,
+                        timestamp.isoformat(),
                     ),
+                    downloaded.iter_chunks(),
                 )
         except IntegrityError as error:
             raise GuidelineIngestionError(
@@ -463,7 +889,10 @@ class CuratedGuidelineStore:
             raise GuidelineIngestionError("Unsupported trusted review status")
         with self.pool.connection() as connection:
             row = connection.execute(
-                "SELECT * FROM guideline_documents WHERE document_id = %s",
+                f"""
+                SELECT {_DOCUMENT_COLUMNS} FROM guideline_documents
+                WHERE document_id = %s
+                """,
                 (document_id,),
             ).fetchone()
         if row is None:
@@ -480,7 +909,7 @@ class CuratedGuidelineStore:
             )
 
         parents = extract_document_sections(
-            bytes(row["raw_content"]), row["content_type"]
+            self._raw_content(document_id), row["content_type"]
         )
         chunks = build_child_chunks(
             parents,
@@ -494,138 +923,315 @@ class CuratedGuidelineStore:
             raise GuidelineIngestionError(
                 "Document exceeds the section indexing limit"
             )
-        try:
-            embeddings = embedder.embed([chunk.embedding_text for chunk in chunks])
-        except EmbeddingProviderError as error:
-            raise GuidelineIngestionError(
-                "Trusted document could not be embedded"
-            ) from error
-        _validate_embedding_batch(chunks, embeddings)
+        embeddings, reused_count = self._embed_chunks(chunks, embedder)
         timestamp = (reviewed_at or datetime.now(timezone.utc)).astimezone(
             timezone.utc
         )
+        # Everything derivable in memory is prepared before the row lock.
+        parent_rows, section_rows, posting_rows = _document_section_rows(
+            document_id, parents, chunks, embeddings
+        )
 
         with self.pool.connection() as connection:
-            current = connection.execute(
-                """
-                SELECT review_status, content_hash FROM guideline_documents
-                WHERE document_id = %s
-                FOR UPDATE
-                """,
-                (document_id,),
-            ).fetchone()
-            if (
-                current is None
-                or current["review_status"] != "pending_review"
-                or not _constant_time_equal(
-                    current["content_hash"], expected_content_hash
+            self._activate_locked(
+                connection,
+                document_id,
+                row["source_url"],
+                expected_content_hash,
+                (parent_rows, section_rows, posting_rows),
+                review_status,
+                timestamp,
+                actor,
+            )
+            _bump_corpus_generation(connection)
+        self._refresh_index_bundle(row["embedding_model"])
+        audit_event(
+            "curated_guideline_activated",
+            document_id=document_id,
+            review_status=review_status,
+            actor_hash=hashlib.sha256(actor.encode("utf-8")).hexdigest(),
+            parent_section_count=len(parent_rows),
+            section_count=len(section_rows),
+            reused_embedding_count=reused_count,
+        )
+        return self.get_document(document_id)
+
+    def approve_extracted_batch(
+        self,
+        documents: Sequence[PreparedDocument],
+        reviewer: str,
+        embedder: Any,
+        reviewed_at: Optional[datetime] = None,
+    ) -> Dict[str, str]:
+        """Activate several reviewed pending documents in one transaction.
+
+        Sections are extracted by the caller. Every document must still be
+        ``pending_review`` with the expected content hash. All chunks are
+        embedded in one call, and each document is written under its own
+        savepoint, so one stale document does not roll back the others.
+        Returns ``{document_id: "activated" | failure reason}``.
+        """
+        if not reviewer.strip():
+            raise GuidelineIngestionError("Reviewer identity is required")
+        actor = reviewer.strip()
+        outcomes: Dict[str, str] = {}
+        with self.pool.connection() as connection:
+            rows = {
+                row["document_id"]: row
+                for row in connection.execute(
+                    """
+                    SELECT document_id, source_url, review_status, content_hash,
+                           embedding_model
+                    FROM guideline_documents WHERE document_id = ANY(%s)
+                    """,
+                    ([document.document_id for document in documents],),
+                )
+            }
+        ready: List[PreparedDocument] = []
+        for document in documents:
+            row = rows.get(document.document_id)
+            if row is None:
+                outcomes[document.document_id] = "Document does not exist"
+            elif row["review_status"] != "pending_review":
+                outcomes[document.document_id] = (
+                    "Only pending documents can be approved"
                 )
+            elif not _constant_time_equal(
+                row["content_hash"], document.content_hash
             ):
-                raise GuidelineIngestionError(
-                    "Candidate changed state while approval was in progress"
+                outcomes[document.document_id] = (
+                    "Reviewed content hash does not match the stored document"
                 )
-            parent_ids: Dict[int, str] = {}
-            for parent_ordinal, parent in enumerate(parents, start=1):
-                parent_hash = hashlib.sha256(
-                    parent.content.encode("utf-8")
-                ).hexdigest()
-                parent_id = hashlib.sha256(
-                    f"{document_id}|parent|{parent_ordinal}|{parent_hash}".encode(
-                        "utf-8"
-                    )
-                ).hexdigest()[:32]
-                parent_ids[parent_ordinal] = parent_id
-                connection.execute(
-                    """
-                    INSERT INTO guideline_parent_sections (
-                        parent_section_id, document_id, ordinal, heading,
-                        section_path, section_level, content, content_hash
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        parent_id,
-                        document_id,
-                        parent_ordinal,
-                        parent.heading,
-                        parent.section_path,
-                        parent.level,
-                        parent.content,
-                        parent_hash,
-                    ),
+            elif row["embedding_model"] != embedder.model:
+                outcomes[document.document_id] = (
+                    "Activation embedder does not match the candidate "
+                    "embedding model"
                 )
+            elif not document.chunks:
+                outcomes[document.document_id] = "No usable full text was extracted"
+            elif len(document.chunks) > MAX_SECTIONS_PER_DOCUMENT:
+                outcomes[document.document_id] = (
+                    "Document exceeds the section indexing limit"
+                )
+            else:
+                ready.append(document)
+        if not ready:
+            return outcomes
+
+        embeddings, reused_count = self._embed_chunks(
+            [chunk for document in ready for chunk in document.chunks], embedder
+        )
+        prepared = []
+        offset = 0
+        for document in ready:
+            vectors = embeddings[offset:offset + len(document.chunks)]
+            offset += len(document.chunks)
+            prepared.append((document, _document_section_rows(
+                document.document_id, document.parents, document.chunks, vectors
+            )))
+        timestamp = (reviewed_at or datetime.now(timezone.utc)).astimezone(
+            timezone.utc
+        )
 
-            child_records = []
-            for ordinal, (chunk, vector) in enumerate(
-                zip(chunks, embeddings), start=1
+        activated = 0
+        with self.pool.connection() as connection:
+            # A stable source-URL order keeps advisory locks deadlock-free
+            # against concurrent batches; versions of one URL keep their order.
+            for document, section_rows in sorted(
+                prepared,
+                key=lambda item: rows[item[0].document_id]["source_url"],
             ):
-                section_hash = hashlib.sha256(
-                    chunk.content.encode("utf-8")
-                ).hexdigest()
-                section_id = hashlib.sha256(
-                    f"{document_id}|{ordinal}|{section_hash}".encode("utf-8")
-                ).hexdigest()[:32]
-                child_records.append((section_id, ordinal, chunk, section_hash, vector))
-
-            positions: Dict[Tuple[int, int], str] = {
-                (chunk.parent_ordinal, chunk.chunk_index): section_id
-                for section_id, _ordinal, chunk, _hash, _vector in child_records
-            }
-            for section_id, ordinal, chunk, section_hash, vector in child_records:
-                connection.execute(
-                    """
-                    INSERT INTO guideline_sections (
-                        section_id, document_id, ordinal, heading, content,
-                        content_hash, embedding, parent_section_id, chunk_index,
-                        section_path, token_count, previous_section_id,
-                        next_section_id
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                    """,
-                    (
-                        section_id,
-                        document_id,
-                        ordinal,
-                        chunk.heading,
-                        chunk.content,
-                        section_hash,
-                        list(vector),
-                        parent_ids[chunk.parent_ordinal],
-                        chunk.chunk_index,
-                        chunk.section_path,
-                        chunk.token_count,
-                        positions.get((chunk.parent_ordinal, chunk.chunk_index - 1)),
-                        positions.get((chunk.parent_ordinal, chunk.chunk_index + 1)),
-                    ),
-                )
-            connection.execute(
-                """
-                UPDATE guideline_documents
-                SET effective_status = 'superseded'
-                WHERE source_url = %s AND document_id <> %s
-                  AND review_status IN ('approved', 'trusted_official')
-                  AND effective_status = 'active'
-                """,
-                (row["source_url"], document_id),
+                try:
+                    with connection.transaction():
+                        self._activate_locked(
+                            connection,
+                            document.document_id,
+                            rows[document.document_id]["source_url"],
+                            document.content_hash,
+                            section_rows,
+                            INTERNAL_APPROVED_STATUS,
+                            timestamp,
+                            actor,
+                        )
+                except GuidelineIngestionError as error:
+                    outcomes[document.document_id] = str(error)
+                    continue
+                outcomes[document.document_id] = "activated"
+                activated += 1
+            if activated:
+                _bump_corpus_generation(connection)
+        if activated:
+            self._refresh_index_bundle(embedder.model)
+        audit_event(
+            "curated_guideline_batch_activated",
+            review_status=INTERNAL_APPROVED_STATUS,
+            actor_hash=hashlib.sha256(actor.encode("utf-8")).hexdigest(),
+            document_count=len(documents),
+            activated_count=activated,
+            section_count=len(embeddings),
+            reused_embedding_count=reused_count,
+        )
+        return outcomes
+
+    def _activate_locked(
+        self,
+        connection: Any,
+        document_id: str,
+        source_url: str,
+        expected_content_hash: str,
+        section_rows: Tuple[
+            List[Tuple[Any, ...]], List[Tuple[Any, ...]], List[Tuple[Any, ...]]
+        ],
+        review_status: str,
+        timestamp: datetime,
+        actor: str,
+    ) -> None:
+        """Write one document's sections and swap it active in ``connection``."""
+        # Versions of one source URL commit one at a time, so concurrent
+        # activations cannot both miss each other when superseding.
+        connection.execute(
+            "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+            (source_url,),
+        )
+        current = connection.execute(
+            """
+            SELECT review_status, content_hash FROM guideline_documents
+            WHERE document_id = %s
+            FOR UPDATE
+            """,
+            (document_id,),
+        ).fetchone()
+        if (
+            current is None
+            or current["review_status"] != "pending_review"
+            or not _constant_time_equal(
+                current["content_hash"], expected_content_hash
             )
+        ):
+            raise GuidelineIngestionError(
+                "Candidate changed state while approval was in progress"
+            )
+        _copy_document_sections(connection, *section_rows)
+        if self._has_vector_column:
             connection.execute(
                 """
-                UPDATE guideline_documents
-                SET review_status = %s, effective_status = 'active',
-                    reviewed_at = %s, reviewed_by = %s
+                UPDATE guideline_sections
+                SET embedding_vector = embedding::vector
                 WHERE document_id = %s
                 """,
-                (review_status, timestamp, actor, document_id),
+                (document_id,),
             )
-        audit_event(
-            "curated_guideline_activated",
-            document_id=document_id,
-            review_status=review_status,
-            actor_hash=hashlib.sha256(actor.encode("utf-8")).hexdigest(),
-            parent_section_count=len(parents),
-            section_count=len(chunks),
+        connection.execute(
+            """
+            UPDATE guideline_documents
+            SET effective_status = 'superseded'
+            WHERE source_url = %s AND document_id <> %s
+              AND review_status IN ('approved', 'trusted_official')
+              AND effective_status = 'active'
+            """,
+            (source_url, document_id),
         )
-        return self.get_document(document_id)
+        connection.execute(
+            """
+            UPDATE guideline_documents
+            SET review_status = %s, effective_status = 'active',
+                reviewed_at = %s, reviewed_by = %s,
+                parent_section_count = %s, section_count = %s
+            WHERE document_id = %s
+            """,
+            (
+                review_status,
+                timestamp,
+                actor,
+                len(section_rows[0]),
+                len(section_rows[1]),
+                document_id,
+            ),
+        )
+
+    def _raw_content(self, document_id: str) -> bytes:
+        """Load one document's stored bytes; only extraction needs them."""
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                """
+                SELECT content FROM guideline_document_blobs
+                WHERE document_id = %s
+                """,
+                (document_id,),
+            ).fetchone()
+        if row is None:
+            raise GuidelineIngestionError("Document content is missing")
+        return bytes(row["content"])
+
+    def _embed_chunks(
+        self, chunks: Sequence[GuidelineChunk], embedder: Any
+    ) -> Tuple[List[List[float]], int]:
+        """Embed only chunk texts without a stored vector for this model.
+
+        Vectors are keyed by ``(embedding_model, sha256(embedding_text))``, so
+        sections left unchanged by a new guideline version reuse the vectors
+        of the version they supersede. Returns the vectors and the reuse count.
+        """
+        hashes = [
+            hashlib.sha256(chunk.embedding_text.encode("utf-8")).hexdigest()
+            for chunk in chunks
+        ]
+        with self.pool.connection() as connection:
+            stored = {
+                row["text_hash"]: row["embedding"]
+                for row in connection.execute(
+                    """
+                    SELECT text_hash, embedding FROM guideline_chunk_embeddings
+                    WHERE embedding_model = %s AND text_hash = ANY(%s)
+                    """,
+                    (embedder.model, list(set(hashes))),
+                )
+            }
+        texts = {
+            text_hash: chunk.embedding_text
+            for text_hash, chunk in zip(hashes, chunks)
+            if text_hash not in stored
+        }
+        fresh: Dict[str, List[float]] = {}
+        if texts:
+            try:
+                vectors = embedder.embed(list(texts.values()))
+            except EmbeddingProviderError as error:
+                raise GuidelineIngestionError(
+                    "Trusted document could not be embedded"
+                ) from error
+            if len(vectors) != len(texts):
+                raise GuidelineIngestionError(
+                    "Every extracted section must have exactly one embedding"
+                )
+            fresh = dict(zip(texts, vectors))
+        embeddings = [
+            stored[text_hash] if text_hash in stored else fresh[text_hash]
+            for text_hash in hashes
+        ]
+        _validate_embedding_batch(chunks, embeddings)
+        if fresh:
+            created_at = datetime.now(timezone.utc)
+            with self.pool.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.executemany(
+                        """
+                        INSERT INTO guideline_chunk_embeddings (
+                            embedding_model, text_hash, embedding, created_at
+                        ) VALUES (%s, %s, %s, %s)
+                        ON CONFLICT (embedding_model, text_hash) DO NOTHING
+                        """,
+                        [
+                            (
+                                embedder.model,
+                                text_hash,
+                                [float(value) for value in vector],
+                                created_at,
+                            )
+                            for text_hash, vector in fresh.items()
+                        ],
+                    )
+        return embeddings, sum(text_hash in stored for text_hash in hashes)
 
     def reject(self, document_id: str, reviewer: str) -> Dict[str, Any]:
         return self._change_review_state(document_id, reviewer, "rejected", "rejected")
@@ -645,7 +1251,7 @@ class CuratedGuidelineStore:
         with self.pool.connection() as connection:
             row = connection.execute(
                 """
-                SELECT review_status FROM guideline_documents
+                SELECT review_status, embedding_model FROM guideline_documents
                 WHERE document_id = %s FOR UPDATE
                 """,
                 (document_id,),
@@ -677,6 +1283,8 @@ class CuratedGuidelineStore:
                     document_id,
                 ),
             )
+            _bump_corpus_generation(connection)
+        self._refresh_index_bundle(row["embedding_model"])
         audit_event(
             f"curated_guideline_{effective_status}", document_id=document_id
         )
@@ -685,22 +1293,16 @@ class CuratedGuidelineStore:
     def get_document(self, document_id: str) -> Dict[str, Any]:
         with self.pool.connection() as connection:
             row = connection.execute(
-                """
-                SELECT d.*, COUNT(DISTINCT s.section_id) AS section_count,
-                       COUNT(DISTINCT p.parent_section_id) AS parent_section_count
-                FROM guideline_documents d
-                LEFT JOIN guideline_sections s ON s.document_id = d.document_id
-                LEFT JOIN guideline_parent_sections p
-                    ON p.document_id = d.document_id
-                WHERE d.document_id = %s GROUP BY d.document_id
+                f"""
+                SELECT {_DOCUMENT_COLUMNS}, section_count, parent_section_count
+                FROM guideline_documents
+                WHERE document_id = %s
                 """,
                 (document_id,),
             ).fetchone()
         if row is None:
             raise GuidelineIngestionError("Document does not exist")
-        result = dict(row)
-        result.pop("raw_content", None)
-        return result
+        return dict(row)
 
     def get_review_bundle(self, document_id: str) -> Dict[str, Any]:
         """Return immutable metadata plus extracted section text for review."""
@@ -717,31 +1319,24 @@ class CuratedGuidelineStore:
                     (document_id,),
                 )
             ]
-            if not sections:
-                raw = connection.execute(
-                    """
-                    SELECT raw_content, content_type FROM guideline_documents
-                    WHERE document_id = %s
-                    """,
-                    (document_id,),
-                ).fetchone()
-                preview = extract_document_sections(
-                    bytes(raw["raw_content"]), raw["content_type"]
-                )
-                sections = [
-                    {
-                        "section_id": None,
-                        "ordinal": ordinal,
-                        "heading": section.heading,
-                        "section_path": section.section_path,
-                        "section_level": section.level,
-                        "content": section.content,
-                        "content_hash": hashlib.sha256(
-                            section.content.encode("utf-8")
-                        ).hexdigest(),
-                    }
-                    for ordinal, section in enumerate(preview, start=1)
-                ]
+        if not sections:
+            preview = extract_document_sections(
+                self._raw_content(document_id), document["content_type"]
+            )
+            sections = [
+                {
+                    "section_id": None,
+                    "ordinal": ordinal,
+                    "heading": section.heading,
+                    "section_path": section.section_path,
+                    "section_level": section.level,
+                    "content": section.content,
+                    "content_hash": hashlib.sha256(
+                        section.content.encode("utf-8")
+                    ).hexdigest(),
+                }
+                for ordinal, section in enumerate(preview, start=1)
+            ]
         return {"document": document, "sections": sections}
 
     def list_documents(self, review_status: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -749,7 +1344,8 @@ class CuratedGuidelineStore:
             SELECT document_id, source_url, final_url, title, publisher,
                    publication_date, version, effective_from, effective_until,
                    review_status, effective_status, content_hash, embedding_model,
-                   downloaded_at, reviewed_at, reviewed_by
+                   downloaded_at, reviewed_at, reviewed_by, section_count,
+                   parent_section_count
             FROM guideline_documents
         """
         parameters: Tuple[Any, ...] = ()
@@ -760,95 +1356,864 @@ class CuratedGuidelineStore:
         with self.pool.connection() as connection:
             return [dict(row) for row in connection.execute(query, parameters)]
 
-    def has_effective_documents(
-        self, embedding_model: str, on_date: Optional[date] = None
-    ) -> bool:
-        today = on_date or date.today()
-        with self.pool.connection() as connection:
-            row = connection.execute(
-                """
-                SELECT 1 FROM guideline_documents
-                WHERE review_status IN ('approved', 'trusted_official')
-                  AND effective_status = 'active'
-                  AND embedding_model = %s AND effective_from <= %s
-                  AND (effective_until IS NULL OR effective_until >= %s)
-                LIMIT 1
-                """,
-                (embedding_model, today, today),
-            ).fetchone()
-        return row is not None
+    def has_effective_documents(
+        self, embedding_model: str, on_date: Optional[date] = None
+    ) -> bool:
+        today = on_date or date.today()
+        snapshot = self._corpus_snapshot(embedding_model)
+        return bool(snapshot.effective_documents(today).any())
+
+    def search(
+        self,
+        query_vector: Optional[Sequence[float]],
+        embedding_model: str,
+        top_k: int,
+        min_score: float,
+        on_date: Optional[date] = None,
+        neighbor_window: int = DEFAULT_NEIGHBOR_WINDOW,
+        parent_context_max_tokens: int = DEFAULT_PARENT_CONTEXT_MAX_TOKENS,
+        lexical_query: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Rank child chunks, then expand bounded parent or neighbor context.
+
+        Scoring reads only IDs and vectors; text, parent content and document
+        metadata are fetched afterwards for the winners and their neighbors.
+        With ``lexical_query`` the vector ranking is fused with a BM25 ranking
+        from the posting table by reciprocal-rank fusion, and without a
+        ``query_vector`` the BM25 ranking is used on its own.
+        """
+        today = on_date or date.today()
+        limit = max(1, min(int(top_k), 10))
+        safe_window = max(0, min(int(neighbor_window), 2))
+        safe_parent_tokens = max(200, int(parent_context_max_tokens))
+        terms = query_terms(lexical_query) if lexical_query else []
+        depth = limit * FUSION_DEPTH_PER_RESULT if terms else limit
+        snapshot = None
+        if query_vector is not None and self.vector_backend == ARRAY_VECTOR_BACKEND:
+            snapshot = self._corpus_snapshot(embedding_model)
+        lexical_scores: Dict[str, float] = {}
+        fusion_scores: Dict[str, float] = {}
+        with self.pool.connection() as connection:
+            vector_ranking: List[Tuple[str, str, float]] = []
+            if query_vector is not None:
+                vector_ranking = self._vector_ranking(
+                    connection,
+                    snapshot,
+                    query_vector,
+                    embedding_model,
+                    today,
+                    min_score,
+                    depth,
+                )
+            scores: Dict[str, Optional[float]] = {
+                section_id: score for section_id, _group, score in vector_ranking
+            }
+            winners = list(scores)
+            if terms:
+                lexical_ranking = _lexical_ranking(
+                    connection, terms, embedding_model, today, depth
+                )
+                lexical_scores = {
+                    section_id: score
+                    for section_id, _group, score in lexical_ranking
+                }
+                fused = reciprocal_rank_fusion([
+                    [section_id for section_id, _group, _score in vector_ranking],
+                    [section_id for section_id, _group, _score in lexical_ranking],
+                ])
+                fusion_scores = dict(fused)
+                if query_vector is not None:
+                    # BM25 may only promote chunks that also clear the
+                    # relevance gate; unscored lexical results are kept
+                    # solely for the embedding-outage fallback.
+                    lexical_only = [
+                        section_id
+                        for section_id, _group, _score in lexical_ranking
+                        if section_id not in scores
+                    ]
+                    if lexical_only:
+                        scores.update(zip(
+                            lexical_only,
+                            _exact_section_scores(
+                                connection, query_vector, lexical_only
+                            ),
+                        ))
+                    fused = [
+                        (section_id, score)
+                        for section_id, score in fused
+                        if scores[section_id] >= min_score
+                    ]
+                winners = first_per_group(
+                    (section_id for section_id, _score in fused),
+                    {
+                        section_id: group
+                        for section_id, group, _score in (
+                            *lexical_ranking, *vector_ranking
+                        )
+                    },
+                    limit,
+                )
+            context_rows = _fetch_match_context(
+                connection,
+                winners,
+                safe_window,
+                embedding_model,
+                today,
+            )
+        wanted = set(winners)
+        matched = {
+            row["section_id"]: row
+            for row in context_rows
+            if row["section_id"] in wanted
+        }
+        selected = []
+        for section_id in winners:
+            if section_id not in matched:
+                continue
+            item = {**matched[section_id], "score": scores.get(section_id)}
+            if terms:
+                item["lexical_score"] = lexical_scores.get(section_id)
+                item["fusion_score"] = fusion_scores[section_id]
+            selected.append(item)
+        return [
+            _expand_match_context(
+                item, context_rows, safe_window, safe_parent_tokens
+            )
+            for item in selected
+        ]
+
+    def _vector_ranking(
+        self,
+        connection: Any,
+        snapshot: Optional[CorpusSnapshot],
+        query_vector: Sequence[float],
+        embedding_model: str,
+        today: date,
+        min_score: float,
+        limit: int,
+    ) -> List[Tuple[str, str, float]]:
+        """Return ``(section_id, parent group, exact cosine)`` best first."""
+        if snapshot is None:
+            rows = self._pgvector_candidates(
+                connection, query_vector, embedding_model, today, limit
+            )
+            section_ids: Sequence[str] = [row["section_id"] for row in rows]
+            group_keys: Sequence[str] = [
+                row["parent_section_id"] or row["section_id"] for row in rows
+            ]
+            matrix = EmbeddingMatrix([row["embedding"] for row in rows])
+            eligible_rows = None
+
+            def exact_scores(indices: Sequence[int]) -> List[float]:
+                return [
+                    cosine_similarity(query_vector, rows[index]["embedding"])
+                    for index in indices
+                ]
+        else:
+            section_ids = snapshot.section_ids
+            group_keys = snapshot.group_keys
+            matrix = snapshot.matrix
+            eligible_rows = snapshot.effective_rows(today)
+
+            def exact_scores(indices: Sequence[int]) -> List[float]:
+                return _exact_section_scores(
+                    connection,
+                    query_vector,
+                    [section_ids[index] for index in indices],
+                )
+
+        matches = select_top_matches(
+            matrix,
+            query_vector,
+            min_score=min_score,
+            limit=limit,
+            group_keys=group_keys,
+            tie_keys=section_ids,
+            exact_scores=exact_scores,
+            eligible_rows=eligible_rows,
+        )
+        return [
+            (section_ids[index], group_keys[index], score)
+            for index, score in matches
+        ]
+
+    def _pgvector_candidates(
+        self,
+        connection: Any,
+        query_vector: Sequence[float],
+        embedding_model: str,
+        today: date,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Return an HNSW ID/vector window that is re-ranked exactly in Python.
+
+        HNSW is approximate and filters after the index scan, so the window is
+        wider than ``limit`` to leave room for parent de-duplication, expired
+        documents and the exact ``min_score`` check on the array embedding.
+        """
+        dimensions = self.vector_dimensions
+        if len(query_vector) != dimensions or not all(
+            math.isfinite(float(value)) for value in query_vector
+        ):
+            return []
+        window = limit * PGVECTOR_CANDIDATES_PER_RESULT
+        literal = "[" + ",".join(repr(float(value)) for value in query_vector) + "]"
+        connection.execute(
+            "SELECT set_config('hnsw.ef_search', %s, true)",
+            (str(max(PGVECTOR_MIN_EF_SEARCH, window)),),
+        )
+        return connection.execute(
+            f"""
+            SELECT {_CANDIDATE_COLUMNS}
+            FROM guideline_sections s
+            JOIN guideline_documents d ON d.document_id = s.document_id
+            WHERE {_EFFECTIVE_DOCUMENT_FILTER}
+              AND vector_dims(s.embedding_vector) = {dimensions}
+            ORDER BY s.embedding_vector::vector({dimensions})
+                <=> %s::vector({dimensions}), s.section_id
+            LIMIT %s
+            """,
+            (embedding_model, today, today, literal, window),
+        ).fetchall()
+
+    def _corpus_snapshot(self, embedding_model: str) -> CorpusSnapshot:
+        """Return the cached corpus snapshot, reloading it after any write.
+
+        Activation, rejection and withdrawal bump ``guideline_corpus_state``
+        in their own transaction, so one primary-key read decides reuse.
+        """
+        with self.pool.connection() as connection:
+            generation = _corpus_generation(connection)
+        with self._snapshot_lock:
+            cached = self._snapshots.get(embedding_model)
+            if cached is not None and cached.generation >= generation:
+                return cached
+            snapshot = None
+            bundle_directory = self._index_bundle_directory(embedding_model)
+            if bundle_directory:
+                snapshot = read_index_bundle(bundle_directory, generation)
+            if snapshot is None:
+                snapshot = self._load_corpus_snapshot(embedding_model)
+                if bundle_directory:
+                    snapshot = _publish_index_bundle(bundle_directory, snapshot)
+            self._snapshots[embedding_model] = snapshot
+            return snapshot
+
+    def _index_bundle_directory(self, embedding_model: str) -> Optional[str]:
+        if not self.index_directory or self.vector_backend != ARRAY_VECTOR_BACKEND:
+            return None
+        model_key = hashlib.sha256(embedding_model.encode("utf-8")).hexdigest()
+        return os.path.join(
+            self.index_directory, f"{model_key[:16]}-{self.vector_precision}"
+        )
+
+    def _refresh_index_bundle(self, embedding_model: str) -> None:
+        """Publish the bundle for a committed write; readers fall back to SQL."""
+        if not self._index_bundle_directory(embedding_model):
+            return
+        try:
+            self._corpus_snapshot(embedding_model)
+        except (PostgresError, PoolTimeout) as error:
+            logger.warning(
+                "Curated index bundle refresh failed: %s", type(error).__name__
+            )
+
+    def _load_corpus_snapshot(self, embedding_model: str) -> CorpusSnapshot:
+        """Load retrievable documents and, for arrays, their vectors.
+
+        Dates are not filtered here; the snapshot evaluates effective windows
+        per query. A repeatable-read transaction keeps the generation, the
+        document windows and the section rows consistent with each other.
+        """
+        with self.pool.connection() as connection:
+            connection.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            generation = _corpus_generation(connection)
+            documents = connection.execute(
+                f"""
+                SELECT d.document_id, d.effective_from, d.effective_until
+                FROM guideline_documents d
+                WHERE {_RETRIEVABLE_DOCUMENT_FILTER}
+                """,
+                (embedding_model,),
+            ).fetchall()
+            sections: List[Dict[str, Any]] = []
+            if self.vector_backend == ARRAY_VECTOR_BACKEND:
+                sections = connection.execute(
+                    f"""
+                    SELECT {_CANDIDATE_COLUMNS}, s.document_id
+                    FROM guideline_sections s
+                    JOIN guideline_documents d ON d.document_id = s.document_id
+                    WHERE {_RETRIEVABLE_DOCUMENT_FILTER}
+                    """,
+                    (embedding_model,),
+                ).fetchall()
+        positions = {
+            row["document_id"]: index for index, row in enumerate(documents)
+        }
+        return CorpusSnapshot(
+            generation=generation,
+            section_ids=tuple(row["section_id"] for row in sections),
+            group_keys=tuple(
+                row["parent_section_id"] or row["section_id"] for row in sections
+            ),
+            row_documents=np.asarray(
+                [positions[row["document_id"]] for row in sections],
+                dtype=np.int64,
+            ),
+            effective_from=np.asarray(
+                [row["effective_from"].toordinal() for row in documents],
+                dtype=np.int64,
+            ),
+            effective_until=np.asarray(
+                [
+                    (row["effective_until"] or date.max).toordinal()
+                    for row in documents
+                ],
+                dtype=np.int64,
+            ),
+            matrix=EmbeddingMatrix(
+                [row["embedding"] for row in sections],
+                precision=self.vector_precision,
+            ),
+        )
+
+
+_CANDIDATE_COLUMNS = "s.section_id, s.parent_section_id, s.embedding"
+_RETRIEVABLE_DOCUMENT_FILTER = """
+    d.review_status IN ('approved', 'trusted_official')
+    AND d.effective_status = 'active'
+    AND d.embedding_model = %s
+"""
+_EFFECTIVE_DOCUMENT_FILTER = _RETRIEVABLE_DOCUMENT_FILTER + """
+    AND d.effective_from <= %s
+    AND (d.effective_until IS NULL OR d.effective_until >= %s)
+"""
+
+
+def _publish_index_bundle(
+    directory: str, snapshot: CorpusSnapshot
+) -> CorpusSnapshot:
+    """Write ``snapshot`` to disk and return the memory-mapped copy."""
+    try:
+        write_index_bundle(directory, snapshot)
+    except OSError as error:
+        logger.warning(
+            "Curated index bundle write failed: %s", type(error).__name__
+        )
+        return snapshot
+    return read_index_bundle(directory, snapshot.generation) or snapshot
+
+
+def _corpus_generation(connection: Any) -> int:
+    row = connection.execute(
+        "SELECT generation FROM guideline_corpus_state WHERE id = 1"
+    ).fetchone()
+    return int(row["generation"]) if row else 0
+
+
+def _bump_corpus_generation(connection: Any) -> None:
+    """Invalidate cached corpus snapshots once the caller's transaction commits."""
+    connection.execute(
+        """
+        UPDATE guideline_corpus_state SET generation = generation + 1
+        WHERE id = 1
+        """
+    )
+
+
+_DOCUMENT_COLUMNS = """
+    document_id, source_url, final_url, title, publisher, publication_date,
+    version, effective_from, effective_until, review_status, effective_status,
+    content_type, content_hash, embedding_model, downloaded_at, reviewed_at,
+    reviewed_by
+"""
+
+
+def _copy_text(value: Any) -> str:
+    """Escape one value for PostgreSQL's text ``COPY`` format."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_pending_document(
+    connection: Any, values: Sequence[Any], content: Iterable[bytes]
+) -> None:
+    """Insert one document row, then stream its body into the blob table.
+
+    ``values`` follow the column list below, starting with the document ID.
+    The body is written chunk by chunk as hex ``bytea`` input, so no complete
+    in-memory copy of it is built here.
+    """
+    with connection.cursor() as cursor:
+        with cursor.copy(
+            """
+            COPY guideline_documents (
+                document_id, source_url, final_url, title, publisher,
+                publication_date, version, effective_from, effective_until,
+                review_status, effective_status, content_type, content_hash,
+                embedding_model, downloaded_at, section_count,
+                parent_section_count
+            ) FROM STDIN
+            """
+        ) as copy:
+            copy.write("\t".join(_copy_text(value) for value in values))
+            copy.write("\t0\t0\n")
+        with cursor.copy(
+            "COPY guideline_document_blobs (document_id, content) FROM STDIN"
+        ) as copy:
+            copy.write(_copy_text(values[0]))
+            copy.write("\t\\\\x")
+            for chunk in content:
+                copy.write(chunk.hex())
+            copy.write("\n")
+
+
+_PARENT_COPY = (
+    """
+    COPY guideline_parent_sections (
+        parent_section_id, document_id, ordinal, heading, section_path,
+        section_level, content, content_hash, token_count
+    ) FROM STDIN (FORMAT BINARY)
+    """,
+    ["text", "text", "int4", "text", "text", "int4", "text", "text", "int4"],
+)
+_SECTION_COPY = (
+    """
+    COPY guideline_sections (
+        section_id, document_id, ordinal, heading, content, content_hash,
+        embedding, parent_section_id, chunk_index, section_path, token_count,
+        previous_section_id, next_section_id, lexical_length
+    ) FROM STDIN (FORMAT BINARY)
+    """,
+    [
+        "text", "text", "int4", "text", "text", "text", "float8[]", "text",
+        "int4", "text", "int4", "text", "text", "int4",
+    ],
+)
+_POSTING_COPY = (
+    """
+    COPY guideline_lexical_postings (term, section_id, term_frequency)
+    FROM STDIN (FORMAT BINARY)
+    """,
+    ["text", "text", "int4"],
+)
+
+
+def _document_section_rows(
+    document_id: str,
+    parents: Sequence[ExtractedSection],
+    chunks: Sequence[GuidelineChunk],
+    embeddings: Sequence[Sequence[float]],
+) -> Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]], List[Tuple[Any, ...]]]:
+    """Build parent, child and posting rows with content-derived IDs."""
+    parent_rows = []
+    parent_ids: Dict[int, str] = {}
+    parent_tokens = _count_tokens_batch([parent.content for parent in parents])
+    for parent_ordinal, (parent, token_count) in enumerate(
+        zip(parents, parent_tokens), start=1
+    ):
+        parent_hash = hashlib.sha256(parent.content.encode("utf-8")).hexdigest()
+        parent_id = hashlib.sha256(
+            f"{document_id}|parent|{parent_ordinal}|{parent_hash}".encode("utf-8")
+        ).hexdigest()[:32]
+        parent_ids[parent_ordinal] = parent_id
+        parent_rows.append((
+            parent_id,
+            document_id,
+            parent_ordinal,
+            parent.heading,
+            parent.section_path,
+            parent.level,
+            parent.content,
+            parent_hash,
+            token_count,
+        ))
+
+    child_records = []
+    for ordinal, (chunk, vector) in enumerate(zip(chunks, embeddings), start=1):
+        section_hash = hashlib.sha256(chunk.content.encode("utf-8")).hexdigest()
+        section_id = hashlib.sha256(
+            f"{document_id}|{ordinal}|{section_hash}".encode("utf-8")
+        ).hexdigest()[:32]
+        child_records.append((section_id, ordinal, chunk, section_hash, vector))
+    positions: Dict[Tuple[int, int], str] = {
+        (chunk.parent_ordinal, chunk.chunk_index): section_id
+        for section_id, _ordinal, chunk, _hash, _vector in child_records
+    }
+    posting_rows, lengths = _lexical_rows(
+        [(section_id, chunk.content) for section_id, _o, chunk, _h, _v in child_records]
+    )
+    section_rows = [
+        (
+            section_id,
+            document_id,
+            ordinal,
+            chunk.heading,
+            chunk.content,
+            section_hash,
+            [float(value) for value in vector],
+            parent_ids[chunk.parent_ordinal],
+            chunk.chunk_index,
+            chunk.section_path,
+            chunk.token_count,
+            positions.get((chunk.parent_ordinal, chunk.chunk_index - 1)),
+            positions.get((chunk.parent_ordinal, chunk.chunk_index + 1)),
+            lengths[section_id],
+        )
+        for section_id, ordinal, chunk, section_hash, vector in child_records
+    ]
+    return parent_rows, section_rows, posting_rows
+
+
+def _copy_document_sections(
+    connection: Any,
+    parent_rows: Sequence[Tuple[Any, ...]],
+    section_rows: Sequence[Tuple[Any, ...]],
+    posting_rows: Sequence[Tuple[Any, ...]],
+) -> None:
+    """Stream all rows of one activation with binary ``COPY``.
+
+    Three ``COPY`` statements replace one ``INSERT`` round trip per parent,
+    chunk and posting while the document row lock is held.
+    """
+    with connection.cursor() as cursor:
+        for (statement, types), rows in (
+            (_PARENT_COPY, parent_rows),
+            (_SECTION_COPY, section_rows),
+            (_POSTING_COPY, posting_rows),
+        ):
+            with cursor.copy(statement) as copy:
+                copy.set_types(types)
+                for row in rows:
+                    copy.write_row(row)
+
+
+def _lexical_rows(
+    sections: Sequence[Tuple[str, str]]
+) -> Tuple[List[Tuple[str, str, int]], Dict[str, int]]:
+    """Return posting rows and term counts for ``(section_id, content)``."""
+    postings: List[Tuple[str, str, int]] = []
+    lengths: Dict[str, int] = {}
+    for section_id, content in sections:
+        frequencies, lengths[section_id] = term_frequencies(content)
+        postings.extend(
+            (term, section_id, frequency)
+            for term, frequency in frequencies.items()
+        )
+    return postings, lengths
+
+
+def _prefer_lz4_blob_compression(connection: Any) -> None:
+    """Compress document blobs with lz4 when the server was built with it.
+
+    The ALTER takes an ACCESS EXCLUSIVE lock, so it runs only once, while the
+    column still uses another compression method.
+    """
+    row = connection.execute(
+        """
+        SELECT 'lz4' = ANY(enumvals) AS available FROM pg_settings
+        WHERE name = 'default_toast_compression'
+        """
+    ).fetchone()
+    if row is None or not row["available"]:
+        return
+    column = connection.execute(
+        """
+        SELECT attcompression = 'l' AS is_lz4 FROM pg_attribute
+        WHERE attrelid = 'guideline_document_blobs'::regclass
+          AND attname = 'content'
+        """
+    ).fetchone()
+    if column is not None and not column["is_lz4"]:
+        connection.execute(
+            """
+            ALTER TABLE guideline_document_blobs
+            ALTER COLUMN content SET COMPRESSION lz4
+            """
+        )
+
+
+def _has_inline_raw_content(connection: Any) -> bool:
+    return connection.execute(
+        """
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = 'guideline_documents'::regclass
+          AND attname = 'raw_content' AND NOT attisdropped
+        """
+    ).fetchone() is not None
+
+
+def _migrate_inline_raw_content(connection: Any) -> None:
+    """Move bodies stored by older versions into the blob table once."""
+    if not _has_inline_raw_content(connection):
+        return
+    connection.execute("LOCK TABLE guideline_documents IN ACCESS EXCLUSIVE MODE")
+    # Another process may have migrated while this one waited for the lock.
+    if not _has_inline_raw_content(connection):
+        return
+    connection.execute(
+        """
+        INSERT INTO guideline_document_blobs (document_id, content)
+        SELECT document_id, raw_content FROM guideline_documents
+        ON CONFLICT (document_id) DO NOTHING
+        """
+    )
+    connection.execute("ALTER TABLE guideline_documents DROP COLUMN raw_content")
+
+
+def _backfill_document_counts(connection: Any) -> None:
+    """Store section counts for documents written before they were kept."""
+    connection.execute(
+        """
+        UPDATE guideline_documents d
+        SET section_count = (
+                SELECT COUNT(*) FROM guideline_sections s
+                WHERE s.document_id = d.document_id
+            ),
+            parent_section_count = (
+                SELECT COUNT(*) FROM guideline_parent_sections p
+                WHERE p.document_id = d.document_id
+            )
+        WHERE d.section_count IS NULL OR d.parent_section_count IS NULL
+        """
+    )
+
+
+def _backfill_parent_token_counts(connection: Any) -> None:
+    """Store token counts for parents activated before counts were kept."""
+    rows = connection.execute(
+        """
+        SELECT parent_section_id, content FROM guideline_parent_sections
+        WHERE token_count IS NULL
+        """
+    ).fetchall()
+    if not rows:
+        return
+    counts = _count_tokens_batch([row["content"] for row in rows])
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            """
+            UPDATE guideline_parent_sections SET token_count = %s
+            WHERE parent_section_id = %s
+            """,
+            [
+                (count, row["parent_section_id"])
+                for row, count in zip(rows, counts)
+            ],
+        )
+
+
+def _index_lexical_terms(
+    connection: Any, sections: Sequence[Tuple[str, str]]
+) -> None:
+    """Backfill BM25 postings and chunk lengths for ``(section_id, content)``."""
+    if not sections:
+        return
+    postings, lengths = _lexical_rows(sections)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            """
+            INSERT INTO guideline_lexical_postings (
+                term, section_id, term_frequency
+            ) VALUES (%s, %s, %s)
+            ON CONFLICT (term, section_id) DO NOTHING
+            """,
+            postings,
+        )
+        cursor.executemany(
+            "UPDATE guideline_sections SET lexical_length = %s WHERE section_id = %s",
+            [(length, section_id) for section_id, length in lengths.items()],
+        )
+
+
+def _lexical_ranking(
+    connection: Any,
+    terms: Sequence[str],
+    embedding_model: str,
+    today: date,
+    limit: int,
+) -> List[Tuple[str, str, float]]:
+    """Return ``(section_id, parent group, BM25 score)`` best first.
+
+    Corpus statistics cover only effective chunks, and chunks containing too
+    few of the query terms are dropped before de-duplicating parents.
+    """
+    statistics = connection.execute(
+        f"""
+        WITH eligible AS (
+            SELECT s.section_id, s.lexical_length
+            FROM guideline_sections s
+            JOIN guideline_documents d ON d.document_id = s.document_id
+            WHERE {_EFFECTIVE_DOCUMENT_FILTER}
+              AND s.lexical_length IS NOT NULL
+        )
+        SELECT p.term, COUNT(*) AS document_frequency,
+               (SELECT COUNT(*) FROM eligible) AS section_count,
+               (SELECT AVG(lexical_length) FROM eligible) AS average_length
+        FROM guideline_lexical_postings p
+        JOIN eligible e ON e.section_id = p.section_id
+        WHERE p.term = ANY(%s)
+        GROUP BY p.term
+        """,
+        (embedding_model, today, today, list(terms)),
+    ).fetchall()
+    if not statistics:
+        return []
+    frequencies = {
+        row["term"]: int(row["document_frequency"]) for row in statistics
+    }
+    postings = connection.execute(
+        f"""
+        SELECT p.term, p.section_id, p.term_frequency, s.lexical_length,
+               COALESCE(s.parent_section_id, s.section_id) AS group_key
+        FROM guideline_lexical_postings p
+        JOIN guideline_sections s ON s.section_id = p.section_id
+        JOIN guideline_documents d ON d.document_id = s.document_id
+        WHERE p.term = ANY(%s) AND {_EFFECTIVE_DOCUMENT_FILTER}
+        """,
+        (list(frequencies), embedding_model, today, today),
+    ).fetchall()
+    groups = {row["section_id"]: row["group_key"] for row in postings}
+    ranking = bm25_ranking(
+        terms,
+        (
+            (
+                row["term"],
+                row["section_id"],
+                int(row["term_frequency"]),
+                int(row["lexical_length"]),
+            )
+            for row in postings
+        ),
+        frequencies,
+        int(statistics[0]["section_count"]),
+        float(statistics[0]["average_length"] or 0),
+    )
+    scores = {
+        section_id: score
+        for section_id, score, coverage in ranking
+        if coverage >= MIN_LEXICAL_COVERAGE
+    }
+    winners = first_per_group(
+        (section_id for section_id, _score, _coverage in ranking if section_id in scores),
+        groups,
+        limit,
+    )
+    return [
+        (section_id, groups[section_id], scores[section_id])
+        for section_id in winners
+    ]
+
 
-    def search(
-        self,
-        query_vector: Sequence[float],
-        embedding_model: str,
-        top_k: int,
-        min_score: float,
-        on_date: Optional[date] = None,
-        neighbor_window: int = DEFAULT_NEIGHBOR_WINDOW,
-        parent_context_max_tokens: int = DEFAULT_PARENT_CONTEXT_MAX_TOKENS,
-    ) -> List[Dict[str, Any]]:
-        """Rank child chunks, then expand bounded parent or neighbor context."""
-        today = on_date or date.today()
-        with self.pool.connection() as connection:
-            rows = connection.execute(
-                """
-                SELECT s.section_id, s.ordinal, s.heading, s.content,
-                       s.content_hash AS section_hash, s.embedding,
-                       s.parent_section_id, s.chunk_index, s.section_path,
-                       s.token_count, s.previous_section_id, s.next_section_id,
-                       p.content AS parent_content,
-                       p.content_hash AS parent_section_hash,
-                       d.document_id, d.title, d.publisher, d.publication_date,
-                       d.version, d.effective_from, d.effective_until,
-                       d.content_hash AS document_hash, d.final_url,
-                       d.review_status, d.reviewed_at, d.reviewed_by
-                FROM guideline_sections s
-                JOIN guideline_documents d ON d.document_id = s.document_id
-                LEFT JOIN guideline_parent_sections p
-                    ON p.parent_section_id = s.parent_section_id
-                WHERE d.review_status IN ('approved', 'trusted_official')
-                  AND d.effective_status = 'active'
-                  AND d.embedding_model = %s AND d.effective_from <= %s
-                  AND (d.effective_until IS NULL OR d.effective_until >= %s)
-                """,
-                (embedding_model, today, today),
-            ).fetchall()
+def _exact_section_scores(
+    connection: Any,
+    query_vector: Sequence[float],
+    section_ids: Sequence[str],
+) -> List[float]:
+    """Score candidates against their stored array embeddings."""
+    embeddings = {
+        row["section_id"]: row["embedding"]
+        for row in connection.execute(
+            """
+            SELECT section_id, embedding FROM guideline_sections
+            WHERE section_id = ANY(%s)
+            """,
+            (list(section_ids),),
+        )
+    }
+    return [
+        cosine_similarity(query_vector, embeddings.get(section_id, []))
+        for section_id in section_ids
+    ]
 
-        ranked = []
-        for row in rows:
-            vector = row["embedding"]
-            score = _cosine_similarity(query_vector, vector)
-            if score < min_score:
-                continue
-            item = dict(row)
-            item.pop("embedding")
-            item["score"] = score
-            ranked.append(item)
-        ranked.sort(key=lambda item: (-item["score"], item["section_id"]))
-        limit = max(1, min(int(top_k), 10))
-        selected = []
-        seen_parents = set()
-        for item in ranked:
-            parent_key = item.get("parent_section_id") or item["section_id"]
-            if parent_key in seen_parents:
-                continue
-            selected.append(item)
-            seen_parents.add(parent_key)
-            if len(selected) >= limit:
-                break
-        safe_window = max(0, min(int(neighbor_window), 2))
-        safe_parent_tokens = max(200, int(parent_context_max_tokens))
-        return [
-            _expand_match_context(item, rows, safe_window, safe_parent_tokens)
-            for item in selected
-        ]
+
+def _fetch_match_context(
+    connection: Any,
+    section_ids: Sequence[str],
+    neighbor_window: int,
+    embedding_model: str,
+    today: date,
+) -> List[Dict[str, Any]]:
+    """Load the winning chunks and their sibling chunks in one query.
+
+    Winners are re-checked against the effective-document filter, so a
+    document withdrawn after scoring is dropped rather than served. Parent
+    text is returned only on winning rows; sibling rows exist solely to
+    expand neighbor context.
+    """
+    if not section_ids:
+        return []
+    ids = list(section_ids)
+    return connection.execute(
+        f"""
+        WITH matched AS (
+            SELECT s.section_id, s.parent_section_id, s.chunk_index
+            FROM guideline_sections s
+            JOIN guideline_documents d ON d.document_id = s.document_id
+            WHERE s.section_id = ANY(%s) AND {_EFFECTIVE_DOCUMENT_FILTER}
+        ), wanted AS (
+            SELECT section_id FROM matched
+            UNION
+            SELECT s.section_id
+            FROM guideline_sections s
+            JOIN matched m
+                ON s.parent_section_id = m.parent_section_id
+               AND s.chunk_index BETWEEN m.chunk_index - %s
+                   AND m.chunk_index + %s
+        )
+        SELECT s.section_id, s.ordinal, s.heading, s.content,
+               s.content_hash AS section_hash,
+               s.parent_section_id, s.chunk_index, s.section_path,
+               s.token_count, s.previous_section_id, s.next_section_id,
+               CASE WHEN s.section_id = ANY(%s) THEN p.content END
+                   AS parent_content,
+               p.content_hash AS parent_section_hash,
+               p.token_count AS parent_token_count,
+               d.document_id, d.title, d.publisher, d.publication_date,
+               d.version, d.effective_from, d.effective_until,
+               d.content_hash AS document_hash, d.final_url,
+               d.review_status, d.reviewed_at, d.reviewed_by
+        FROM wanted w
+        JOIN guideline_sections s ON s.section_id = w.section_id
+        JOIN guideline_documents d ON d.document_id = s.document_id
+        LEFT JOIN guideline_parent_sections p
+            ON p.parent_section_id = s.parent_section_id
+        """,
+        (
+            ids,
+            embedding_model,
+            today,
+            today,
+            neighbor_window,
+            neighbor_window,
+            ids,
+        ),
+    ).fetchall()
 
 
 @lru_cache(maxsize=4)
-def get_curated_guideline_store(postgres_uri: str) -> CuratedGuidelineStore:
+def get_curated_guideline_store(
+    postgres_uri: str,
+    vector_backend: str = ARRAY_VECTOR_BACKEND,
+    vector_dimensions: int = DEFAULT_VECTOR_DIMENSIONS,
+    index_directory: Optional[str] = None,
+    vector_precision: str = FLOAT32_PRECISION,
+) -> CuratedGuidelineStore:
     """Reuse one bounded PostgreSQL pool per configured corpus database."""
-    return CuratedGuidelineStore(postgres_uri)
+    return CuratedGuidelineStore(
+        postgres_uri,
+        vector_backend=vector_backend,
+        vector_dimensions=vector_dimensions,
+        index_directory=index_directory,
+        vector_precision=vector_precision,
+    )
 
 
 def download_approved_document(
@@ -866,8 +2231,8 @@ def download_approved_document(
     )
     if not final_url:
         raise GuidelineIngestionError("Source URL or redirect chain is not approved")
-    if not _host_has_only_public_addresses(
-        urlparse(final_url).hostname or "", resolver or socket.getaddrinfo
+    if not host_has_only_public_addresses(
+        urlparse(final_url).hostname or "", resolver
     ):
         raise GuidelineIngestionError("Final source host does not resolve publicly")
 
@@ -897,16 +2262,54 @@ def download_approved_document(
                 raise GuidelineIngestionError(
                     f"Unsupported document content type: {content_type or 'missing'}"
                 )
-            content = response.read(max_bytes + 1)
+            body, content_hash, size = _spool_response(response, max_bytes)
     except GuidelineIngestionError:
         raise
     except (HTTPError, URLError, TimeoutError, OSError, ValueError) as error:
         raise GuidelineIngestionError(
             f"Controlled document download failed: {type(error).__name__}"
         ) from error
-    if not content or len(content) > max_bytes:
-        raise GuidelineIngestionError("Document is empty or exceeds the size limit")
-    return DownloadedDocument(source_url, final_url, content_type, content)
+    return DownloadedDocument(
+        source_url,
+        final_url,
+        content_type,
+        body=body,
+        content_hash=content_hash,
+        size=size,
+    )
+
+
+def _spool_response(
+    response: Any, max_bytes: int
+) -> Tuple[IO[bytes], str, int]:
+    """Stream a response into a spooled file, hashing and size-capping as it reads."""
+    body = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MEMORY_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = response.read(min(DOWNLOAD_CHUNK_BYTES, max_bytes + 1 - size))
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                break
+            digest.update(chunk)
+            body.write(chunk)
+        if not size or size > max_bytes:
+            raise GuidelineIngestionError(
+                "Document is empty or exceeds the size limit"
+            )
+    except BaseException:
+        body.close()
+        raise
+    return body, digest.hexdigest(), size
+
+
+def guideline_document_id(source_url: str, version: str, content_hash: str) -> str:
+    """Return the stable ID of one immutable source version."""
+    identity = f"{source_url}|{version}|{content_hash}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
 
 
 def ingest_guideline(
@@ -919,11 +2322,14 @@ def ingest_guideline(
 ) -> Dict[str, Any]:
     """Download and hash a candidate; extraction/indexing waits for approval."""
     downloaded = downloader(source_url, **download_kwargs)
-    return store.add_pending_document(
-        downloaded=downloaded,
-        metadata=metadata,
-        embedding_model=embedding_model,
-    )
+    try:
+        return store.add_pending_document(
+            downloaded=downloaded,
+            metadata=metadata,
+            embedding_model=embedding_model,
+        )
+    finally:
+        downloaded.close()
 
 
 def auto_ingest_trusted_guidelines(
@@ -952,6 +2358,61 @@ def auto_ingest_trusted_guidelines(
     safe_max_documents = min(
         max(1, min(int(max_documents), 3)), safe_discovery_max
     )
+
+    embedding_model = embedder.model
+
+    def discover_and_ingest() -> Dict[str, Any]:
+        return _discover_and_ingest(
+            question,
+            store,
+            embedder,
+            tavily_api_key,
+            safe_discovery_max,
+            safe_max_documents,
+            search_options,
+            searcher,
+            downloader,
+            on_date,
+        )
+
+    # Identical concurrent misses share one discovery and ingestion run. The
+    # pool object, not id(store), identifies the corpus: the flight table
+    # holds it, so its identity cannot be reused while the run is in flight.
+    # A waiter reruns when the result was another actor's rate limit or was
+    # embedded under a different model.
+    flight_key = (
+        store.pool,
+        embedding_model,
+        ingestion_topic_hash(question),
+        safe_discovery_max,
+        safe_max_documents,
+        on_date,
+    )
+    (leader_model, result), shared = _AUTO_INGEST_FLIGHTS.do(
+        flight_key, lambda: (embedding_model, discover_and_ingest())
+    )
+    if shared:
+        audit_event("trusted_guideline_auto_ingest_coalesced")
+        if (
+            result.get("status") == "rate_limited"
+            or leader_model != embedding_model
+        ):
+            result = discover_and_ingest()
+    return result
+
+
+def _discover_and_ingest(
+    question: str,
+    store: CuratedGuidelineStore,
+    embedder: Any,
+    tavily_api_key: str,
+    safe_discovery_max: int,
+    safe_max_documents: int,
+    search_options: Optional[Dict[str, Any]],
+    searcher: Callable[..., Dict[str, Any]],
+    downloader: Callable[[str], DownloadedDocument],
+    on_date: Optional[date],
+) -> Dict[str, Any]:
     options = dict(search_options or {})
     options["max_results"] = safe_discovery_max
     discovery = searcher(
@@ -967,7 +2428,6 @@ def auto_ingest_trusted_guidelines(
         }
 
     today = on_date or date.today()
-    ingested: List[Dict[str, Any]] = []
     skipped = 0
     discovered = discovery.get("evidence", [])
     if not isinstance(discovered, list):
@@ -975,65 +2435,50 @@ def auto_ingest_trusted_guidelines(
     candidates = sorted(
         discovered[:safe_discovery_max], key=_trusted_candidate_rank
     )
-    for candidate in candidates:
-        if len(ingested) >= safe_max_documents:
-            break
-        if not isinstance(candidate, dict):
-            skipped += 1
-            continue
-        final_url = str(candidate.get("final_url") or candidate.get("url") or "")
-        title = str(candidate.get("title") or "").strip()
-        publisher = str(candidate.get("source_name") or "").strip()
-        publication_date = _strict_publication_date(
-            candidate.get("publication_date"), today
-        )
-        if not (
-            final_url
-            and title
-            and publisher
-            and publication_date
-            and is_approved_source_url(final_url)
-        ):
-            skipped += 1
-            audit_event(
-                "trusted_guideline_candidate_skipped",
-                reason="missing_or_untrusted_metadata",
-            )
-            continue
-
-        try:
-            downloaded = downloader(final_url)
-            content_hash = hashlib.sha256(downloaded.content).hexdigest()
-            version = f"official-{publication_date}-{content_hash[:12]}"
-            document = store.add_pending_document(
-                downloaded=downloaded,
-                metadata=DocumentMetadata(
-                    title=title,
-                    publisher=publisher,
-                    publication_date=publication_date,
-                    version=version,
-                    effective_from=publication_date,
-                ),
-                embedding_model=embedder.model,
-            )
-            activated = store.activate_trusted_official(
-                document_id=document["document_id"],
-                expected_content_hash=document["content_hash"],
-                embedder=embedder,
-            )
-            ingested.append({
-                "document_id": activated["document_id"],
-                "final_url": activated["final_url"],
-                "version": activated["version"],
-                "content_hash": activated["content_hash"],
-                "review_status": activated["review_status"],
-            })
-        except (GuidelineIngestionError, OSError, ValueError) as error:
-            skipped += 1
-            audit_event(
-                "trusted_guideline_candidate_skipped",
-                reason=type(error).__name__,
-            )
+    # Up to the document cap runs at once; a failed candidate frees its slot
+    # for the next-ranked one, so the cap and ranking still hold.
+    ingested_by_rank: Dict[int, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(
+        max_workers=safe_max_documents, thread_name_prefix="guideline-ingest"
+    ) as executor:
+        running: Dict[Future, int] = {}
+        remaining = iter(enumerate(candidates))
+        exhausted = False
+        while True:
+            while (
+                not exhausted
+                and len(ingested_by_rank) + len(running) < safe_max_documents
+            ):
+                rank, candidate = next(remaining, (None, None))
+                if rank is None:
+                    exhausted = True
+                    break
+                fields = _trusted_candidate_fields(candidate, today)
+                if fields is None:
+                    skipped += 1
+                    if isinstance(candidate, dict):
+                        audit_event(
+                            "trusted_guideline_candidate_skipped",
+                            reason="missing_or_untrusted_metadata",
+                        )
+                    continue
+                running[executor.submit(
+                    _ingest_trusted_candidate, store, embedder, downloader, *fields
+                )] = rank
+            if not running:
+                break
+            done, _pending = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                rank = running.pop(future)
+                try:
+                    ingested_by_rank[rank] = future.result()
+                except (GuidelineIngestionError, OSError, ValueError) as error:
+                    skipped += 1
+                    audit_event(
+                        "trusted_guideline_candidate_skipped",
+                        reason=type(error).__name__,
+                    )
+    ingested = [ingested_by_rank[rank] for rank in sorted(ingested_by_rank)]
 
     status = "success" if ingested else "not_found"
     audit_event(
@@ -1051,6 +2496,90 @@ def auto_ingest_trusted_guidelines(
     }
 
 
+def _trusted_candidate_fields(
+    candidate: Any, today: date
+) -> Optional[Tuple[str, str, str, str]]:
+    """Return ``(final_url, title, publisher, publication_date)`` or ``None``."""
+    if not isinstance(candidate, dict):
+        return None
+    final_url = str(candidate.get("final_url") or candidate.get("url") or "")
+    title = str(candidate.get("title") or "").strip()
+    publisher = str(candidate.get("source_name") or "").strip()
+    publication_date = _strict_publication_date(
+        candidate.get("publication_date"), today
+    )
+    if not (
+        final_url
+        and title
+        and publisher
+        and publication_date
+        and is_approved_source_url(final_url)
+    ):
+        return None
+    return final_url, title, publisher, publication_date
+
+
+def _ingest_trusted_candidate(
+    store: CuratedGuidelineStore,
+    embedder: Any,
+    downloader: Callable[[str], DownloadedDocument],
+    final_url: str,
+    title: str,
+    publisher: str,
+    publication_date: str,
+) -> Dict[str, Any]:
+    """Download, version, extract, embed and activate one official candidate."""
+    downloaded = downloader(final_url)
+    try:
+        version = f"official-{publication_date}-{downloaded.sha256()[:12]}"
+        document = store.add_pending_document(
+            downloaded=downloaded,
+            metadata=DocumentMetadata(
+                title=title,
+                publisher=publisher,
+                publication_date=publication_date,
+                version=version,
+                effective_from=publication_date,
+            ),
+            embedding_model=embedder.model,
+        )
+    finally:
+        downloaded.close()
+    activated = store.activate_trusted_official(
+        document_id=document["document_id"],
+        expected_content_hash=document["content_hash"],
+        embedder=embedder,
+    )
+    return {
+        "document_id": activated["document_id"],
+        "final_url": activated["final_url"],
+        "version": activated["version"],
+        "content_hash": activated["content_hash"],
+        "review_status": activated["review_status"],
+    }
+
+
+def _default_embedder(
+    endpoint: str,
+    api_key: str,
+    embedding_model: str,
+    store: CuratedGuidelineStore,
+    query_cache_options: Optional[Dict[str, Any]],
+) -> Any:
+    embedder = OpenAIEmbedder(endpoint, api_key, embedding_model)
+    if query_cache_options is None:
+        return embedder
+    return CachingEmbedder(embedder, store.pool, **query_cache_options)
+
+
+def _embed_query(embedder: Any, question: str) -> List[float]:
+    """Prefer a cached single-query path when the embedder provides one."""
+    embed_query = getattr(embedder, "embed_query", None)
+    if callable(embed_query):
+        return embed_query(question)
+    return embedder.embed([question])[0]
+
+
 def retrieve_curated_guidelines(
     question: str,
     postgres_uri: str,
@@ -1062,19 +2591,44 @@ def retrieve_curated_guidelines(
     embedder: Optional[Any] = None,
     on_date: Optional[date] = None,
     store: Optional[CuratedGuidelineStore] = None,
+    store_options: Optional[Dict[str, Any]] = None,
+    retrieval_mode: str = VECTOR_RETRIEVAL_MODE,
+    query_cache_options: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    """Retrieve child chunks and return bounded parent/neighbor evidence."""
+    """Retrieve child chunks and return bounded parent/neighbor evidence.
+
+    ``hybrid`` mode fuses the vector ranking with BM25 over the lexical
+    posting table and falls back to BM25 alone when the embedding provider
+    fails, so exact drug or guideline names stay answerable.
+    """
     if contains_sensitive_patient_data(question):
         audit_event("curated_guideline_rejected_sensitive_input", level="warning")
         return {"status": "privacy_denied", "response": SENSITIVE_SEARCH_REFUSAL}
     try:
-        active_store = store or get_curated_guideline_store(postgres_uri)
-        active_embedder = embedder or OpenAIEmbedder(endpoint, api_key, embedding_model)
+        active_store = store or get_curated_guideline_store(
+            postgres_uri, **(store_options or {})
+        )
+        active_embedder = embedder or _default_embedder(
+            endpoint, api_key, embedding_model, active_store, query_cache_options
+        )
         model = active_embedder.model
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unsupported retrieval mode: {retrieval_mode}")
+        hybrid = retrieval_mode == HYBRID_RETRIEVAL_MODE
         if not active_store.has_effective_documents(model, on_date):
             audit_event("curated_guideline_corpus_empty")
             return {"status": "corpus_empty", "response": CURATED_CORPUS_EMPTY}
-        query_vector = active_embedder.embed([question.strip()])[0]
+        try:
+            query_vector = _embed_query(active_embedder, question.strip())
+        except EmbeddingProviderError as error:
+            if not hybrid:
+                raise
+            audit_event(
+                "curated_guideline_lexical_fallback",
+                level="warning",
+                reason=type(error).__name__,
+            )
+            query_vector = None
         safe_top_k = max(1, min(int(top_k), 3))
         matches = active_store.search(
             query_vector=query_vector,
@@ -1082,6 +2636,7 @@ def retrieve_curated_guidelines(
             top_k=safe_top_k,
             min_score=min_score,
             on_date=on_date,
+            lexical_query=question.strip() if hybrid else None,
         )
     except (
         EmbeddingProviderError,
@@ -1157,15 +2712,50 @@ def retrieve_guidelines_with_auto_ingest(
     store: Optional[CuratedGuidelineStore] = None,
     searcher: Callable[..., Dict[str, Any]] = search_medical_guidelines,
     downloader: Callable[[str], DownloadedDocument] = download_approved_document,
+    store_options: Optional[Dict[str, Any]] = None,
+    retrieval_mode: str = VECTOR_RETRIEVAL_MODE,
+    query_cache_options: Optional[Dict[str, Any]] = None,
+    auto_ingest_mode: str = SYNC_AUTO_INGEST_MODE,
+    search_cache_options: Optional[Dict[str, Any]] = None,
+    search_guard_backend: str = MEMORY_SEARCH_GUARD_BACKEND,
 ) -> Dict[str, Any]:
-    """Retrieve locally, then auto-index strict official documents on a miss."""
+    """Retrieve locally, then auto-index strict official documents on a miss.
+
+    In ``queue`` mode a miss is handed to the ingestion job queue and answered
+    immediately with an ``indexing`` status instead of ingesting in-line.
+    ``search_cache_options`` switches discovery to the search cache shared
+    through the corpus database, and a ``postgres`` ``search_guard_backend``
+    does the same for the Tavily rate limit, budget and circuit breaker.
+    """
     if contains_sensitive_patient_data(question):
         return {"status": "privacy_denied", "response": SENSITIVE_SEARCH_REFUSAL}
     try:
-        active_store = store or get_curated_guideline_store(postgres_uri)
-        active_embedder = embedder or OpenAIEmbedder(
-            endpoint, api_key, embedding_model
+        if auto_ingest_mode not in AUTO_INGEST_MODES:
+            raise ValueError(
+                f"Unsupported auto-ingest mode: {auto_ingest_mode!r}"
+            )
+        if search_guard_backend not in SEARCH_GUARD_BACKENDS:
+            raise ValueError(
+                f"Unsupported search guard backend: {search_guard_backend!r}"
+            )
+        active_store = store or get_curated_guideline_store(
+            postgres_uri, **(store_options or {})
         )
+        active_embedder = embedder or _default_embedder(
+            endpoint, api_key, embedding_model, active_store, query_cache_options
+        )
+        if search_cache_options is not None:
+            search_options = {
+                **(search_options or {}),
+                "cache": get_shared_search_cache(
+                    active_store.pool, **search_cache_options
+                ),
+            }
+        if search_guard_backend == POSTGRES_SEARCH_GUARD_BACKEND:
+            search_options = {
+                **(search_options or {}),
+                "guard": get_shared_provider_guard(active_store.pool),
+            }
     except (PostgresError, PoolTimeout, EmbeddingProviderError, ValueError) as error:
         logger.warning("Trusted guideline setup failed: %s", type(error).__name__)
         return {"status": "unavailable", "response": CURATED_RETRIEVAL_UNAVAILABLE}
@@ -1181,12 +2771,15 @@ def retrieve_guidelines_with_auto_ingest(
         embedder=active_embedder,
         on_date=on_date,
         store=active_store,
+        retrieval_mode=retrieval_mode,
     )
     if (
         not auto_ingest_enabled
         or initial.get("status") not in {"corpus_empty", "not_found"}
     ):
         return initial
+    if auto_ingest_mode == QUEUE_AUTO_INGEST_MODE:
+        return _enqueue_auto_ingest(initial, question, active_store)
 
     ingestion = auto_ingest_trusted_guidelines(
         question=question,
@@ -1215,21 +2808,144 @@ def retrieve_guidelines_with_auto_ingest(
         embedder=active_embedder,
         on_date=on_date,
         store=active_store,
+        retrieval_mode=retrieval_mode,
     )
     result["auto_ingest"] = ingestion
     return result
 
 
+def _enqueue_auto_ingest(
+    initial: Dict[str, Any], question: str, store: CuratedGuidelineStore
+) -> Dict[str, Any]:
+    """Queue a corpus miss for the ingestion worker and return at once."""
+    try:
+        job = enqueue_ingestion_job(store.pool, question)
+    except (PostgresError, PoolTimeout, ValueError) as error:
+        logger.warning("Guideline ingestion enqueue failed: %s", type(error).__name__)
+        initial["auto_ingest"] = {
+            "status": "unavailable", "ingested": [], "skipped": 0
+        }
+        return initial
+    audit_event("curated_guideline_ingestion_queued", job_status=job["status"])
+    ingestion = {"status": job["status"], "ingested": [], "skipped": 0}
+    if job["status"] == "recently_attempted":
+        initial["auto_ingest"] = ingestion
+        return initial
+    return {
+        "status": "indexing",
+        "response": CURATED_INDEXING_IN_PROGRESS,
+        "auto_ingest": ingestion,
+    }
+
+
+def run_guideline_ingestion_worker(
+    store: CuratedGuidelineStore,
+    retrieval_options: Dict[str, Any],
+    retriever: Optional[Callable[..., Dict[str, Any]]] = None,
+    drain: bool = False,
+    stop: Optional[Event] = None,
+    poll_seconds: float = INGESTION_WORKER_POLL_SECONDS,
+    lease_seconds: float = INGESTION_JOB_LEASE_SECONDS,
+    max_attempts: int = INGESTION_JOB_MAX_ATTEMPTS,
+    retry_delay_seconds: float = INGESTION_JOB_RETRY_DELAY_SECONDS,
+    sleeper: Callable[[float], None] = time.sleep,
+) -> Dict[str, int]:
+    """Claim queued topics and ingest them through the corpus-first pipeline.
+
+    Each job reruns synchronous retrieval, so a topic covered since it was
+    queued makes no Tavily call. Transient discovery failures are retried
+    with exponential delay up to ``max_attempts``. With ``drain`` the worker
+    returns once no job is ready; otherwise it polls until ``stop`` is set.
+    """
+    active_retriever = retriever or retrieve_guidelines_with_auto_ingest
+    options = dict(retrieval_options)
+    options.update(
+        store=store,
+        auto_ingest_enabled=True,
+        auto_ingest_mode=SYNC_AUTO_INGEST_MODE,
+    )
+    counts = {"processed": 0, "done": 0, "retried": 0, "failed": 0}
+    while stop is None or not stop.is_set():
+        job = claim_ingestion_job(store.pool, lease_seconds=lease_seconds)
+        if job is None:
+            if drain:
+                break
+            sleeper(poll_seconds)
+            continue
+        counts["processed"] += 1
+        documents = 0
+        if job.topic is None or job.attempts > max_attempts:
+            result_status = "attempts_exhausted"
+        else:
+            try:
+                result = active_retriever(question=job.topic, **options)
+            except (
+                EmbeddingProviderError,
+                GuidelineIngestionError,
+                OSError,
+                PostgresError,
+                PoolTimeout,
+                ValueError,
+            ) as error:
+                logger.warning(
+                    "Guideline ingestion job failed: %s", type(error).__name__
+                )
+                result = {"status": "unavailable"}
+            ingestion = result.get("auto_ingest", {})
+            if not isinstance(ingestion, dict):
+                ingestion = {}
+            ingested = ingestion.get("ingested", [])
+            documents = len(ingested) if isinstance(ingested, list) else 0
+            result_status = (
+                ingestion.get("status")
+                if ingestion.get("status") in TRANSIENT_INGESTION_STATUSES
+                else result.get("status", "unknown")
+            )
+        transient = result_status in TRANSIENT_INGESTION_STATUSES
+        if transient and job.attempts < max_attempts:
+            outcome = "retried"
+            finish_ingestion_job(
+                store.pool,
+                job,
+                result_status,
+                retry_delay_seconds=retry_delay_seconds * 2 ** (job.attempts - 1),
+            )
+        else:
+            failed = transient or result_status == "attempts_exhausted"
+            outcome = "failed" if failed else "done"
+            finish_ingestion_job(
+                store.pool,
+                job,
+                result_status,
+                documents_ingested=documents,
+                failed=failed,
+            )
+        counts[outcome] += 1
+        audit_event(
+            "guideline_ingestion_job_finished",
+            outcome=outcome,
+            result_status=result_status,
+            attempts=job.attempts,
+            documents_ingested=documents,
+        )
+    return counts
+
+
 def prewarm_guideline_corpus(
     topics: Sequence[str],
     retrieval_options: Dict[str, Any],
     retriever: Optional[Callable[..., Dict[str, Any]]] = None,
+    max_workers: int = 1,
 ) -> Dict[str, Any]:
     """Populate missing high-value topics outside the user request path.
 
     This coordinator deliberately reuses the runtime corpus-first pipeline:
     covered topics make no Tavily call, while misses use the same bounded
     discovery, full-document validation and ingestion policy as production.
+    Up to ``max_workers`` topics run at once. They share the process-wide
+    discovery rate, budget and circuit controls, and the first terminal
+    status stops every worker from starting another topic. The report lists
+    processed topics in input order.
     """
     normalized_topics: List[str] = []
     seen = set()
@@ -1251,6 +2967,32 @@ def prewarm_guideline_corpus(
     active_retriever = retriever or retrieve_guidelines_with_auto_ingest
     options = dict(retrieval_options)
     options["auto_ingest_enabled"] = True
+    options["auto_ingest_mode"] = SYNC_AUTO_INGEST_MODE
+    stop = Event()
+    results: Dict[int, Dict[str, Any]] = {}
+
+    def warm(index: int, topic: str) -> None:
+        if stop.is_set():
+            return
+        result = active_retriever(question=topic, **options)
+        results[index] = result
+        if _prewarm_terminal_status(result) is not None:
+            stop.set()
+
+    safe_workers = max(1, min(int(max_workers), len(normalized_topics)))
+    if safe_workers == 1:
+        for index, topic in enumerate(normalized_topics):
+            warm(index, topic)
+    else:
+        with ThreadPoolExecutor(
+            max_workers=safe_workers, thread_name_prefix="guideline-prewarm"
+        ) as executor:
+            for future in [
+                executor.submit(warm, index, topic)
+                for index, topic in enumerate(normalized_topics)
+            ]:
+                future.result()
+
     details = []
     counts = {
         "already_covered": 0,
@@ -1259,12 +3001,8 @@ def prewarm_guideline_corpus(
         "documents_ingested": 0,
     }
     stopped_reason = None
-    terminal_ingestion_statuses = {
-        "unavailable", "rate_limited", "budget_exhausted", "circuit_open"
-    }
-
-    for topic in normalized_topics:
-        result = active_retriever(question=topic, **options)
+    for index in sorted(results):
+        result = results[index]
         ingestion = result.get("auto_ingest", {})
         if not isinstance(ingestion, dict):
             ingestion = {}
@@ -1282,23 +3020,14 @@ def prewarm_guideline_corpus(
             outcome = "not_covered"
             counts["not_covered"] += 1
         details.append({
-            "topic": topic,
+            "topic": normalized_topics[index],
             "outcome": outcome,
             "retrieval_status": result.get("status", "unknown"),
             "ingestion_status": ingestion.get("status"),
             "documents_ingested": document_count,
         })
-
-        ingestion_status = ingestion.get("status")
-        retrieval_status = result.get("status")
-        terminal_status = (
-            ingestion_status
-            if ingestion_status in terminal_ingestion_statuses
-            else retrieval_status
-        )
-        if terminal_status in terminal_ingestion_statuses:
-            stopped_reason = terminal_status
-            break
+        if stopped_reason is None:
+            stopped_reason = _prewarm_terminal_status(result)
 
     successful = counts["already_covered"] + counts["warmed"]
     completed_all = len(details) == len(normalized_topics)
@@ -1328,10 +3057,25 @@ def prewarm_guideline_corpus(
     return report
 
 
+def _prewarm_terminal_status(result: Dict[str, Any]) -> Optional[str]:
+    """Return the status that should stop a prewarm run, if any."""
+    ingestion = result.get("auto_ingest", {})
+    if not isinstance(ingestion, dict):
+        ingestion = {}
+    for status in (ingestion.get("status"), result.get("status")):
+        if status in TRANSIENT_INGESTION_STATUSES:
+            return status
+    return None
+
+
 def extract_document_sections(
-    content: bytes, content_type: str
+    content: bytes, content_type: str, pdf_workers: int = PDF_EXTRACTION_WORKERS
 ) -> List[ExtractedSection]:
-    """Extract logical parent sections with hierarchy where the format exposes it."""
+    """Extract logical parent sections with hierarchy where the format exposes it.
+
+    Large PDFs are split into page ranges across up to ``pdf_workers``
+    processes; the result is identical to a serial pass.
+    """
     normalized_type = content_type.split(";", 1)[0].strip().lower()
     if normalized_type in {"text/html", "application/xhtml+xml"}:
         parser = _SectionHTMLParser()
@@ -1350,7 +3094,9 @@ def extract_document_sections(
             ) from error
         try:
             reader = PdfReader(BytesIO(content))
-            return _extract_pdf_document_sections(reader)
+            return _extract_pdf_document_sections(
+                reader, content=content, max_workers=pdf_workers
+            )
         except Exception as error:  # pypdf exposes multiple parser exceptions
             raise GuidelineIngestionError("PDF full-text extraction failed") from error
     raise GuidelineIngestionError(f"Unsupported content type: {normalized_type}")
@@ -1389,7 +3135,6 @@ def build_child_chunks(
         units = _sentence_units(text, content_budget)
         packed = _pack_sentence_units(units, content_budget, overlap_tokens)
         for chunk_index, chunk_text in enumerate(packed):
-            embedding_text = f"{header}\n\n{chunk_text}"
             chunks.append(GuidelineChunk(
                 parent_ordinal=parent_ordinal,
                 chunk_index=chunk_index,
@@ -1400,10 +3145,13 @@ def build_child_chunks(
                 )[:300],
                 section_path=section.section_path[:1000],
                 content=chunk_text,
-                embedding_text=embedding_text,
-                token_count=_count_tokens(embedding_text),
+                embedding_text=f"{header}\n\n{chunk_text}",
+                token_count=0,
             ))
-    return chunks
+    counts = _count_tokens_batch([chunk.embedding_text for chunk in chunks])
+    return [
+        replace(chunk, token_count=count) for chunk, count in zip(chunks, counts)
+    ]
 
 
 def chunk_sections(
@@ -1536,13 +3284,87 @@ def _extract_pdf_sections(reader: Any) -> List[Tuple[str, str]]:
     ]
 
 
-def _extract_pdf_document_sections(reader: Any) -> List[ExtractedSection]:
-    """Prefer PDF outline hierarchy, then font/layout cues, then page fallback."""
+def _extract_pdf_document_sections(
+    reader: Any, content: Optional[bytes] = None, max_workers: int = 1
+) -> List[ExtractedSection]:
+    """Prefer PDF outline hierarchy, then font/layout cues, then page fallback.
+
+    Outline headings are resolved once here; with ``content`` and more than
+    one worker, page ranges are extracted in a process pool and reassembled
+    in page order before adjacent sections are merged.
+    """
     headings = _pdf_outline_headings(reader)
-    sections: List[ExtractedSection] = []
+    page_paths: List[Tuple[str, ...]] = []
     current_path: Tuple[str, ...] = ()
-    for page_number, page in enumerate(reader.pages):
+    for page_number in range(len(reader.pages)):
         current_path = headings.get(page_number, current_path)
+        page_paths.append(current_path)
+
+    ranges = _pdf_page_ranges(len(page_paths), max_workers)
+    if content is None or len(ranges) <= 1:
+        sections = _extract_pdf_pages(reader.pages, 0, page_paths)
+    else:
+        sections = _extract_pdf_ranges_in_pool(
+            content, ranges, page_paths, max_workers
+        )
+    return _merge_adjacent_sections(sections)
+
+
+def _pdf_page_ranges(page_count: int, max_workers: int) -> List[Tuple[int, int]]:
+    """Split pages into one contiguous range per worker.
+
+    Every task ships the whole PDF to its worker and reparses it there, so
+    more ranges than workers would only repeat that copy and parse.
+    """
+    if max_workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        return [(0, page_count)]
+    parts = min(page_count, max_workers)
+    bounds = [page_count * index // parts for index in range(parts + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _extract_pdf_ranges_in_pool(
+    content: bytes,
+    ranges: Sequence[Tuple[int, int]],
+    page_paths: Sequence[Tuple[str, ...]],
+    max_workers: int,
+) -> List[ExtractedSection]:
+    try:
+        executor = _pdf_process_pool(max_workers)
+        futures = [
+            executor.submit(
+                _extract_pdf_page_range, content, start, page_paths[start:end]
+            )
+            for start, end in ranges
+        ]
+        return [section for future in futures for section in future.result()]
+    except (BrokenProcessPool, OSError) as error:
+        # Pools can be unavailable in restricted runtimes; a serial pass
+        # returns the same sections.
+        logger.warning(
+            "PDF process pool unavailable; extracting serially: %s",
+            type(error).__name__,
+        )
+        _discard_pdf_process_pool()
+        return _extract_pdf_page_range(content, 0, page_paths)
+
+
+def _extract_pdf_page_range(
+    content: bytes, start: int, page_paths: Sequence[Tuple[str, ...]]
+) -> List[ExtractedSection]:
+    """Process-pool entry point: reopen the PDF and extract one page range."""
+    from pypdf import PdfReader  # pylint: disable=import-outside-toplevel
+
+    reader = PdfReader(BytesIO(content))
+    return _extract_pdf_pages(reader.pages, start, page_paths)
+
+
+def _extract_pdf_pages(
+    pages: Any, start: int, page_paths: Sequence[Tuple[str, ...]]
+) -> List[ExtractedSection]:
+    sections: List[ExtractedSection] = []
+    for page_number, current_path in enumerate(page_paths, start=start):
+        page = pages[page_number]
         text = _normalize_extracted_text(page.extract_text() or "")
         if not text:
             continue
@@ -1561,7 +3383,41 @@ def _extract_pdf_document_sections(reader: Any) -> List[ExtractedSection]:
             level=1,
             content=text,
         )])
-    return _merge_adjacent_sections(sections)
+    return sections
+
+
+_PDF_POOL_LOCK = Lock()
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_WORKERS = 0
+
+
+def _pdf_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Return a long-lived spawn-based pool so worker start-up is paid once."""
+    global _PDF_POOL, _PDF_POOL_WORKERS  # pylint: disable=global-statement
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None or _PDF_POOL_WORKERS != max_workers:
+            if _PDF_POOL is not None:
+                _PDF_POOL.shutdown(wait=False, cancel_futures=True)
+            # Spawned workers do not inherit the pool threads or sockets of
+            # the serving process.
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _PDF_POOL_WORKERS = max_workers
+        return _PDF_POOL
+
+
+def _discard_pdf_process_pool() -> None:
+    global _PDF_POOL, _PDF_POOL_WORKERS  # pylint: disable=global-statement
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is not None:
+            _PDF_POOL.shutdown(wait=False, cancel_futures=True)
+        _PDF_POOL = None
+        _PDF_POOL_WORKERS = 0
+
+
+atexit.register(_discard_pdf_process_pool)
 
 
 def _extract_plain_text_sections(text: str) -> List[ExtractedSection]:
@@ -1755,11 +3611,21 @@ def _token_encoder() -> Any:
 class _LexicalTokenEncoder:
     """Offline fallback; exact model tokenization resumes when cache is present."""
 
+    name = "lexical-fallback"
     _PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
 
     def encode(self, text: str) -> List[str]:
         return self._PATTERN.findall(text)
 
+    encode_ordinary = encode
+
+    def encode_ordinary_batch(
+        self, texts: Sequence[str], num_threads: int = TOKENIZER_THREADS
+    ) -> List[List[str]]:
+        # The regex holds the GIL, so threads would not help here.
+        del num_threads
+        return [self._PATTERN.findall(text) for text in texts]
+
     @staticmethod
     def decode(tokens: Sequence[str]) -> str:
         text = ""
@@ -1772,69 +3638,144 @@ class _LexicalTokenEncoder:
         return text
 
 
+_TOKEN_COUNT_LOCK = Lock()
+_TOKEN_COUNTS: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+
+
 def _count_tokens(text: str) -> int:
-    return len(_token_encoder().encode(text))
+    return _count_tokens_batch([text])[0]
+
+
+def _count_tokens_batch(texts: Sequence[str]) -> List[int]:
+    """Return token counts, memoized in a bounded LRU keyed by text hash.
+
+    Misses are encoded together; larger batches use the encoder's threaded
+    ``encode_ordinary_batch``.
+    """
+    encoder = _token_encoder()
+    encoder_name = str(getattr(encoder, "name", type(encoder).__name__))
+    keys = [
+        (
+            encoder_name,
+            hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest(),
+        )
+        for text in texts
+    ]
+    counts: List[Optional[int]] = [None] * len(texts)
+    missing: Dict[Tuple[str, bytes], List[int]] = {}
+    with _TOKEN_COUNT_LOCK:
+        for index, key in enumerate(keys):
+            count = _TOKEN_COUNTS.get(key)
+            if count is None:
+                missing.setdefault(key, []).append(index)
+            else:
+                _TOKEN_COUNTS.move_to_end(key)
+                counts[index] = count
+    if missing:
+        pending = [texts[indices[0]] for indices in missing.values()]
+        if len(pending) >= TOKENIZER_BATCH_MIN_TEXTS:
+            encoded = encoder.encode_ordinary_batch(
+                pending, num_threads=TOKENIZER_THREADS
+            )
+        else:
+            encoded = [encoder.encode_ordinary(text) for text in pending]
+        with _TOKEN_COUNT_LOCK:
+            for (key, indices), tokens in zip(missing.items(), encoded):
+                for index in indices:
+                    counts[index] = len(tokens)
+                _TOKEN_COUNTS[key] = len(tokens)
+                _TOKEN_COUNTS.move_to_end(key)
+            while len(_TOKEN_COUNTS) > TOKEN_COUNT_CACHE_ENTRIES:
+                _TOKEN_COUNTS.popitem(last=False)
+    return [int(count or 0) for count in counts]
 
 
 def _truncate_to_tokens(text: str, limit: int) -> str:
-    tokens = _token_encoder().encode(text)
-    return text if len(tokens) <= limit else _token_encoder().decode(tokens[:limit])
+    if _count_tokens(text) <= limit:
+        return text
+    encoder = _token_encoder()
+    return encoder.decode(encoder.encode_ordinary(text)[:limit])
+
 
+def _sentence_units(text: str, token_budget: int) -> List[Tuple[str, int]]:
+    """Split text into ``(unit, token_count)`` pairs within ``token_budget``.
 
-def _sentence_units(text: str, token_budget: int) -> List[str]:
+    Sentences fall back to clauses, then to hard token windows; each sentence
+    and clause is encoded once and the count is reused by the packer.
+    """
+    encoder = _token_encoder()
     sentences = [
         item.strip()
         for item in re.split(r"(?<=[.!?。！？])\s+|\n+", text)
         if item.strip()
     ]
-    units: List[str] = []
-    for sentence in sentences:
-        if _count_tokens(sentence) <= token_budget:
-            units.append(sentence)
+    units: List[Tuple[str, int]] = []
+    for sentence, sentence_count in zip(sentences, _count_tokens_batch(sentences)):
+        if sentence_count <= token_budget:
+            units.append((sentence, sentence_count))
             continue
         clauses = [
             item.strip()
             for item in re.split(r"(?<=[;:])\s+|(?<=,)\s+", sentence)
             if item.strip()
         ]
-        for clause in clauses:
-            if _count_tokens(clause) <= token_budget:
-                units.append(clause)
+        for clause, clause_count in zip(clauses, _count_tokens_batch(clauses)):
+            if clause_count <= token_budget:
+                units.append((clause, clause_count))
                 continue
-            tokens = _token_encoder().encode(clause)
+            tokens = encoder.encode_ordinary(clause)
             step = max(1, token_budget - min(20, token_budget // 10))
+            pieces = []
             for start in range(0, len(tokens), step):
-                piece = _token_encoder().decode(tokens[start:start + token_budget]).strip()
+                piece = encoder.decode(tokens[start:start + token_budget]).strip()
                 if piece:
-                    units.append(piece)
+                    pieces.append(piece)
                 if start + token_budget >= len(tokens):
                     break
+            units.extend(zip(pieces, _count_tokens_batch(pieces)))
     return units
 
 
 def _pack_sentence_units(
-    units: Sequence[str], token_budget: int, overlap_tokens: int
+    units: Sequence[Tuple[str, int]], token_budget: int, overlap_tokens: int
 ) -> List[str]:
+    """Greedily pack units into chunks, carrying a bounded tail as overlap.
+
+    Chunks are a sliding window ``units[start:index]``. Both encoders split
+    pre-tokens at the joining space, so ``" ".join`` of a window costs the
+    first unit's count plus each later unit's count with its leading space.
+    Keeping that running total makes packing linear while producing the same
+    chunks as re-encoding every candidate.
+    """
+    texts = [unit for unit, _count in units]
+    alone = [count for _unit, count in units]
+    spaced = _count_tokens_batch([f" {unit}" for unit in texts])
     packed: List[str] = []
-    current: List[str] = []
-    for unit in units:
-        candidate = " ".join((*current, unit))
-        if current and _count_tokens(candidate) > token_budget:
-            packed.append(" ".join(current))
-            overlap: List[str] = []
+    start = 0
+    joined = 0
+    for index in range(len(texts)):
+        if index > start and joined + spaced[index] > token_budget:
+            packed.append(" ".join(texts[start:index]))
+            overlap_start = index
             overlap_count = 0
-            for previous in reversed(current):
-                previous_tokens = _count_tokens(previous)
-                if overlap_count + previous_tokens > overlap_tokens:
-                    break
-                overlap.insert(0, previous)
-                overlap_count += previous_tokens
-            current = overlap
-            while current and _count_tokens(" ".join((*current, unit))) > token_budget:
-                current.pop(0)
-        current.append(unit)
-    if current:
-        packed.append(" ".join(current))
+            while (
+                overlap_start > start
+                and overlap_count + alone[overlap_start - 1] <= overlap_tokens
+            ):
+                overlap_start -= 1
+                overlap_count += alone[overlap_start]
+            start = overlap_start
+            joined = (
+                alone[start] + sum(spaced[start + 1:index]) if start < index else 0
+            )
+            while start < index and joined + spaced[index] > token_budget:
+                joined -= alone[start]
+                start += 1
+                if start < index:
+                    joined += alone[start] - spaced[start]
+        joined = joined + spaced[index] if index > start else alone[index]
+    if start < len(texts):
+        packed.append(" ".join(texts[start:]))
     return packed
 
 
@@ -1848,7 +3789,10 @@ def _expand_match_context(
     result["matched_content"] = result["content"]
     result["section_path"] = result.get("section_path") or result["heading"]
     parent_content = result.get("parent_content") or ""
-    if parent_content and _count_tokens(parent_content) <= parent_context_max_tokens:
+    parent_tokens = result.get("parent_token_count")
+    if parent_content and parent_tokens is None:
+        parent_tokens = _count_tokens(parent_content)
+    if parent_content and parent_tokens <= parent_context_max_tokens:
         result["content"] = parent_content
         result["context_mode"] = "parent"
         result["context_section_ids"] = [result["section_id"]]
@@ -1968,31 +3912,3 @@ def _validate_embedding_batch(
         for value in vector
     ):
         raise GuidelineIngestionError("Embeddings must contain finite numbers")
-
-
-def _cosine_similarity(left: Sequence[float], right: Sequence[float]) -> float:
-    if len(left) != len(right) or not left:
-        return -1.0
-    left_values = [float(value) for value in left]
-    right_values = [float(value) for value in right]
-    if not all(math.isfinite(value) for value in left_values + right_values):
-        return -1.0
-    dot = sum(a * b for a, b in zip(left_values, right_values))
-    left_norm = math.sqrt(sum(value ** 2 for value in left_values))
-    right_norm = math.sqrt(sum(value ** 2 for value in right_values))
-    if left_norm == 0 or right_norm == 0:
-        return -1.0
-    return dot / (left_norm * right_norm)
-
-
-def _host_has_only_public_addresses(
-    host: str, resolver: Callable[..., Any]
-) -> bool:
-    try:
-        records = resolver(host, 443, type=socket.SOCK_STREAM)
-        addresses = {record[4][0] for record in records}
-        return bool(addresses) and all(
-            ipaddress.ip_address(address).is_global for address in addresses
-        )
-    except (OSError, ValueError, TypeError):
-        return False
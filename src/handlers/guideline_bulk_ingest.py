@@ -0,0 +1,385 @@
+"""Offline bulk ingestion of reviewed guideline files from a local manifest.
+
+Seeding an environment, or a node without network access, should not depend
+on downloading documents one URL at a time. A JSONL manifest names local files
+together with their version metadata and the SHA-256 a reviewer inspected.
+Files are hashed and staged as immutable ``pending_review`` versions, extracted
+and chunked across a process pool, embedded in large batches and activated as
+``approved`` a batch of documents per transaction. Re-running a manifest skips
+versions that were already approved, so a seed is reproducible.
+"""
+import hmac
+import json
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.handlers.curated_guidelines import (
+    DEFAULT_CHUNK_MAX_TOKENS,
+    DEFAULT_CHUNK_OVERLAP_TOKENS,
+    MAX_DOCUMENT_BYTES,
+    PDF_EXTRACTION_WORKERS,
+    RETRIEVABLE_REVIEW_STATUSES,
+    SUPPORTED_CONTENT_TYPES,
+    CuratedGuidelineStore,
+    DocumentMetadata,
+    DownloadedDocument,
+    ExtractedSection,
+    GuidelineChunk,
+    GuidelineIngestionError,
+    PreparedDocument,
+    build_child_chunks,
+    extract_document_sections,
+    guideline_document_id,
+)
+from src.handlers.security_guardrails import audit_event
+
+
+BULK_BATCH_DOCUMENTS = 16
+BULK_EXTRACTION_WORKERS = PDF_EXTRACTION_WORKERS
+CONTENT_TYPES_BY_SUFFIX = {
+    ".pdf": "application/pdf",
+    ".html": "text/html",
+    ".htm": "text/html",
+    ".xhtml": "application/xhtml+xml",
+    ".txt": "text/plain",
+    ".md": "text/plain",
+}
+
+
+@dataclass(frozen=True)
+class BulkManifestEntry:
+    """One manifest line resolved to a file inside the documents directory."""
+
+    line_number: int
+    path: Path
+    source_url: str
+    final_url: str
+    content_type: str
+    content_hash: str
+    metadata: DocumentMetadata
+
+
+def read_bulk_manifest(
+    manifest_path: str, documents_dir: Optional[str] = None
+) -> List[BulkManifestEntry]:
+    """Parse and validate every manifest line before any work starts.
+
+    Each line is a JSON object with ``path``, ``source_url``, ``sha256``,
+    ``title``, ``publisher``, ``publication_date``, ``version`` and
+    ``effective_from``; ``final_url``, ``content_type`` and
+    ``effective_until`` are optional. Paths are relative to ``documents_dir``
+    (default: the manifest's directory) and may not leave it.
+    """
+    manifest = Path(manifest_path)
+    root = Path(documents_dir or manifest.parent).resolve()
+    entries: List[BulkManifestEntry] = []
+    try:
+        lines = manifest.read_text(encoding="utf-8").splitlines()
+    except OSError as error:
+        raise GuidelineIngestionError(
+            f"Manifest cannot be read: {type(error).__name__}"
+        ) from error
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            entries.append(_manifest_entry(line_number, json.loads(line), root))
+        except (json.JSONDecodeError, GuidelineIngestionError) as error:
+            raise GuidelineIngestionError(
+                f"Manifest line {line_number}: {error}"
+            ) from error
+    if not entries:
+        raise GuidelineIngestionError("Manifest lists no documents")
+    return entries
+
+
+def _manifest_entry(
+    line_number: int, item: Any, root: Path
+) -> BulkManifestEntry:
+    if not isinstance(item, dict):
+        raise GuidelineIngestionError("Entry must be a JSON object")
+
+    def text(name: str, required: bool = True) -> Optional[str]:
+        value = item.get(name)
+        if value is None and not required:
+            return None
+        if not isinstance(value, str) or not value.strip():
+            raise GuidelineIngestionError(f"Missing {name}")
+        return value.strip()
+
+    path = (root / text("path")).resolve()
+    if not path.is_relative_to(root):
+        raise GuidelineIngestionError("Path leaves the documents directory")
+    content_type = (
+        text("content_type", required=False)
+        or CONTENT_TYPES_BY_SUFFIX.get(path.suffix.lower(), "")
+    ).split(";", 1)[0].strip().lower()
+    if content_type not in SUPPORTED_CONTENT_TYPES:
+        raise GuidelineIngestionError(
+            f"Unsupported document content type: {content_type or 'unknown'}"
+        )
+    content_hash = text("sha256").lower()
+    if len(content_hash) != 64 or any(
+        character not in "0123456789abcdef" for character in content_hash
+    ):
+        raise GuidelineIngestionError("sha256 must be a hex SHA-256 digest")
+    source_url = text("source_url")
+    return BulkManifestEntry(
+        line_number=line_number,
+        path=path,
+        source_url=source_url,
+        final_url=text("final_url", required=False) or source_url,
+        content_type=content_type,
+        content_hash=content_hash,
+        metadata=DocumentMetadata(
+            title=text("title"),
+            publisher=text("publisher"),
+            publication_date=text("publication_date"),
+            version=text("version"),
+            effective_from=text("effective_from"),
+            effective_until=text("effective_until", required=False),
+        ),
+    )
+
+
+def bulk_ingest_guidelines(
+    store: CuratedGuidelineStore,
+    entries: Sequence[BulkManifestEntry],
+    embedder: Any,
+    reviewer: str,
+    workers: int = BULK_EXTRACTION_WORKERS,
+    batch_documents: int = BULK_BATCH_DOCUMENTS,
+    max_chunk_tokens: int = DEFAULT_CHUNK_MAX_TOKENS,
+    chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    clock: Callable[[], float] = time.perf_counter,
+) -> Dict[str, Any]:
+    """Stage, extract, embed and activate manifest entries in batches.
+
+    A failed entry is reported and skipped; the remaining documents continue.
+    ``progress`` receives running counts and throughput after every batch.
+    """
+    if not reviewer.strip():
+        raise GuidelineIngestionError("Reviewer identity is required")
+    safe_workers = max(1, int(workers))
+    safe_batch = max(1, int(batch_documents))
+    started = clock()
+    details: List[Dict[str, Any]] = []
+    counts = {"activated": 0, "already_ingested": 0, "failed": 0, "chunks": 0}
+
+    executor: Optional[Executor] = None
+    if safe_workers > 1 and len(entries) > 1:
+        # Spawned workers do not inherit the connection pool of this process.
+        executor = ProcessPoolExecutor(
+            max_workers=safe_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    try:
+        for start in range(0, len(entries), safe_batch):
+            batch = entries[start:start + safe_batch]
+            staged: List[Tuple[BulkManifestEntry, str, bytes, Dict[str, Any]]] = []
+            for entry in batch:
+                detail = {
+                    "line": entry.line_number,
+                    "path": str(entry.path),
+                    "document_id": None,
+                    "status": "failed",
+                    "reason": None,
+                }
+                details.append(detail)
+                try:
+                    document_id, content = _stage_entry(store, entry, embedder)
+                except GuidelineIngestionError as error:
+                    detail["reason"] = str(error)
+                    continue
+                detail["document_id"] = document_id
+                if content is None:
+                    detail["status"] = "already_ingested"
+                    continue
+                staged.append((entry, document_id, content, detail))
+
+            extracted = _extract_batch(
+                executor,
+                [
+                    (content, entry.content_type, entry.metadata.title)
+                    for entry, _document_id, content, _detail in staged
+                ],
+                max_chunk_tokens,
+                chunk_overlap_tokens,
+            )
+            prepared = []
+            for (entry, document_id, _content, detail), result in zip(
+                staged, extracted
+            ):
+                if isinstance(result, GuidelineIngestionError):
+                    detail["reason"] = str(result)
+                    continue
+                parents, chunks = result
+                detail["chunks"] = len(chunks)
+                prepared.append(PreparedDocument(
+                    document_id, entry.content_hash, tuple(parents), tuple(chunks)
+                ))
+            if prepared:
+                try:
+                    outcomes = store.approve_extracted_batch(
+                        prepared, reviewer, embedder
+                    )
+                except GuidelineIngestionError as error:
+                    outcomes = {
+                        document.document_id: str(error) for document in prepared
+                    }
+                for _entry, document_id, _content, detail in staged:
+                    outcome = outcomes.get(document_id)
+                    if outcome == "activated":
+                        detail["status"] = "activated"
+                        counts["chunks"] += detail.get("chunks", 0)
+                    elif outcome is not None:
+                        detail["reason"] = outcome
+
+            for status in ("activated", "already_ingested", "failed"):
+                counts[status] = sum(
+                    detail["status"] == status for detail in details
+                )
+            if progress is not None:
+                progress(_throughput(
+                    len(details), len(entries), counts, clock() - started
+                ))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if counts["failed"] == 0:
+        status = "success"
+    elif counts["activated"] or counts["already_ingested"]:
+        status = "partial"
+    else:
+        status = "failed"
+    report = {
+        "status": status,
+        **_throughput(len(details), len(entries), counts, clock() - started),
+        "documents": details,
+    }
+    audit_event(
+        "curated_guideline_bulk_ingest_completed",
+        status=status,
+        documents_total=len(entries),
+        activated=counts["activated"],
+        already_ingested=counts["already_ingested"],
+        failed=counts["failed"],
+    )
+    return report
+
+
+def _stage_entry(
+    store: CuratedGuidelineStore, entry: BulkManifestEntry, embedder: Any
+) -> Tuple[str, Optional[bytes]]:
+    """Verify a file's hash and store it pending; ``None`` if already approved."""
+    try:
+        if entry.path.stat().st_size > MAX_DOCUMENT_BYTES:
+            raise GuidelineIngestionError("Document exceeds the size limit")
+        content = entry.path.read_bytes()
+    except OSError as error:
+        raise GuidelineIngestionError(
+            f"Document cannot be read: {type(error).__name__}"
+        ) from error
+    downloaded = DownloadedDocument(
+        entry.source_url, entry.final_url, entry.content_type, content=content
+    )
+    if not content or not hmac.compare_digest(
+        downloaded.sha256(), entry.content_hash
+    ):
+        raise GuidelineIngestionError(
+            "File content does not match the reviewed sha256"
+        )
+    document_id = guideline_document_id(
+        entry.source_url, entry.metadata.version, entry.content_hash
+    )
+    try:
+        existing = store.get_document(document_id)
+    except GuidelineIngestionError:
+        existing = None
+    if existing is None:
+        store.add_pending_document(
+            downloaded=downloaded,
+            metadata=entry.metadata,
+            embedding_model=embedder.model,
+        )
+        return document_id, content
+    if existing["review_status"] in RETRIEVABLE_REVIEW_STATUSES:
+        return document_id, None
+    if existing["review_status"] != "pending_review":
+        raise GuidelineIngestionError(
+            f"Version is already {existing['review_status']}"
+        )
+    return document_id, content
+
+
+def _extract_batch(
+    executor: Optional[Executor],
+    documents: Sequence[Tuple[bytes, str, str]],
+    max_tokens: int,
+    overlap_tokens: int,
+) -> List[Any]:
+    """Return ``(parents, chunks)`` or the ingestion error for each document."""
+    jobs = [
+        (content, content_type, title, max_tokens, overlap_tokens)
+        for content, content_type, title in documents
+    ]
+    if executor is None or len(jobs) < 2:
+        return [_extract_or_error(*job) for job in jobs]
+    try:
+        return list(executor.map(_extract_or_error, *zip(*jobs)))
+    except (BrokenProcessPool, OSError):
+        return [_extract_or_error(*job) for job in jobs]
+
+
+def _extract_or_error(
+    content: bytes,
+    content_type: str,
+    title: str,
+    max_tokens: int,
+    overlap_tokens: int,
+) -> Any:
+    """Pool entry point; runs in a worker process for multi-document batches."""
+    try:
+        return _extract_document(
+            content, content_type, title, max_tokens, overlap_tokens
+        )
+    except GuidelineIngestionError as error:
+        return error
+
+
+def _extract_document(
+    content: bytes,
+    content_type: str,
+    title: str,
+    max_tokens: int,
+    overlap_tokens: int,
+) -> Tuple[List[ExtractedSection], List[GuidelineChunk]]:
+    # Documents are already spread across processes; one PDF stays serial.
+    parents = extract_document_sections(content, content_type, pdf_workers=1)
+    return parents, build_child_chunks(
+        parents,
+        document_title=title,
+        max_tokens=max_tokens,
+        overlap_tokens=overlap_tokens,
+    )
+
+
+def _throughput(
+    processed: int, total: int, counts: Dict[str, int], elapsed: float
+) -> Dict[str, Any]:
+    seconds = max(elapsed, 1e-9)
+    return {
+        "documents_total": total,
+        "documents_processed": processed,
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "documents_per_second": round(processed / seconds, 2),
+        "chunks_per_second": round(counts["chunks"] / seconds, 2),
+    }
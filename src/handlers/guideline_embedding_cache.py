@@ -0,0 +1,233 @@
+"""Query-embedding cache for curated guideline retrieval.
+
+A bounded process-local LRU sits in front of the ``guideline_query_embeddings``
+table, keyed by embedding model and a SHA-256 of the whitespace-normalized
+question. Rows hold only that hash and the vector, never the question text,
+and questions that look like patient data are never cached. A cache miss only
+upserts its row; a daemon sweeper, one per connection pool, deletes expired
+rows and trims the table to a maximum size, soonest-to-expire first.
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Event, Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from psycopg import Error as PostgresError
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+from src.handlers.medical_guideline_search import contains_sensitive_patient_data
+from src.helpers.cache_sweeper import (
+    CACHE_SWEEP_INTERVAL_SECONDS,
+    start_cache_sweeper,
+)
+from src.helpers.logging_config import logger
+
+
+DEFAULT_QUERY_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_QUERY_CACHE_MAX_ENTRIES = 10_000
+QUERY_CACHE_MEMORY_ENTRIES = 512
+
+_STATE_LOCK = Lock()
+_MEMORY: "OrderedDict[Tuple[str, str], Tuple[float, Tuple[float, ...]]]" = (
+    OrderedDict()
+)
+_SWEEPERS: Dict[ConnectionPool, Event] = {}
+
+
+def query_cache_key(text: str) -> str:
+    """Hash the whitespace-normalized question; case is kept for the model."""
+    normalized = " ".join(str(text).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class CachingEmbedder:
+    """Wrap an embedder so repeated questions skip the provider round trip.
+
+    ``embed`` passes document batches straight through; only ``embed_query``
+    is cached, so activation never fills the cache with chunk vectors.
+    Cache storage failures are logged and the provider is used instead.
+    The first instance to write through a pool starts that pool's sweeper.
+    """
+
+    def __init__(
+        self,
+        embedder: Any,
+        pool: ConnectionPool,
+        ttl_seconds: int = DEFAULT_QUERY_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_QUERY_CACHE_MAX_ENTRIES,
+        sweep_interval_seconds: float = CACHE_SWEEP_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.embedder = embedder
+        self.model = embedder.model
+        self.pool = pool
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self.sweep_interval_seconds = float(sweep_interval_seconds)
+        self.clock = clock
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return self.embedder.embed(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.ttl_seconds <= 0 or contains_sensitive_patient_data(text):
+            return self.embedder.embed([text])[0]
+        key = (self.model, query_cache_key(text))
+        now = self.clock()
+        cached = _memory_get(key, now)
+        if cached is not None:
+            return list(cached)
+        loaded = None
+        try:
+            loaded = self._load(key, now)
+        except (PostgresError, PoolTimeout) as error:
+            logger.warning(
+                "Query embedding cache read failed: %s", type(error).__name__
+            )
+        if loaded is not None:
+            # A row keeps its own expiry in memory, so it never outlives
+            # the table entry it came from.
+            cached, expires_at = loaded
+        else:
+            vector = self.embedder.embed([text])[0]
+            if not _is_cacheable(vector):
+                return vector
+            cached = tuple(float(value) for value in vector)
+            expires_at = now + self.ttl_seconds
+            try:
+                self._save(key, cached, now)
+            except (PostgresError, PoolTimeout) as error:
+                logger.warning(
+                    "Query embedding cache write failed: %s", type(error).__name__
+                )
+            self._ensure_sweeper()
+        _memory_put(key, cached, expires_at)
+        return list(cached)
+
+    def _load(
+        self, key: Tuple[str, str], now: float
+    ) -> Optional[Tuple[Tuple[float, ...], float]]:
+        """Return ``(vector, expires_at)`` of a live row, in epoch seconds."""
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                """
+                SELECT embedding, expires_at FROM guideline_query_embeddings
+                WHERE embedding_model = %s AND query_hash = %s
+                  AND expires_at > %s
+                """,
+                (*key, _timestamp(now)),
+            ).fetchone()
+        if row is None or not _is_cacheable(row["embedding"]):
+            return None
+        return (
+            tuple(float(value) for value in row["embedding"]),
+            row["expires_at"].timestamp(),
+        )
+
+    def _save(
+        self, key: Tuple[str, str], vector: Tuple[float, ...], now: float
+    ) -> None:
+        with self.pool.connection() as connection:
+            connection.execute(
+                """
+                INSERT INTO guideline_query_embeddings (
+                    embedding_model, query_hash, embedding, created_at, expires_at
+                ) VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (embedding_model, query_hash) DO UPDATE
+                SET embedding = EXCLUDED.embedding,
+                    created_at = EXCLUDED.created_at,
+                    expires_at = EXCLUDED.expires_at
+                """,
+                (
+                    *key,
+                    list(vector),
+                    _timestamp(now),
+                    _timestamp(now + self.ttl_seconds),
+                ),
+            )
+
+    def sweep(self) -> int:
+        """Delete expired rows and trim the table to ``max_entries``.
+
+        Returns how many expired rows were removed; rows trimmed only to
+        respect ``max_entries`` are not counted.
+        """
+        try:
+            with self.pool.connection() as connection:
+                expired = connection.execute(
+                    "DELETE FROM guideline_query_embeddings WHERE expires_at <= %s",
+                    (_timestamp(self.clock()),),
+                ).rowcount
+                connection.execute(
+                    """
+                    DELETE FROM guideline_query_embeddings
+                    WHERE (embedding_model, query_hash) IN (
+                        SELECT embedding_model, query_hash
+                        FROM guideline_query_embeddings
+                        ORDER BY expires_at DESC, query_hash
+                        OFFSET %s
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+        except (PostgresError, PoolTimeout) as error:
+            logger.warning(
+                "Query embedding cache sweep failed: %s", type(error).__name__
+            )
+            return 0
+        return expired
+
+    def _ensure_sweeper(self) -> None:
+        if self.sweep_interval_seconds <= 0:
+            return
+        with _STATE_LOCK:
+            if self.pool not in _SWEEPERS:
+                _SWEEPERS[self.pool] = start_cache_sweeper(
+                    self, self.sweep_interval_seconds
+                )
+
+
+def _memory_get(
+    key: Tuple[str, str], now: float
+) -> Optional[Tuple[float, ...]]:
+    with _STATE_LOCK:
+        cached = _MEMORY.get(key)
+        if cached is None:
+            return None
+        expires_at, vector = cached
+        if expires_at <= now:
+            _MEMORY.pop(key, None)
+            return None
+        _MEMORY.move_to_end(key)
+        return vector
+
+
+def _memory_put(
+    key: Tuple[str, str], vector: Tuple[float, ...], expires_at: float
+) -> None:
+    with _STATE_LOCK:
+        _MEMORY[key] = (expires_at, vector)
+        _MEMORY.move_to_end(key)
+        while len(_MEMORY) > QUERY_CACHE_MEMORY_ENTRIES:
+            _MEMORY.popitem(last=False)
+
+
+def _is_cacheable(vector: Sequence[float]) -> bool:
+    return bool(vector) and all(math.isfinite(float(value)) for value in vector)
+
+
+def _timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+def _reset_query_cache_for_tests() -> None:
+    """Clear the process-local tier and stop sweepers; for unit tests only."""
+    with _STATE_LOCK:
+        _MEMORY.clear()
+        sweepers = list(_SWEEPERS.values())
+        _SWEEPERS.clear()
+    for stop in sweepers:
+        stop.set()
@@ -0,0 +1,209 @@
+"""PostgreSQL job queue that moves corpus-miss ingestion out of the chat turn.
+
+A miss only enqueues the de-identified question, keyed by a SHA-256 of its
+normalized form so repeated misses for one topic share a single job. Worker
+processes claim ready jobs with ``FOR UPDATE SKIP LOCKED``, so any number of
+them can poll the table without blocking each other or running a job twice.
+A claim holds a lease; a job whose worker died is reclaimed once the lease
+expires. The question text is cleared when a job finishes, leaving only its
+hash to suppress re-enqueueing the same topic for a while.
+"""
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from psycopg_pool import ConnectionPool
+
+from src.handlers.medical_guideline_search import contains_sensitive_patient_data
+
+
+QUEUED_JOB_STATUS = "queued"
+RUNNING_JOB_STATUS = "running"
+DONE_JOB_STATUS = "done"
+FAILED_JOB_STATUS = "failed"
+INGESTION_JOB_LEASE_SECONDS = 15 * 60
+INGESTION_JOB_MAX_ATTEMPTS = 3
+INGESTION_JOB_RETRY_DELAY_SECONDS = 60.0
+# A finished topic is not queued again before this, so a topic the official
+# sources do not cover cannot trigger discovery on every chat miss.
+INGESTION_JOB_REQUEUE_SECONDS = 24 * 60 * 60
+INGESTION_WORKER_POLL_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class IngestionJob:
+    """One claimed job; ``attempts`` includes the current claim."""
+
+    topic_hash: str
+    topic: Optional[str]
+    attempts: int
+
+
+def ingestion_topic_hash(topic: str) -> str:
+    """Hash the whitespace-normalized, case-folded topic."""
+    normalized = " ".join(str(topic).split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def enqueue_ingestion_job(
+    pool: ConnectionPool,
+    topic: str,
+    requeue_after_seconds: float = INGESTION_JOB_REQUEUE_SECONDS,
+    clock: Callable[[], float] = time.time,
+) -> Dict[str, Any]:
+    """Queue ``topic`` unless it is pending or finished recently.
+
+    Returns ``{"status", "job_id"}`` where status is ``queued``,
+    ``already_queued`` or ``recently_attempted``.
+    """
+    normalized = " ".join(str(topic).split())
+    if not normalized or contains_sensitive_patient_data(normalized):
+        raise ValueError("Ingestion topics must be de-identified medical queries")
+    topic_hash = ingestion_topic_hash(normalized)
+    now = clock()
+    with pool.connection() as connection:
+        inserted = connection.execute(
+            """
+            INSERT INTO guideline_ingestion_jobs (
+                topic_hash, topic, status, attempts, available_at,
+                lease_expires_at, enqueued_at, finished_at, result_status,
+                documents_ingested
+            ) VALUES (%s, %s, %s, 0, %s, NULL, %s, NULL, NULL, 0)
+            ON CONFLICT (topic_hash) DO UPDATE
+            SET topic = EXCLUDED.topic,
+                status = EXCLUDED.status,
+                attempts = 0,
+                available_at = EXCLUDED.available_at,
+                lease_expires_at = NULL,
+                enqueued_at = EXCLUDED.enqueued_at,
+                finished_at = NULL,
+                result_status = NULL,
+                documents_ingested = 0
+            WHERE guideline_ingestion_jobs.status IN (%s, %s)
+              AND guideline_ingestion_jobs.finished_at <= %s
+            RETURNING topic_hash
+            """,
+            (
+                topic_hash,
+                normalized,
+                QUEUED_JOB_STATUS,
+                _timestamp(now),
+                _timestamp(now),
+                DONE_JOB_STATUS,
+                FAILED_JOB_STATUS,
+                _timestamp(now - requeue_after_seconds),
+            ),
+        ).fetchone()
+        if inserted is not None:
+            return {"status": "queued", "job_id": topic_hash}
+        row = connection.execute(
+            "SELECT status FROM guideline_ingestion_jobs WHERE topic_hash = %s",
+            (topic_hash,),
+        ).fetchone()
+    pending = row is not None and row["status"] in {
+        QUEUED_JOB_STATUS, RUNNING_JOB_STATUS
+    }
+    return {
+        "status": "already_queued" if pending else "recently_attempted",
+        "job_id": topic_hash,
+    }
+
+
+def claim_ingestion_job(
+    pool: ConnectionPool,
+    lease_seconds: float = INGESTION_JOB_LEASE_SECONDS,
+    clock: Callable[[], float] = time.time,
+) -> Optional[IngestionJob]:
+    """Claim the oldest ready job, or an expired lease, without blocking."""
+    now = clock()
+    with pool.connection() as connection:
+        row = connection.execute(
+            """
+            UPDATE guideline_ingestion_jobs AS jobs
+            SET status = %s,
+                attempts = jobs.attempts + 1,
+                lease_expires_at = %s
+            FROM (
+                SELECT topic_hash FROM guideline_ingestion_jobs
+                WHERE (status = %s AND available_at <= %s)
+                   OR (status = %s AND lease_expires_at <= %s)
+                ORDER BY available_at, topic_hash
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            ) AS ready
+            WHERE jobs.topic_hash = ready.topic_hash
+            RETURNING jobs.topic_hash, jobs.topic, jobs.attempts
+            """,
+            (
+                RUNNING_JOB_STATUS,
+                _timestamp(now + lease_seconds),
+                QUEUED_JOB_STATUS,
+                _timestamp(now),
+                RUNNING_JOB_STATUS,
+                _timestamp(now),
+            ),
+        ).fetchone()
+    if row is None:
+        return None
+    return IngestionJob(row["topic_hash"], row["topic"], row["attempts"])
+
+
+def finish_ingestion_job(
+    pool: ConnectionPool,
+    job: IngestionJob,
+    result_status: str,
+    documents_ingested: int = 0,
+    retry_delay_seconds: Optional[float] = None,
+    failed: bool = False,
+    clock: Callable[[], float] = time.time,
+) -> bool:
+    """Record a claimed job's outcome; retry it later when a delay is given.
+
+    Returns ``False`` when the claim was lost to another worker after the
+    lease expired, in which case nothing is written.
+    """
+    now = clock()
+    with pool.connection() as connection:
+        if retry_delay_seconds is not None:
+            cursor = connection.execute(
+                """
+                UPDATE guideline_ingestion_jobs
+                SET status = %s, available_at = %s, lease_expires_at = NULL,
+                    result_status = %s
+                WHERE topic_hash = %s AND status = %s AND attempts = %s
+                """,
+                (
+                    QUEUED_JOB_STATUS,
+                    _timestamp(now + retry_delay_seconds),
+                    result_status,
+                    job.topic_hash,
+                    RUNNING_JOB_STATUS,
+                    job.attempts,
+                ),
+            )
+        else:
+            cursor = connection.execute(
+                """
+                UPDATE guideline_ingestion_jobs
+                SET status = %s, topic = NULL, lease_expires_at = NULL,
+                    finished_at = %s, result_status = %s,
+                    documents_ingested = %s
+                WHERE topic_hash = %s AND status = %s AND attempts = %s
+                """,
+                (
+                    FAILED_JOB_STATUS if failed else DONE_JOB_STATUS,
+                    _timestamp(now),
+                    result_status,
+                    int(documents_ingested),
+                    job.topic_hash,
+                    RUNNING_JOB_STATUS,
+                    job.attempts,
+                ),
+            )
+        return cursor.rowcount == 1
+
+
+def _timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
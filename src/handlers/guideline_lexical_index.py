@@ -0,0 +1,127 @@
+"""Lexical BM25 ranking and rank fusion for curated guideline chunks.
+
+Child chunks are tokenized once at activation into a PostgreSQL posting table
+(term, section, term frequency) plus a per-chunk length. A query only reads
+the posting lists of its own terms, so exact names such as a drug can be
+ranked without an embedding call and fused with the vector ranking through
+reciprocal-rank fusion.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Mapping, Sequence, Tuple
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+MAX_QUERY_TERMS = 32
+MAX_TERM_LENGTH = 64
+# A chunk found only lexically must contain at least this share of the
+# query's distinct terms, so one common word cannot surface unrelated text.
+MIN_LEXICAL_COVERAGE = 0.5
+# Function words dropped from queries before ranking and coverage; chunks
+# still index them, so the posting table does not depend on this list.
+QUERY_STOPWORDS = frozenset({
+    "bị", "các", "cho", "có", "của", "để", "được", "gì", "khi", "là",
+    "một", "những", "này", "nên", "như", "nào", "thì", "trong", "và",
+    "về", "với",
+    "an", "and", "are", "as", "at", "be", "by", "do", "does", "for",
+    "how", "in", "is", "of", "on", "or", "should", "the", "to", "what",
+    "when", "with",
+})
+
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def lexical_terms(text: str) -> List[str]:
+    """Return case-folded word terms in order, dropping one-letter words."""
+    normalized = unicodedata.normalize("NFKC", str(text)).casefold()
+    return [
+        term
+        for term in _TERM_PATTERN.findall(normalized)
+        if (len(term) > 1 or term.isdigit()) and len(term) <= MAX_TERM_LENGTH
+    ]
+
+
+def term_frequencies(text: str) -> Tuple[Dict[str, int], int]:
+    """Return ``({term: frequency}, length)`` for one chunk."""
+    terms = lexical_terms(text)
+    return dict(Counter(terms)), len(terms)
+
+
+def query_terms(question: str) -> List[str]:
+    """Return distinct non-stopword query terms in first-seen order, bounded."""
+    terms = (
+        term for term in lexical_terms(question) if term not in QUERY_STOPWORDS
+    )
+    return list(dict.fromkeys(terms))[:MAX_QUERY_TERMS]
+
+
+def bm25_ranking(
+    terms: Sequence[str],
+    postings: Iterable[Tuple[str, str, int, int]],
+    document_frequencies: Mapping[str, int],
+    section_count: int,
+    average_length: float,
+) -> List[Tuple[str, float, float]]:
+    """Rank sections by Okapi BM25.
+
+    ``postings`` yields ``(term, section_id, term_frequency, length)``.
+    Returns ``(section_id, score, coverage)`` sorted by score then ID, where
+    coverage is the share of ``terms`` the section contains.
+    """
+    if not terms or section_count <= 0:
+        return []
+    average = average_length if average_length > 0 else 1.0
+    scores: Dict[str, float] = {}
+    matched: Dict[str, int] = {}
+    for term, section_id, frequency, length in postings:
+        document_frequency = document_frequencies.get(term, 0)
+        if document_frequency <= 0:
+            continue
+        inverse = math.log(
+            1 + (section_count - document_frequency + 0.5)
+            / (document_frequency + 0.5)
+        )
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+        scores[section_id] = scores.get(section_id, 0.0) + inverse * (
+            frequency * (BM25_K1 + 1) / (frequency + norm)
+        )
+        matched[section_id] = matched.get(section_id, 0) + 1
+    return sorted(
+        (
+            (section_id, score, matched[section_id] / len(terms))
+            for section_id, score in scores.items()
+        ),
+        key=lambda item: (-item[1], item[0]),
+    )
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = RRF_K
+) -> List[Tuple[str, float]]:
+    """Fuse ranked ID lists with ``sum(1 / (k + rank))``; ties sort by ID."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, section_id in enumerate(ranking, start=1):
+            fused[section_id] = fused.get(section_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
+
+
+def first_per_group(
+    section_ids: Iterable[str], group_keys: Mapping[str, Hashable], limit: int
+) -> List[str]:
+    """Keep the first section of each parent group, up to ``limit``."""
+    selected: List[str] = []
+    seen = set()
+    for section_id in section_ids:
+        group = group_keys.get(section_id, section_id)
+        if group in seen:
+            continue
+        seen.add(group)
+        selected.append(section_id)
+        if len(selected) >= limit:
+            break
+    return selected
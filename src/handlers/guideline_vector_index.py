@@ -0,0 +1,449 @@
+"""Vectorized candidate scoring for the curated guideline corpus.
+
+Child-chunk embeddings are normalized once into a contiguous float32 matrix per
+embedding dimension, so a query costs one matrix-vector product plus an
+``argpartition`` top-k selection instead of a Python loop per chunk. The
+float32 pass only nominates candidates: every returned score is recomputed with
+the caller's exact cosine, and the candidate window widens until a rounding
+error bound proves that no row outside it could change the ranking.
+
+``CorpusSnapshot`` keeps that matrix alive across queries together with the
+section IDs and per-document effective-date windows, tagged with the corpus
+generation it was loaded at. ``write_index_bundle`` persists a snapshot as a
+versioned directory of ``.npy`` files that ``read_index_bundle`` maps read-only,
+so API workers on one host share a single page-cache copy of the vectors.
+"""
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import date
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+
+# Forward error of a float32 dot product of two unit vectors is bounded by
+# roughly ``dimension * eps``; the factor covers normalization and rounding of
+# the inputs with a wide margin. The bound only affects how many candidates are
+# rescored exactly, never which rows are returned.
+FLOAT32_ERROR_FACTOR = 4.0
+MIN_CANDIDATE_WINDOW = 32
+CANDIDATE_WINDOW_PER_RESULT = 8
+FLOAT32_PRECISION = "float32"
+FLOAT16_PRECISION = "float16"
+INT8_PRECISION = "int8"
+VECTOR_PRECISIONS = (FLOAT32_PRECISION, FLOAT16_PRECISION, INT8_PRECISION)
+# Quantized blocks are widened to float32 in slices of this many rows, so a
+# query never materializes a float32 copy of the whole corpus.
+SCORING_SLICE_ROWS = 8192
+INDEX_BUNDLE_FORMAT = 2
+RETAINED_INDEX_BUNDLES = 2
+
+
+@dataclass(frozen=True)
+class VectorBlock:
+    """Normalized rows of one dimension in their stored precision.
+
+    ``scales`` is set only for int8 rows, whose approximate unit vector is
+    ``vectors[i] * scales[i]``. ``tolerance`` bounds, per row, the gap between
+    the first-pass score and the exact cosine: the quantization residual norm
+    plus the float32 accumulation error.
+    """
+
+    rows: np.ndarray
+    vectors: np.ndarray
+    scales: Optional[np.ndarray]
+    tolerance: np.ndarray
+
+
+class EmbeddingMatrix:
+    """Pre-normalized rows grouped by embedding dimension.
+
+    Rows are stored as float32 by default, or as float16 or int8 with a
+    per-vector scale to cut memory two to four times; quantization only
+    widens the per-row error bound, so the exact re-rank still decides the
+    result. Rows that are empty, non-finite or zero-norm can never score above
+    the exact cosine's ``-1.0`` sentinel, so they are kept out of every block
+    and reported with that exact score.
+    """
+
+    def __init__(
+        self,
+        vectors: Sequence[Sequence[float]],
+        precision: str = FLOAT32_PRECISION,
+    ) -> None:
+        if precision not in VECTOR_PRECISIONS:
+            raise ValueError(f"Unsupported vector precision: {precision}")
+        self.size = len(vectors)
+        self.precision = precision
+        by_dimension: Dict[int, List[int]] = {}
+        for index, vector in enumerate(vectors):
+            if len(vector):
+                by_dimension.setdefault(len(vector), []).append(index)
+        self._blocks: Dict[int, VectorBlock] = {}
+        for dimension, indices in by_dimension.items():
+            raw = np.asarray([vectors[index] for index in indices], dtype=np.float64)
+            norms = np.linalg.norm(raw, axis=1)
+            valid = np.isfinite(raw).all(axis=1) & np.isfinite(norms) & (norms > 0)
+            if not valid.any():
+                continue
+            self._blocks[dimension] = _quantize_block(
+                np.asarray(indices, dtype=np.int64)[valid],
+                raw[valid] / norms[valid, None],
+                precision,
+            )
+
+    @classmethod
+    def from_blocks(
+        cls, size: int, precision: str, blocks: Mapping[int, VectorBlock]
+    ) -> "EmbeddingMatrix":
+        """Wrap already-normalized blocks, e.g. read-only memory maps."""
+        matrix = cls.__new__(cls)
+        matrix.size = size
+        matrix.precision = precision
+        matrix._blocks = dict(blocks)
+        return matrix
+
+    def __len__(self) -> int:
+        return self.size
+
+    def blocks(self) -> Dict[int, VectorBlock]:
+        return dict(self._blocks)
+
+    @property
+    def dimensions(self) -> Tuple[int, ...]:
+        return tuple(sorted(self._blocks))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the stored vectors and their scales."""
+        return sum(
+            block.vectors.nbytes
+            + (block.scales.nbytes if block.scales is not None else 0)
+            for block in self._blocks.values()
+        )
+
+    def score_bounds(
+        self, query_vector: Sequence[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return approximate cosine scores and their absolute error bound."""
+        scores = np.full(self.size, -1.0, dtype=np.float64)
+        tolerance = np.zeros(self.size, dtype=np.float64)
+        block = self._blocks.get(len(query_vector))
+        if block is None:
+            return scores, tolerance
+        query = np.asarray(query_vector, dtype=np.float64)
+        norm = float(np.linalg.norm(query))
+        if not np.isfinite(query).all() or not np.isfinite(norm) or norm == 0:
+            return scores, tolerance
+        scores[block.rows] = _block_scores(
+            block, (query / norm).astype(np.float32)
+        )
+        tolerance[block.rows] = block.tolerance
+        return scores, tolerance
+
+
+@dataclass(frozen=True)
+class CorpusSnapshot:
+    """Immutable in-process view of the retrievable corpus for one model.
+
+    Effective-date windows are stored per document as ordinal days and
+    evaluated for every query, so a snapshot reused past midnight stops
+    serving documents whose window has closed.
+    """
+
+    generation: int
+    section_ids: Tuple[str, ...]
+    group_keys: Tuple[str, ...]
+    row_documents: np.ndarray
+    effective_from: np.ndarray
+    effective_until: np.ndarray
+    matrix: EmbeddingMatrix
+
+    def effective_documents(self, on_date: date) -> np.ndarray:
+        day = on_date.toordinal()
+        return (self.effective_from <= day) & (self.effective_until >= day)
+
+    def effective_rows(self, on_date: date) -> np.ndarray:
+        return self.effective_documents(on_date)[self.row_documents]
+
+
+def select_top_matches(
+    matrix: EmbeddingMatrix,
+    query_vector: Sequence[float],
+    min_score: float,
+    limit: int,
+    group_keys: Sequence[Hashable],
+    tie_keys: Sequence[str],
+    exact_scores: Callable[[Sequence[int]], Sequence[float]],
+    eligible_rows: Optional[np.ndarray] = None,
+) -> List[Tuple[int, float]]:
+    """Select at most ``limit`` rows, one per group, by exact score.
+
+    The result equals sorting every row by ``(-exact_score, tie_key)``,
+    dropping rows below ``min_score`` and keeping the first row of each group.
+    ``exact_scores`` receives row indices and is called only for candidates.
+    ``eligible_rows`` optionally masks rows out before any scoring decision.
+    """
+    approximate, tolerance = matrix.score_bounds(query_vector)
+    upper = approximate + tolerance
+    admissible = upper >= min_score
+    if eligible_rows is not None:
+        admissible &= eligible_rows
+    eligible = np.flatnonzero(admissible)
+    if eligible.size == 0 or limit <= 0:
+        return []
+
+    window = min(
+        eligible.size,
+        max(MIN_CANDIDATE_WINDOW, limit * CANDIDATE_WINDOW_PER_RESULT),
+    )
+    exact: Dict[int, float] = {}
+    while True:
+        if window >= eligible.size:
+            candidates = eligible
+            outside_bound = None
+        else:
+            order = np.argpartition(-upper[eligible], window)
+            candidates = eligible[order[:window]]
+            outside_bound = float(upper[eligible[order[window]]])
+
+        missing = [int(index) for index in candidates if int(index) not in exact]
+        if missing:
+            exact.update(zip(missing, (float(score) for score in exact_scores(missing))))
+        ranked = sorted(
+            (int(index) for index in candidates if exact[int(index)] >= min_score),
+            key=lambda index: (-exact[index], tie_keys[index]),
+        )
+        selected: List[Tuple[int, float]] = []
+        seen_groups = set()
+        for index in ranked:
+            if group_keys[index] in seen_groups:
+                continue
+            selected.append((index, exact[index]))
+            seen_groups.add(group_keys[index])
+            if len(selected) >= limit:
+                break
+
+        # Rows outside the window score at most ``outside_bound``; once the
+        # last selected row beats that bound strictly, nothing can displace it.
+        if outside_bound is None or (
+            len(selected) >= limit and selected[-1][1] > outside_bound
+        ):
+            return selected
+        window = min(eligible.size, window * 4)
+
+
+def first_pass_recall(
+    matrix: EmbeddingMatrix,
+    vectors: Sequence[Sequence[float]],
+    queries: Sequence[Sequence[float]],
+    k: int,
+) -> float:
+    """Mean recall@k of first-pass scores against an exact float64 ranking.
+
+    Returned matches are always re-ranked exactly, so this does not measure
+    result quality; it shows how often the exact top ``k`` is already in the
+    first-pass top ``k``, which drives how many rows a precision must rescore.
+    """
+    size = min(max(0, int(k)), len(vectors))
+    if size == 0 or not queries:
+        return 1.0
+    hits = 0
+    for query in queries:
+        approximate, _tolerance = matrix.score_bounds(query)
+        exact = np.asarray(
+            [cosine_similarity(query, vector) for vector in vectors], dtype=np.float64
+        )
+        expected = set(np.argsort(-exact, kind="stable")[:size].tolist())
+        found = set(np.argsort(-approximate, kind="stable")[:size].tolist())
+        hits += len(expected & found)
+    return hits / (size * len(queries))
+
+
+def _quantize_block(
+    rows: np.ndarray, unit: np.ndarray, precision: str
+) -> VectorBlock:
+    scales = None
+    if precision == INT8_PRECISION:
+        scales = (np.abs(unit).max(axis=1) / 127.0).astype(np.float32)
+        vectors = np.clip(
+            np.rint(unit / scales[:, None].astype(np.float64)), -127, 127
+        ).astype(np.int8)
+        approximate = vectors.astype(np.float64) * scales[:, None]
+    else:
+        dtype = np.float16 if precision == FLOAT16_PRECISION else np.float32
+        vectors = np.ascontiguousarray(unit, dtype=dtype)
+        approximate = vectors.astype(np.float64)
+    # |exact - first pass| <= ||unit - approximate|| for a unit query, plus
+    # float32 accumulation error on a row whose norm is at most 1 + residual.
+    residual = np.linalg.norm(unit - approximate, axis=1)
+    tolerance = residual + _float32_tolerance(unit.shape[1]) * (1.0 + residual)
+    return VectorBlock(rows, vectors, scales, tolerance)
+
+
+def _block_scores(block: VectorBlock, unit_query: np.ndarray) -> np.ndarray:
+    if block.scales is None and block.vectors.dtype == np.float32:
+        return block.vectors @ unit_query
+    scores = np.empty(len(block.rows), dtype=np.float32)
+    for start in range(0, len(block.rows), SCORING_SLICE_ROWS):
+        stop = start + SCORING_SLICE_ROWS
+        part = block.vectors[start:stop].astype(np.float32) @ unit_query
+        if block.scales is not None:
+            part *= block.scales[start:stop]
+        scores[start:stop] = part
+    return scores
+
+
+def cosine_similarity(left: Sequence[float], right: Sequence[float]) -> float:
+    """Exact float64 cosine; ``-1.0`` for mismatched, empty or invalid input."""
+    if len(left) != len(right) or not len(left):
+        return -1.0
+    left_values = np.asarray(left, dtype=np.float64)
+    right_values = np.asarray(right, dtype=np.float64)
+    if not np.isfinite(left_values).all() or not np.isfinite(right_values).all():
+        return -1.0
+    norm = float(np.linalg.norm(left_values) * np.linalg.norm(right_values))
+    if not np.isfinite(norm) or norm == 0:
+        return -1.0
+    return float(left_values @ right_values) / norm
+
+
+def _float32_tolerance(dimension: int) -> float:
+    return FLOAT32_ERROR_FACTOR * (dimension + 2) * float(np.finfo(np.float32).eps)
+
+
+def write_index_bundle(directory: str, snapshot: CorpusSnapshot) -> str:
+    """Publish ``snapshot`` under ``directory`` and return the bundle path.
+
+    Files are staged in a private directory and renamed into place, so
+    readers only ever observe complete bundles. When another process already
+    published the same generation its bundle is kept. Older generations beyond
+    ``RETAINED_INDEX_BUNDLES`` are pruned; processes still mapping them keep
+    their pages until they move on.
+    """
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, _bundle_name(snapshot.generation))
+    if os.path.isdir(target):
+        return target
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=directory)
+    try:
+        blocks = snapshot.matrix.blocks()
+        for dimension, block in blocks.items():
+            arrays = {
+                "rows": block.rows,
+                "vectors": np.ascontiguousarray(block.vectors),
+                "tolerance": block.tolerance,
+            }
+            if block.scales is not None:
+                arrays["scales"] = block.scales
+            for name, values in arrays.items():
+                np.save(os.path.join(staging, f"{name}-{dimension}.npy"), values)
+        for name in ("row_documents", "effective_from", "effective_until"):
+            np.save(
+                os.path.join(staging, f"{name}.npy"),
+                np.asarray(getattr(snapshot, name), dtype=np.int64),
+            )
+        with open(
+            os.path.join(staging, "sections.json"), "w", encoding="utf-8"
+        ) as handle:
+            json.dump(
+                {
+                    "section_ids": list(snapshot.section_ids),
+                    "group_keys": list(snapshot.group_keys),
+                },
+                handle,
+            )
+        with open(
+            os.path.join(staging, "manifest.json"), "w", encoding="utf-8"
+        ) as handle:
+            json.dump(
+                {
+                    "format": INDEX_BUNDLE_FORMAT,
+                    "generation": snapshot.generation,
+                    "size": len(snapshot.matrix),
+                    "precision": snapshot.matrix.precision,
+                    "dimensions": sorted(blocks),
+                },
+                handle,
+            )
+        try:
+            os.rename(staging, target)
+        except OSError:
+            if not os.path.isdir(target):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    _prune_index_bundles(directory)
+    return target
+
+
+def read_index_bundle(directory: str, generation: int) -> Optional[CorpusSnapshot]:
+    """Map the bundle for ``generation`` read-only, or return ``None``."""
+    path = os.path.join(directory, _bundle_name(generation))
+    try:
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if (
+            manifest.get("format") != INDEX_BUNDLE_FORMAT
+            or manifest.get("generation") != generation
+        ):
+            return None
+        with open(os.path.join(path, "sections.json"), encoding="utf-8") as handle:
+            sections = json.load(handle)
+        precision = manifest["precision"]
+        blocks = {
+            int(dimension): VectorBlock(
+                rows=np.load(os.path.join(path, f"rows-{dimension}.npy")),
+                vectors=np.load(
+                    os.path.join(path, f"vectors-{dimension}.npy"), mmap_mode="r"
+                ),
+                scales=(
+                    np.load(os.path.join(path, f"scales-{dimension}.npy"))
+                    if precision == INT8_PRECISION
+                    else None
+                ),
+                tolerance=np.load(
+                    os.path.join(path, f"tolerance-{dimension}.npy")
+                ),
+            )
+            for dimension in manifest["dimensions"]
+        }
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"))
+            for name in ("row_documents", "effective_from", "effective_until")
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return CorpusSnapshot(
+        generation=generation,
+        section_ids=tuple(sections["section_ids"]),
+        group_keys=tuple(sections["group_keys"]),
+        matrix=EmbeddingMatrix.from_blocks(
+            int(manifest["size"]), precision, blocks
+        ),
+        **arrays,
+    )
+
+
+def _bundle_name(generation: int) -> str:
+    return f"gen-{int(generation):012d}"
+
+
+def _prune_index_bundles(directory: str) -> None:
+    bundles = sorted(
+        name for name in os.listdir(directory) if name.startswith("gen-")
+    )
+    for name in bundles[:-RETAINED_INDEX_BUNDLES]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
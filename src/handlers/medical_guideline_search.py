@@ -7,21 +7,26 @@ rejected before any network request.
 """
 import copy
 import hashlib
-import ipaddress
 import json
 import re
-import socket
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
-from threading import Lock
+from threading import Event, Lock
 from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from urllib.error import HTTPError, URLError
 from urllib.parse import unquote, urljoin, urlparse
 from urllib.request import HTTPRedirectHandler, Request, build_opener, urlopen
 
 from src.handlers.security_guardrails import audit_event
+from src.helpers.cache_sweeper import (
+    CACHE_SWEEP_INTERVAL_SECONDS,
+    start_cache_sweeper,
+)
+from src.helpers.host_resolution import host_has_only_public_addresses
+from src.helpers.single_flight import SingleFlight
 from src.helpers.logging_config import logger
 
 
@@ -29,6 +34,12 @@ TAVILY_SEARCH_URL = "https://api.tavily.com/search"
 MAX_RESPONSE_BYTES = 1_000_000
 MAX_QUESTION_LENGTH = 500
 MAX_REDIRECTS = 3
+SEARCH_CACHE_MEMORY_ENTRIES = 512
+SEARCH_CACHE_SWEEP_INTERVAL_SECONDS = CACHE_SWEEP_INTERVAL_SECONDS
+# Provider URLs are resolved in parallel; results are capped at five anyway.
+URL_RESOLUTION_WORKERS = 5
+RESOLVED_URL_CACHE_TTL_SECONDS = 60 * 60
+RESOLVED_URL_CACHE_ENTRIES = 1024
 REDIRECT_CODES = frozenset({301, 302, 303, 307, 308})
 NO_GUIDELINE_RESULT = (
     "Không tìm thấy thông tin phù hợp trong các nguồn hướng dẫn y khoa thuộc "
@@ -103,9 +114,129 @@ class _NoRedirectHandler(HTTPRedirectHandler):
         return None
 
 
+class SearchResultCache:
+    """Bounded in-process LRU of rendered search results.
+
+    Results are deep-copied on the way in and out, so a caller that edits a
+    returned result cannot change what the next caller sees. Expired entries
+    are dropped on read and by a daemon sweeper started with the first write;
+    the least recently used entry is evicted once ``max_entries`` is reached.
+    ``get`` and ``put`` take an optional ``now`` for callers that keep their
+    own clock; the sweeper always uses ``clock``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SEARCH_CACHE_MEMORY_ENTRIES,
+        sweep_interval_seconds: float = SEARCH_CACHE_SWEEP_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.sweep_interval_seconds = float(sweep_interval_seconds)
+        self.clock = clock
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._counters = _empty_cache_counters()
+        self._sweeper_stop: Optional[Event] = None
+
+    def get(
+        self, key: str, now: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        now = self.clock() if now is None else now
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] <= now:
+                del self._entries[key]
+                self._counters["expired"] += 1
+                cached = None
+            if cached is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+        return copy.deepcopy(cached[1])
+
+    def put(
+        self,
+        key: str,
+        result: Dict[str, Any],
+        ttl_seconds: float,
+        now: Optional[float] = None,
+    ) -> None:
+        if ttl_seconds <= 0:
+            return
+        stored = copy.deepcopy(result)
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._entries[key] = (now + ttl_seconds, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+            if self._sweeper_stop is None and self.sweep_interval_seconds > 0:
+                self._sweeper_stop = start_cache_sweeper(
+                    self, self.sweep_interval_seconds
+                )
+
+    def sweep(self) -> int:
+        """Drop every expired entry and return how many were removed."""
+        now = self.clock()
+        with self._lock:
+            expired = [
+                key
+                for key, (expires_at, _result) in self._entries.items()
+                if expires_at <= now
+            ]
+            for key in expired:
+                del self._entries[key]
+            self._counters["expired"] += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters = _empty_cache_counters()
+
+    def close(self) -> None:
+        """Stop the background sweeper, if one was started."""
+        with self._lock:
+            stop, self._sweeper_stop = self._sweeper_stop, None
+        if stop is not None:
+            stop.set()
+
+
+class _ClockedCache:
+    """A ``SearchResultCache`` read and written on a caller's clock."""
+
+    def __init__(
+        self, cache: SearchResultCache, clock: Callable[[], float]
+    ) -> None:
+        self.cache = cache
+        self.clock = clock
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(key, now=self.clock())
+
+    def put(self, key: str, result: Dict[str, Any], ttl_seconds: float) -> None:
+        self.cache.put(key, result, ttl_seconds, now=self.clock())
+
+
+def _empty_cache_counters() -> Dict[str, int]:
+    return {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+
 _SOURCE_OPENER = build_opener(_NoRedirectHandler())
 _STATE_LOCK = Lock()
-_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_CACHE = SearchResultCache()
+_SEARCH_FLIGHTS = SingleFlight()
+# Provider URL -> {"final_url": validated final URL}; failures are not kept.
+_RESOLVED_URLS = SearchResultCache(max_entries=RESOLVED_URL_CACHE_ENTRIES)
 _RATE_EVENTS: Dict[str, Deque[float]] = defaultdict(deque)
 _BUDGET_DAY = ""
 _BUDGET_USED = 0
@@ -184,13 +315,12 @@ def resolve_approved_final_url(
     """Follow a bounded redirect chain only across approved, public hosts."""
     current_url = url
     open_source = opener or _open_source_without_redirect
-    resolve_host = resolver or socket.getaddrinfo
 
     for redirect_count in range(max_redirects + 1):
         if not is_approved_source_url(current_url):
             return None
         host = urlparse(current_url).hostname or ""
-        if not _host_has_only_public_addresses(host, resolve_host):
+        if not host_has_only_public_addresses(host, resolver):
             return None
 
         request = Request(
@@ -227,22 +357,46 @@ def resolve_approved_final_url(
     return None
 
 
-def _open_source_without_redirect(request: Request, timeout: int):
-    return _SOURCE_OPENER.open(request, timeout=timeout)
+def _resolve_provider_urls(
+    urls: List[str],
+    opener: Optional[Callable[..., Any]],
+    resolver: Optional[Callable[..., Any]],
+    ttl_seconds: float,
+) -> Dict[str, Optional[str]]:
+    """Resolve provider URLs concurrently, reusing recently validated ones.
+
+    Only successful resolutions are cached, so a URL that failed is checked
+    again on the next search.
+    """
+    final_urls: Dict[str, Optional[str]] = {}
+    pending = []
+    for url in urls:
+        cached = _RESOLVED_URLS.get(url) if ttl_seconds > 0 else None
+        if cached is None:
+            pending.append(url)
+        else:
+            final_urls[url] = cached["final_url"]
+    if not pending:
+        return final_urls
+    with ThreadPoolExecutor(
+        max_workers=min(URL_RESOLUTION_WORKERS, len(pending)),
+        thread_name_prefix="medical-search-resolve",
+    ) as executor:
+        resolved = executor.map(
+            lambda url: resolve_approved_final_url(
+                url, opener=opener, resolver=resolver
+            ),
+            pending,
+        )
+        for url, final_url in zip(pending, resolved):
+            final_urls[url] = final_url
+            if final_url:
+                _RESOLVED_URLS.put(url, {"final_url": final_url}, ttl_seconds)
+    return final_urls
 
 
-def _host_has_only_public_addresses(
-    host: str, resolver: Callable[..., Any]
-) -> bool:
-    """Reject unresolved, private, loopback, link-local and reserved targets."""
-    try:
-        records = resolver(host, 443, type=socket.SOCK_STREAM)
-        addresses = {record[4][0] for record in records}
-        return bool(addresses) and all(
-            ipaddress.ip_address(address).is_global for address in addresses
-        )
-    except (OSError, ValueError, TypeError):
-        return False
+def _open_source_without_redirect(request: Request, timeout: int):
+    return _SOURCE_OPENER.open(request, timeout=timeout)
 
 
 def _source_metadata(url: str) -> Tuple[int, str]:
@@ -258,27 +412,6 @@ def _cache_key(question: str, max_results: int, min_score: float) -> str:
     return hashlib.sha256(material.encode("utf-8")).hexdigest()
 
 
-def _get_cached_result(key: str, now: float) -> Optional[Dict[str, Any]]:
-    with _STATE_LOCK:
-        cached = _CACHE.get(key)
-        if not cached:
-            return None
-        expires_at, result = cached
-        if expires_at <= now:
-            _CACHE.pop(key, None)
-            return None
-        return copy.deepcopy(result)
-
-
-def _store_cached_result(
-    key: str, result: Dict[str, Any], now: float, ttl_seconds: int
-) -> None:
-    if ttl_seconds <= 0:
-        return
-    with _STATE_LOCK:
-        _CACHE[key] = (now + ttl_seconds, copy.deepcopy(result))
-
-
 def _claim_provider_call(
     actor_id: str,
     now: float,
@@ -342,12 +475,52 @@ def _record_provider_failure(
             _CIRCUIT_OPEN_UNTIL = now + max(1, cooldown_seconds)
 
 
+class ProcessProviderGuard:
+    """Rate limit, daily budget and circuit breaker kept in this process.
+
+    The state is module-wide, so every guard in a process shares it; ``clock``
+    only supplies the monotonic time for the rate window and the cooldown.
+    ``PostgresProviderGuard`` offers the same methods across processes.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+
+    def claim_call(
+        self,
+        actor_id: str,
+        utc_day: str,
+        rate_limit_per_minute: int,
+        daily_budget: int,
+        circuit_failure_threshold: int,
+    ) -> Optional[str]:
+        """Reserve one provider call, or return the reason it is blocked."""
+        return _claim_provider_call(
+            actor_id=actor_id,
+            now=self.clock(),
+            utc_day=utc_day,
+            rate_limit_per_minute=rate_limit_per_minute,
+            daily_budget=daily_budget,
+            circuit_failure_threshold=circuit_failure_threshold,
+        )
+
+    def claim_retry(self, utc_day: str, daily_budget: int) -> bool:
+        return _claim_retry_budget(utc_day, daily_budget)
+
+    def record_success(self) -> None:
+        _record_provider_success()
+
+    def record_failure(self, threshold: int, cooldown_seconds: int) -> None:
+        _record_provider_failure(self.clock(), threshold, cooldown_seconds)
+
+
 def _reset_runtime_state_for_tests() -> None:
     """Reset process-local controls; intended only for isolated unit tests."""
     global _BUDGET_DAY, _BUDGET_USED  # pylint: disable=global-statement
     global _CIRCUIT_FAILURES, _CIRCUIT_OPEN_UNTIL  # pylint: disable=global-statement
+    _CACHE.clear()
+    _RESOLVED_URLS.clear()
     with _STATE_LOCK:
-        _CACHE.clear()
         _RATE_EVENTS.clear()
         _BUDGET_DAY = ""
         _BUDGET_USED = 0
@@ -371,11 +544,25 @@ def search_medical_guidelines(
     max_retry_delay_seconds: float = 2.0,
     circuit_failure_threshold: int = 3,
     circuit_cooldown_seconds: int = 60,
+    cache: Optional[Any] = None,
+    guard: Optional[Any] = None,
+    resolved_url_ttl_seconds: float = RESOLVED_URL_CACHE_TTL_SECONDS,
     clock: Callable[[], float] = time.monotonic,
     sleeper: Callable[[float], None] = time.sleep,
     utcnow: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
 ) -> Dict[str, Any]:
-    """Retrieve allowlisted source snippets for discovery without synthesis."""
+    """Retrieve allowlisted source snippets for discovery without synthesis.
+
+    ``cache`` is any object with ``get(key)`` and ``put(key, result,
+    ttl_seconds)``, such as the shared PostgreSQL tier in
+    ``medical_search_cache``; the process-wide LRU is used by default, with
+    entry expiry measured on ``clock``. An injected cache keeps its own clock.
+    ``guard`` applies the rate limit, budget and circuit breaker and defaults
+    to a ``ProcessProviderGuard`` on ``clock``. Result URLs are resolved in
+    parallel, and a validated final URL is reused for
+    ``resolved_url_ttl_seconds`` (``0`` always re-checks). Concurrent cache
+    misses for the same key share one provider call and each receive a copy.
+    """
     if contains_sensitive_patient_data(question):
         audit_event("medical_search_rejected_sensitive_input", level="warning")
         return {"status": "privacy_denied", "response": SENSITIVE_SEARCH_REFUSAL}
@@ -384,18 +571,77 @@ def search_medical_guidelines(
         return {"status": "unavailable", "response": SEARCH_UNAVAILABLE}
 
     safe_max_results = max(1, min(int(max_results), 5))
-    now = clock()
+    active_cache = _ClockedCache(_CACHE, clock) if cache is None else cache
+    active_guard = ProcessProviderGuard(clock) if guard is None else guard
     key = _cache_key(question, safe_max_results, min_score)
-    cached = _get_cached_result(key, now)
+    cached = active_cache.get(key)
     if cached is not None:
         audit_event("medical_search_cache_hit")
         cached["cache_hit"] = True
         return cached
 
+    def search_provider() -> Dict[str, Any]:
+        return _search_provider(
+            question=question,
+            api_key=api_key,
+            key=key,
+            max_results=safe_max_results,
+            min_score=min_score,
+            opener=opener,
+            source_opener=source_opener,
+            resolver=resolver,
+            actor_id=actor_id or "anonymous",
+            cache=active_cache,
+            cache_ttl_seconds=cache_ttl_seconds,
+            guard=active_guard,
+            rate_limit_per_minute=rate_limit_per_minute,
+            daily_budget=daily_budget,
+            max_retries=max_retries,
+            max_retry_delay_seconds=max_retry_delay_seconds,
+            circuit_failure_threshold=circuit_failure_threshold,
+            circuit_cooldown_seconds=circuit_cooldown_seconds,
+            resolved_url_ttl_seconds=resolved_url_ttl_seconds,
+            sleeper=sleeper,
+            utcnow=utcnow,
+        )
+
+    # Identical concurrent questions make one provider call. A rate limit
+    # belongs to the actor that hit it, so waiters retry with their own.
+    result, shared = _SEARCH_FLIGHTS.do(key, search_provider)
+    if shared:
+        audit_event("medical_search_coalesced")
+        if result.get("status") == "rate_limited":
+            result = search_provider()
+    return result
+
+
+def _search_provider(
+    question: str,
+    api_key: str,
+    key: str,
+    max_results: int,
+    min_score: float,
+    opener: Optional[Callable[..., Any]],
+    source_opener: Optional[Callable[..., Any]],
+    resolver: Optional[Callable[..., Any]],
+    actor_id: str,
+    cache: Any,
+    cache_ttl_seconds: int,
+    guard: Any,
+    rate_limit_per_minute: int,
+    daily_budget: int,
+    max_retries: int,
+    max_retry_delay_seconds: float,
+    circuit_failure_threshold: int,
+    circuit_cooldown_seconds: int,
+    resolved_url_ttl_seconds: float,
+    sleeper: Callable[[float], None],
+    utcnow: Callable[[], datetime],
+) -> Dict[str, Any]:
+    """Call the provider for a cache miss and cache the rendered result."""
     utc_day = utcnow().date().isoformat()
-    limit_reason = _claim_provider_call(
-        actor_id=actor_id or "anonymous",
-        now=now,
+    limit_reason = guard.claim_call(
+        actor_id=actor_id,
         utc_day=utc_day,
         rate_limit_per_minute=rate_limit_per_minute,
         daily_budget=daily_budget,
@@ -414,7 +660,7 @@ def search_medical_guidelines(
         "query": question.strip(),
         "search_depth": "basic",
         "include_domains": list(APPROVED_SEARCH_DOMAINS),
-        "max_results": safe_max_results,
+        "max_results": max_results,
         "include_answer": False,
         "include_raw_content": False,
     }
@@ -435,9 +681,9 @@ def search_medical_guidelines(
             max_retries=max(0, min(int(max_retries), 2)),
             max_retry_delay_seconds=max(0.0, max_retry_delay_seconds),
             sleeper=sleeper,
-            before_retry=lambda: _claim_retry_budget(utc_day, daily_budget),
+            before_retry=lambda: guard.claim_retry(utc_day, daily_budget),
         )
-        _record_provider_success()
+        guard.record_success()
     except MedicalSearchBudgetExceeded:
         audit_event("medical_search_blocked", reason="budget_exhausted_on_retry")
         return {
@@ -446,16 +692,14 @@ def search_medical_guidelines(
         }
     except (HTTPError, URLError, TimeoutError, ValueError, OSError) as error:
         logger.warning("Medical guideline search failed: %s", type(error).__name__)
-        _record_provider_failure(
-            now=clock(),
+        guard.record_failure(
             threshold=circuit_failure_threshold,
             cooldown_seconds=circuit_cooldown_seconds,
         )
         audit_event("medical_search_unavailable", reason=type(error).__name__)
         return {"status": "unavailable", "response": SEARCH_UNAVAILABLE}
 
-    approved_results: List[Dict[str, Any]] = []
-    seen_urls = set()
+    candidates = []
     for result in body.get("results", []) if isinstance(body, dict) else []:
         if not isinstance(result, dict):
             continue
@@ -464,14 +708,21 @@ def search_medical_guidelines(
             score = float(result.get("score", 0))
         except (TypeError, ValueError):
             continue
-        if score < min_score or url in seen_urls or not is_approved_source_url(url):
+        if score < min_score or not is_approved_source_url(url):
             continue
-        final_url = resolve_approved_final_url(
-            url,
-            opener=source_opener,
-            resolver=resolver,
-        )
-        if not final_url:
+        candidates.append((url, score, result))
+    final_urls = _resolve_provider_urls(
+        list(dict.fromkeys(url for url, _score, _result in candidates)),
+        opener=source_opener,
+        resolver=resolver,
+        ttl_seconds=resolved_url_ttl_seconds,
+    )
+
+    approved_results: List[Dict[str, Any]] = []
+    seen_urls = set()
+    for url, score, result in candidates:
+        final_url = final_urls[url]
+        if url in seen_urls or not final_url:
             continue
         title = _clean_text(result.get("title"), 180)
         content = _clean_text(result.get("content"), 700)
@@ -501,12 +752,12 @@ def search_medical_guidelines(
     approved_results.sort(
         key=lambda item: (item["source_priority"], -item["score"], item["url"])
     )
-    approved_results = approved_results[:safe_max_results]
+    approved_results = approved_results[:max_results]
 
     if not approved_results:
         audit_event("medical_search_no_approved_results")
         result = {"status": "not_found", "response": NO_GUIDELINE_RESULT}
-        _store_cached_result(key, result, clock(), cache_ttl_seconds)
+        cache.put(key, result, cache_ttl_seconds)
         return result
 
     retrieved_at = utcnow().astimezone(timezone.utc).isoformat()
@@ -539,7 +790,7 @@ def search_medical_guidelines(
         "retrieved_at": retrieved_at,
         "cache_hit": False,
     }
-    _store_cached_result(key, rendered, clock(), cache_ttl_seconds)
+    cache.put(key, rendered, cache_ttl_seconds)
     return rendered
 
 
@@ -0,0 +1,189 @@
+"""Shared PostgreSQL tier for allowlisted medical search results.
+
+Every API worker, the Streamlit process and the admin CLI read the
+``medical_search_results`` table, so a question one process already paid
+Tavily for is served from the table in the others. A bounded in-process LRU
+sits in front of it. Rows are keyed by the same SHA-256 ``_cache_key`` as the
+in-process cache and hold only the rendered allowlisted result, never the
+question text. A daemon sweeper deletes expired rows and trims the table to a
+maximum size, soonest-to-expire first. Table failures are logged and treated
+as misses, so search keeps working on the in-process tier alone.
+"""
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Optional
+
+from psycopg import Error as PostgresError
+from psycopg.types.json import Jsonb
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+from src.handlers.medical_guideline_search import (
+    SEARCH_CACHE_SWEEP_INTERVAL_SECONDS,
+    SearchResultCache,
+)
+from src.helpers.cache_sweeper import start_cache_sweeper
+from src.helpers.logging_config import logger
+
+
+MEMORY_SEARCH_CACHE_BACKEND = "memory"
+POSTGRES_SEARCH_CACHE_BACKEND = "postgres"
+SEARCH_CACHE_BACKENDS = frozenset({
+    MEMORY_SEARCH_CACHE_BACKEND,
+    POSTGRES_SEARCH_CACHE_BACKEND,
+})
+DEFAULT_SHARED_SEARCH_CACHE_MAX_ENTRIES = 10_000
+
+
+class SharedSearchResultCache:
+    """Two-tier search cache: process-local LRU over a shared table.
+
+    ``stats()`` reports table hits, misses, swept rows and storage errors,
+    with the in-process tier's counters under ``memory``.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        max_entries: int = DEFAULT_SHARED_SEARCH_CACHE_MAX_ENTRIES,
+        sweep_interval_seconds: float = SEARCH_CACHE_SWEEP_INTERVAL_SECONDS,
+        memory: Optional[SearchResultCache] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.pool = pool
+        self.max_entries = max(1, int(max_entries))
+        self.sweep_interval_seconds = float(sweep_interval_seconds)
+        # The shared sweeper also sweeps this tier, so it runs none of its own.
+        self.memory = memory or SearchResultCache(sweep_interval_seconds=0)
+        self.clock = clock
+        self._lock = Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "errors": 0}
+        self._sweeper_stop: Optional[Event] = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached
+        now = self.clock()
+        try:
+            with self.pool.connection() as connection:
+                row = connection.execute(
+                    """
+                    SELECT result, expires_at FROM medical_search_results
+                    WHERE cache_key = %s AND expires_at > %s
+                    """,
+                    (key, _timestamp(now)),
+                ).fetchone()
+        except (PostgresError, PoolTimeout) as error:
+            self._storage_failed("read", error)
+            return None
+        if row is None or not isinstance(row["result"], dict):
+            self._count("misses")
+            return None
+        self._count("hits")
+        # The decoded row is already a private copy; the LRU copies its own.
+        self.memory.put(key, row["result"], row["expires_at"].timestamp() - now)
+        return row["result"]
+
+    def put(self, key: str, result: Dict[str, Any], ttl_seconds: float) -> None:
+        if ttl_seconds <= 0:
+            return
+        self.memory.put(key, result, ttl_seconds)
+        now = self.clock()
+        try:
+            with self.pool.connection() as connection:
+                connection.execute(
+                    """
+                    INSERT INTO medical_search_results (
+                        cache_key, result, created_at, expires_at
+                    ) VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (cache_key) DO UPDATE
+                    SET result = EXCLUDED.result,
+                        created_at = EXCLUDED.created_at,
+                        expires_at = EXCLUDED.expires_at
+                    """,
+                    (
+                        key,
+                        Jsonb(result),
+                        _timestamp(now),
+                        _timestamp(now + ttl_seconds),
+                    ),
+                )
+        except (PostgresError, PoolTimeout) as error:
+            self._storage_failed("write", error)
+        with self._lock:
+            if self._sweeper_stop is None and self.sweep_interval_seconds > 0:
+                self._sweeper_stop = start_cache_sweeper(
+                    self, self.sweep_interval_seconds
+                )
+
+    def sweep(self) -> int:
+        """Drop expired entries from both tiers and trim the table.
+
+        Returns how many expired entries were removed; rows trimmed only to
+        respect ``max_entries`` are not counted.
+        """
+        removed = self.memory.sweep()
+        try:
+            with self.pool.connection() as connection:
+                expired = connection.execute(
+                    "DELETE FROM medical_search_results WHERE expires_at <= %s",
+                    (_timestamp(self.clock()),),
+                ).rowcount
+                connection.execute(
+                    """
+                    DELETE FROM medical_search_results
+                    WHERE cache_key IN (
+                        SELECT cache_key FROM medical_search_results
+                        ORDER BY expires_at DESC, cache_key
+                        OFFSET %s
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+        except (PostgresError, PoolTimeout) as error:
+            self._storage_failed("sweep", error)
+            return removed
+        self._count("expired", expired)
+        return removed + expired
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {**counters, "memory": self.memory.stats()}
+
+    def close(self) -> None:
+        """Stop the background sweeper, if one was started."""
+        with self._lock:
+            stop, self._sweeper_stop = self._sweeper_stop, None
+        if stop is not None:
+            stop.set()
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def _storage_failed(self, operation: str, error: Exception) -> None:
+        self._count("errors")
+        logger.warning(
+            "Medical search cache %s failed: %s", operation, type(error).__name__
+        )
+
+
+@lru_cache(maxsize=4)
+def get_shared_search_cache(
+    pool: ConnectionPool,
+    max_entries: int = DEFAULT_SHARED_SEARCH_CACHE_MAX_ENTRIES,
+    sweep_interval_seconds: float = SEARCH_CACHE_SWEEP_INTERVAL_SECONDS,
+) -> SharedSearchResultCache:
+    """Reuse one shared cache, and one sweeper, per corpus connection pool."""
+    return SharedSearchResultCache(
+        pool,
+        max_entries=max_entries,
+        sweep_interval_seconds=sweep_interval_seconds,
+    )
+
+
+def _timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
@@ -0,0 +1,209 @@
+"""Tavily rate limit, daily budget and circuit breaker shared via PostgreSQL.
+
+``ProcessProviderGuard`` keeps these controls per process, so N API workers
+allow N times the configured Tavily rate and budget, and a circuit tripped in
+one worker does not protect the others. ``PostgresProviderGuard`` keeps them
+in three small tables instead:
+
+- ``medical_search_rate_limits`` holds one token bucket per hashed actor. The
+  bucket is refilled and debited by a single ``INSERT ... ON CONFLICT DO
+  UPDATE ... WHERE`` statement, so concurrent claims cannot overdraw it.
+- ``medical_search_budget`` counts provider calls per UTC day with the same
+  conditional UPSERT.
+- ``medical_search_circuit`` is a single row of consecutive failures and the
+  time the circuit stays open.
+
+A claim debits the bucket and the budget in one transaction and rolls both
+back when either is exhausted. Any storage failure blocks the call, because
+the guard cannot prove the budget still allows it.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from psycopg import Error as PostgresError
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+from src.helpers.logging_config import logger
+
+
+MEMORY_SEARCH_GUARD_BACKEND = "memory"
+POSTGRES_SEARCH_GUARD_BACKEND = "postgres"
+SEARCH_GUARD_BACKENDS = frozenset({
+    MEMORY_SEARCH_GUARD_BACKEND,
+    POSTGRES_SEARCH_GUARD_BACKEND,
+})
+
+
+class PostgresProviderGuard:
+    """Drop-in replacement for ``ProcessProviderGuard`` across processes.
+
+    The rate limit is a token bucket holding ``rate_limit_per_minute`` tokens
+    and refilling at that rate, which matches the in-process sliding window
+    for steady traffic but lets a full bucket absorb one burst.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.pool = pool
+        self.clock = clock
+
+    def claim_call(
+        self,
+        actor_id: str,
+        utc_day: str,
+        rate_limit_per_minute: int,
+        daily_budget: int,
+        circuit_failure_threshold: int,
+    ) -> Optional[str]:
+        """Reserve one provider call, or return the reason it is blocked."""
+        now = _timestamp(self.clock())
+        actor_key = hashlib.sha256(actor_id.encode("utf-8")).hexdigest()
+        try:
+            with self.pool.connection() as connection:
+                reason = self._claim(
+                    connection,
+                    actor_key,
+                    now,
+                    utc_day,
+                    rate_limit_per_minute,
+                    daily_budget,
+                    circuit_failure_threshold,
+                )
+                if reason:
+                    connection.rollback()
+        except (PostgresError, PoolTimeout) as error:
+            logger.warning(
+                "Shared search guard claim failed: %s", type(error).__name__
+            )
+            return "circuit_open"
+        return reason
+
+    def claim_retry(self, utc_day: str, daily_budget: int) -> bool:
+        try:
+            with self.pool.connection() as connection:
+                return _debit_budget(connection, utc_day, daily_budget)
+        except (PostgresError, PoolTimeout) as error:
+            logger.warning(
+                "Shared search guard retry claim failed: %s", type(error).__name__
+            )
+            return False
+
+    def record_success(self) -> None:
+        self._update_circuit(
+            "UPDATE medical_search_circuit "
+            "SET failures = 0, open_until = NULL WHERE id = 1",
+            (),
+        )
+
+    def record_failure(self, threshold: int, cooldown_seconds: int) -> None:
+        open_until = _timestamp(self.clock() + max(1, cooldown_seconds))
+        self._update_circuit(
+            """
+            UPDATE medical_search_circuit
+            SET failures = failures + 1,
+                open_until = CASE
+                    WHEN %s > 0 AND failures + 1 >= %s THEN %s
+                    ELSE open_until
+                END
+            WHERE id = 1
+            """,
+            (threshold, threshold, open_until),
+        )
+
+    def _claim(
+        self,
+        connection: Any,
+        actor_key: str,
+        now: datetime,
+        utc_day: str,
+        rate_limit_per_minute: int,
+        daily_budget: int,
+        circuit_failure_threshold: int,
+    ) -> Optional[str]:
+        circuit = connection.execute(
+            "SELECT open_until FROM medical_search_circuit WHERE id = 1"
+        ).fetchone()
+        if circuit and circuit["open_until"] and circuit["open_until"] > now:
+            return "circuit_open"
+        if rate_limit_per_minute <= 0:
+            return "rate_limited"
+        capacity = float(rate_limit_per_minute)
+        token = connection.execute(
+            """
+            INSERT INTO medical_search_rate_limits (actor_hash, tokens, updated_at)
+            VALUES (%(actor)s, %(capacity)s - 1, %(now)s)
+            ON CONFLICT (actor_hash) DO UPDATE
+            SET tokens = LEAST(
+                    %(capacity)s,
+                    medical_search_rate_limits.tokens + %(per_second)s
+                    * GREATEST(0, EXTRACT(EPOCH FROM (
+                        %(now)s - medical_search_rate_limits.updated_at
+                    ))::DOUBLE PRECISION)
+                ) - 1,
+                updated_at = GREATEST(
+                    %(now)s, medical_search_rate_limits.updated_at
+                )
+            WHERE LEAST(
+                %(capacity)s,
+                medical_search_rate_limits.tokens + %(per_second)s
+                * GREATEST(0, EXTRACT(EPOCH FROM (
+                    %(now)s - medical_search_rate_limits.updated_at
+                ))::DOUBLE PRECISION)
+            ) >= 1
+            RETURNING tokens
+            """,
+            {
+                "actor": actor_key,
+                "capacity": capacity,
+                "per_second": capacity / 60.0,
+                "now": now,
+            },
+        ).fetchone()
+        if token is None:
+            return "rate_limited"
+        if not _debit_budget(connection, utc_day, daily_budget):
+            return "budget_exhausted"
+        if circuit_failure_threshold <= 0:
+            return "circuit_open"
+        return None
+
+    def _update_circuit(self, statement: str, params: tuple) -> None:
+        try:
+            with self.pool.connection() as connection:
+                connection.execute(statement, params)
+        except (PostgresError, PoolTimeout) as error:
+            logger.warning(
+                "Shared search guard update failed: %s", type(error).__name__
+            )
+
+
+def _debit_budget(connection: Any, utc_day: str, daily_budget: int) -> bool:
+    if daily_budget <= 0:
+        return False
+    row = connection.execute(
+        """
+        INSERT INTO medical_search_budget (utc_day, used) VALUES (%s, 1)
+        ON CONFLICT (utc_day) DO UPDATE
+        SET used = medical_search_budget.used + 1
+        WHERE medical_search_budget.used < %s
+        RETURNING used
+        """,
+        (utc_day, daily_budget),
+    ).fetchone()
+    return row is not None
+
+
+@lru_cache(maxsize=4)
+def get_shared_provider_guard(pool: ConnectionPool) -> PostgresProviderGuard:
+    """Reuse one guard per corpus connection pool."""
+    return PostgresProviderGuard(pool)
+
+
+def _timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
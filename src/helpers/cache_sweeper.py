@@ -0,0 +1,27 @@
+"""Background expiry for in-process and PostgreSQL-backed caches.
+
+A cache exposes ``sweep()``; ``start_cache_sweeper`` calls it on a daemon
+thread at a fixed interval, so expired entries and oversized tables are
+cleaned up off the request path.
+"""
+from threading import Event, Thread
+from typing import Any
+
+
+CACHE_SWEEP_INTERVAL_SECONDS = 60.0
+
+
+def start_cache_sweeper(cache: Any, interval_seconds: float) -> Event:
+    """Call ``cache.sweep()`` on a daemon thread until the event is set."""
+    stop = Event()
+
+    def sweep_until_stopped() -> None:
+        while not stop.wait(interval_seconds):
+            cache.sweep()
+
+    Thread(
+        target=sweep_until_stopped,
+        name="cache-sweeper",
+        daemon=True,
+    ).start()
+    return stop
@@ -0,0 +1,135 @@
+"""Cached DNS checks for outbound requests to allowlisted hosts.
+
+Discovery and ingestion only contact a handful of allowlisted hosts, yet
+checked every redirect hop and download with a blocking ``getaddrinfo``.
+``HostResolutionCache`` keeps each host's resolved addresses for a short TTL
+and remembers failed lookups for a shorter one. The "every address is
+global" check still runs on each call, against the cached addresses, and an
+unresolved host, an empty answer or any private, loopback, link-local or
+reserved address fails closed.
+"""
+import ipaddress
+import socket
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+
+DNS_CACHE_TTL_SECONDS = 60.0
+DNS_NEGATIVE_CACHE_TTL_SECONDS = 10.0
+DNS_CACHE_MAX_ENTRIES = 256
+
+
+class HostResolutionCache:
+    """Thread-safe LRU of host lookups with positive and negative TTLs.
+
+    Lookups run outside the lock, so a slow resolver never blocks hits for
+    other hosts. ``stats()`` reports hits, misses, negative hits (cached
+    failures served) and evictions.
+    """
+
+    def __init__(
+        self,
+        resolver: Callable[..., Any] = socket.getaddrinfo,
+        ttl_seconds: float = DNS_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: float = DNS_NEGATIVE_CACHE_TTL_SECONDS,
+        max_entries: int = DNS_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.resolver = resolver
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.negative_ttl_seconds = max(0.0, float(negative_ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self.clock = clock
+        self._lock = Lock()
+        self._entries: (
+            "OrderedDict[str, Tuple[float, Optional[FrozenSet[str]]]]"
+        ) = OrderedDict()
+        self._counters = _empty_counters()
+
+    def resolve(self, host: str) -> Optional[FrozenSet[str]]:
+        """Return the host's addresses, or ``None`` when the lookup failed."""
+        key = host.lower()
+        now = self.clock()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] > now:
+                self._entries.move_to_end(key)
+                addresses = cached[1]
+                self._counters["hits" if addresses else "negative_hits"] += 1
+                return addresses
+            self._counters["misses"] += 1
+        addresses = _lookup(key, self.resolver)
+        ttl_seconds = self.ttl_seconds if addresses else self.negative_ttl_seconds
+        if ttl_seconds > 0:
+            with self._lock:
+                self._entries[key] = (self.clock() + ttl_seconds, addresses)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return addresses
+
+    def has_only_public_addresses(self, host: str) -> bool:
+        return addresses_are_public(self.resolve(host))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters = _empty_counters()
+
+
+def host_has_only_public_addresses(
+    host: str, resolver: Optional[Callable[..., Any]] = None
+) -> bool:
+    """Reject unresolved, private, loopback, link-local and reserved targets.
+
+    The shared cache is used unless a ``resolver`` is injected, which is then
+    called directly so tests and callers with their own DNS see every lookup.
+    """
+    if resolver is None:
+        return _DEFAULT_CACHE.has_only_public_addresses(host)
+    return addresses_are_public(_lookup(host, resolver))
+
+
+def addresses_are_public(addresses: Optional[Iterable[str]]) -> bool:
+    if not addresses:
+        return False
+    try:
+        return all(
+            ipaddress.ip_address(address).is_global for address in addresses
+        )
+    except ValueError:
+        return False
+
+
+def host_resolution_stats() -> Dict[str, int]:
+    """Counters of the process-wide resolution cache."""
+    return _DEFAULT_CACHE.stats()
+
+
+def _lookup(
+    host: str, resolver: Callable[..., Any]
+) -> Optional[FrozenSet[str]]:
+    try:
+        records = resolver(host, 443, type=socket.SOCK_STREAM)
+        return frozenset(str(record[4][0]) for record in records) or None
+    except (OSError, ValueError, TypeError, IndexError):
+        return None
+
+
+def _empty_counters() -> Dict[str, int]:
+    return {"hits": 0, "misses": 0, "negative_hits": 0, "evictions": 0}
+
+
+_DEFAULT_CACHE = HostResolutionCache()
+
+
+def _reset_host_resolution_cache_for_tests() -> None:
+    """Clear the process-wide cache; intended only for isolated unit tests."""
+    _DEFAULT_CACHE.clear()
@@ -0,0 +1,86 @@
+"""Request coalescing for identical concurrent computations.
+
+When several threads ask for the same key at once, only the first runs the
+computation; the rest wait for it and receive a deep copy of its result, or
+a copy of its exception. A key is forgotten as soon as its computation finishes,
+so this never serves stale results; caching stays the caller's job.
+"""
+import copy
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("done", "waiters", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.waiters = 0
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, compute: Callable[[], T]) -> Tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is true for waiters.
+
+        The caller that ran ``compute`` gets its result as is. The result is
+        deep-copied once for the waiters, and again per waiter, only when
+        anyone waited, so neither side can change what another one sees.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise _copy_error(flight.error) from flight.error
+            return copy.deepcopy(flight.result), True
+
+        try:
+            result = compute()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            # No waiter can join once the key is gone, so the count is final.
+            with self._lock:
+                del self._flights[key]
+                waiters = flight.waiters
+            try:
+                if waiters and flight.error is None:
+                    flight.result = copy.deepcopy(result)
+            except BaseException as error:
+                # Waiters get the copy failure instead of blocking forever.
+                flight.error = error
+                if not isinstance(error, Exception):
+                    raise
+            finally:
+                flight.done.set()
+        return result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._flights)
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """Give each waiter its own exception object, so tracebacks stay apart."""
+    try:
+        return copy.copy(error)
+    except Exception:  # pylint: disable=broad-except
+        return RuntimeError(f"Shared computation failed: {type(error).__name__}")
@@ -11,6 +11,7 @@ from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 from src.config.settings import Config
 from src.handlers.curated_guidelines import retrieve_guidelines_with_auto_ingest
+from src.handlers.medical_search_cache import POSTGRES_SEARCH_CACHE_BACKEND
 from src.helpers.logging_config import logger
 from src.handlers.grounding_verifier import (
     format_grounded_response,
@@ -61,6 +62,13 @@ class PatientGuidelineToolInput(BaseModel):
     )
 
 
+def _search_cache_options(config: Config) -> Optional[Dict[str, Any]]:
+    """Share discovery results through PostgreSQL only when configured."""
+    if config.medical_search_cache_backend != POSTGRES_SEARCH_CACHE_BACKEND:
+        return None
+    return {"max_entries": config.medical_search_cache_max_entries}
+
+
 def _guideline_options(config: Config, actor_id: str) -> Dict[str, Any]:
     """Build the shared bounded trusted-guideline retrieval policy."""
     return {
@@ -71,9 +79,23 @@ def _guideline_options(config: Config, actor_id: str) -> Dict[str, Any]:
         "tavily_api_key": config.tavily_api_key,
         "top_k": config.curated_retrieval_top_k,
         "min_score": config.curated_retrieval_min_score,
+        "retrieval_mode": config.curated_retrieval_mode,
+        "query_cache_options": {
+            "ttl_seconds": config.curated_query_cache_ttl_seconds,
+            "max_entries": config.curated_query_cache_max_entries,
+        },
         "auto_ingest_enabled": config.curated_auto_ingest_enabled,
+        "auto_ingest_mode": config.curated_auto_ingest_mode,
+        "search_cache_options": _search_cache_options(config),
+        "search_guard_backend": config.medical_search_guard_backend,
         "discovery_max_results": config.curated_discovery_max_results,
         "auto_ingest_max_documents": config.curated_auto_ingest_max_documents,
+        "store_options": {
+            "vector_backend": config.curated_vector_backend,
+            "vector_dimensions": config.curated_vector_dimensions,
+            "index_directory": config.curated_index_directory or None,
+            "vector_precision": config.curated_vector_precision,
+        },
         "search_options": {
             "min_score": config.medical_search_min_score,
             "actor_id": actor_id,
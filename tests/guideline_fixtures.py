@@ -0,0 +1,113 @@
+"""Shared fixtures for curated-guideline tests and benchmarks.
+
+``synthetic_pdf`` builds deterministic PDFs for extraction tests, and
+``reference_pack_sentence_units`` is the straightforward packer the optimized
+chunker is checked against.
+"""
+from typing import Dict, List, Sequence
+
+from src.handlers.curated_guidelines import _count_tokens
+
+
+def synthetic_pdf(page_count: int, outline_every: int = 0) -> bytes:
+    """Build an uncompressed PDF with a bold heading and body text per page.
+
+    With ``outline_every``, every n-th page from page n onwards gets an
+    outline entry, so earlier pages exercise font-based heading detection.
+    """
+    fonts = {3: b"Helvetica", 4: b"Helvetica-Bold"}
+    page_ids = [5 + 2 * index for index in range(page_count)]
+    outlined = [
+        index for index in range(page_count)
+        if outline_every and index >= outline_every and index % outline_every == 0
+    ]
+    outline_root = 5 + 2 * page_count
+    objects: Dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R"
+        + (f" /Outlines {outline_root} 0 R".encode() if outlined else b"")
+        + b" >>",
+        2: b"<< /Type /Pages /Kids ["
+        + b" ".join(f"{page_id} 0 R".encode() for page_id in page_ids)
+        + f"] /Count {page_count} >>".encode(),
+    }
+    for object_id, name in fonts.items():
+        objects[object_id] = (
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /" + name + b" >>"
+        )
+    for index, page_id in enumerate(page_ids):
+        lines = [f"BT /F2 18 Tf 72 740 Td (Section {index + 1} heading) Tj ET"]
+        lines.extend(
+            f"BT /F1 11 Tf 72 {710 - 16 * line} Td (Recommendation {index + 1}.{line} "
+            f"covers blood pressure targets and follow-up visits.) Tj ET"
+            for line in range(30)
+        )
+        stream = "\n".join(lines).encode("latin-1")
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]"
+            b" /Resources << /Font << /F1 3 0 R /F2 4 0 R >> >>"
+            + f" /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects[page_id + 1] = (
+            f"<< /Length {len(stream)} >>\nstream\n".encode()
+            + stream
+            + b"\nendstream"
+        )
+    if outlined:
+        item_ids = [outline_root + 1 + offset for offset in range(len(outlined))]
+        objects[outline_root] = (
+            f"<< /Type /Outlines /First {item_ids[0]} 0 R"
+            f" /Last {item_ids[-1]} 0 R /Count {len(item_ids)} >>"
+        ).encode()
+        for offset, (item_id, page_index) in enumerate(zip(item_ids, outlined)):
+            links = ""
+            if offset:
+                links += f" /Prev {item_ids[offset - 1]} 0 R"
+            if offset + 1 < len(item_ids):
+                links += f" /Next {item_ids[offset + 1]} 0 R"
+            objects[item_id] = (
+                f"<< /Title (Chapter {offset + 1}) /Parent {outline_root} 0 R"
+                f" /Dest [{page_ids[page_index]} 0 R /Fit]{links} >>"
+            ).encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += f"{object_id} 0 obj\n".encode() + objects[object_id]
+        output += b"\nendobj\n"
+    size = max(objects) + 1
+    xref = len(output)
+    output += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for object_id in range(1, size):
+        output += f"{offsets[object_id]:010d} 00000 n \n".encode()
+    output += (
+        f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(output)
+
+
+def reference_pack_sentence_units(
+    units: Sequence[str], token_budget: int, overlap_tokens: int
+) -> List[str]:
+    """Reference packer: re-encodes every candidate window from scratch."""
+    packed: List[str] = []
+    current: List[str] = []
+    for unit in units:
+        candidate = " ".join((*current, unit))
+        if current and _count_tokens(candidate) > token_budget:
+            packed.append(" ".join(current))
+            overlap: List[str] = []
+            overlap_count = 0
+            for previous in reversed(current):
+                previous_tokens = _count_tokens(previous)
+                if overlap_count + previous_tokens > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_count += previous_tokens
+            current = overlap
+            while current and _count_tokens(" ".join((*current, unit))) > token_budget:
+                current.pop(0)
+        current.append(unit)
+    if current:
+        packed.append(" ".join(current))
+    return packed
@@ -1,10 +1,19 @@
 """Tests for reviewed, versioned medical-guideline ingestion and retrieval."""
+import hashlib
+import json
 import os
+import tempfile
+import threading
+import time
 import unittest
 import uuid
+from dataclasses import replace
 from datetime import date, datetime, timezone
+from unittest import mock
 
+import numpy as np
 import psycopg
+import tiktoken
 from psycopg import sql
 
 from src.handlers.curated_guidelines import (
@@ -14,10 +23,19 @@ from src.handlers.curated_guidelines import (
     CuratedGuidelineStore,
     DocumentMetadata,
     DownloadedDocument,
+    EmbeddingProviderError,
     ExtractedSection,
     GuidelineIngestionError,
+    OpenAIEmbedder,
+    _AUTO_INGEST_FLIGHTS,
+    _LexicalTokenEncoder,
+    _count_tokens_batch,
     _extract_pdf_document_sections,
     _extract_pdf_sections,
+    _pack_sentence_units,
+    _pdf_page_ranges,
+    _sentence_units,
+    auto_ingest_trusted_guidelines,
     build_child_chunks,
     chunk_sections,
     download_approved_document,
@@ -27,8 +45,26 @@ from src.handlers.curated_guidelines import (
     prewarm_guideline_corpus,
     retrieve_curated_guidelines,
     retrieve_guidelines_with_auto_ingest,
+    run_guideline_ingestion_worker,
+)
+from src.handlers.guideline_bulk_ingest import (
+    bulk_ingest_guidelines,
+    read_bulk_manifest,
+)
+from src.handlers.guideline_embedding_cache import (
+    CachingEmbedder,
+    _reset_query_cache_for_tests,
+)
+from src.handlers.guideline_ingestion_queue import (
+    INGESTION_JOB_LEASE_SECONDS,
+    claim_ingestion_job,
+    enqueue_ingestion_job,
+    finish_ingestion_job,
 )
 from src.handlers.medical_guideline_search import SENSITIVE_SEARCH_REFUSAL
+from src.handlers.medical_search_cache import SharedSearchResultCache
+from src.handlers.medical_search_guard import PostgresProviderGuard
+from tests.guideline_fixtures import reference_pack_sentence_units, synthetic_pdf
 
 
 SOURCE_URL = "https://www.who.int/news-room/fact-sheets/detail/hypertension"
@@ -46,6 +82,8 @@ class _FakeResponse:
         self.status = status
         self.url = url
         self.headers = headers or {}
+        self.position = 0
+        self.reads = []
 
     def __enter__(self):
         return self
@@ -54,7 +92,10 @@ class _FakeResponse:
         return False
 
     def read(self, limit):
-        return self.body[:limit]
+        self.reads.append(limit)
+        chunk = self.body[self.position:self.position + limit]
+        self.position += len(chunk)
+        return chunk
 
     def geturl(self):
         return self.url
@@ -84,12 +125,55 @@ class _FakeEmbedder:
         return vectors
 
 
+class _QueryOutageEmbedder(_FakeEmbedder):
+    """Embeds documents, then fails like an unavailable provider."""
+
+    def __init__(self):
+        super().__init__()
+        self.available = True
+
+    def embed(self, texts):
+        if not self.available:
+            raise EmbeddingProviderError("provider unavailable")
+        return super().embed(texts)
+
+
 class _NonFiniteEmbedder(_FakeEmbedder):
     def embed(self, texts):
         self.calls.append(list(texts))
         return [[float("nan"), 1.0] for _text in texts]
 
 
+class _ProviderStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class _FakeEmbeddingsClient:
+    """Records batches; fails the first call for inputs listed in ``failures``."""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.batches = []
+        self.threads = set()
+        self.lock = threading.Lock()
+        self.embeddings = self
+
+    def create(self, model, input):  # pylint: disable=redefined-builtin
+        with self.lock:
+            self.batches.append(list(input))
+            self.threads.add(threading.get_ident())
+            status = self.failures.pop(input[0], None)
+        if status is not None:
+            raise _ProviderStatusError(status)
+        data = [
+            type("Item", (), {"index": index, "embedding": [float(len(text)), 1.0]})
+            for index, text in reversed(list(enumerate(input)))
+        ]
+        return type("Response", (), {"data": data})
+
+
 class _FakePdfPage:
     def __init__(self, text):
         self.text = text
@@ -115,6 +199,39 @@ class _FakePdfReader:
         return item.page_number
 
 
+CHUNKING_FIXTURES = (
+    "A sentence. " * 80,
+    "B sentence. " * 80,
+    "First complete recommendation is retained. "
+    + "Second complete recommendation is retained. " * 20,
+    "word " * 300,
+    "Tăng huyết áp: dùng amlodipine 5 mg, theo dõi sau 2 tuần; "
+    "nếu chưa đạt, tăng liều. (Khuyến cáo loại I) 'Lưu ý' cho người cao tuổi! "
+    * 25,
+    "Dose 1,000 mg/day; max 2,550 mg/day: titrate every 7-14 days.\n\n"
+    "Stop if eGFR < 30 mL/min/1.73 m². " * 15,
+)
+
+
+def _cl100k_pattern_encoder():
+    """Small offline BPE using the cl100k pre-tokenizer pattern."""
+    ranks = {bytes([value]): value for value in range(256)}
+    for text in CHUNKING_FIXTURES:
+        raw = text.encode("utf-8")
+        for width in (2, 3, 4):
+            for start in range(0, len(raw) - width + 1, 3):
+                ranks.setdefault(raw[start:start + width], len(ranks))
+    return tiktoken.Encoding(
+        name="cl100k-pattern-test",
+        pat_str=(
+            r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+|"""
+            r""" ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+        ),
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+
+
 def _metadata(version="2026.1", effective_until=None):
     return DocumentMetadata(
         title="WHO Hypertension Guideline",
@@ -174,7 +291,10 @@ class CuratedGuidelineTests(unittest.TestCase):
         if self.postgres_uri:
             self.store = CuratedGuidelineStore(self.postgres_uri)
             with self.store.pool.connection() as connection:
-                connection.execute("TRUNCATE guideline_documents CASCADE")
+                connection.execute(
+                    "TRUNCATE guideline_documents, guideline_chunk_embeddings, "
+                    "guideline_ingestion_jobs CASCADE"
+                )
 
     def tearDown(self):
         if self.store is not None:
@@ -261,6 +381,68 @@ class CuratedGuidelineTests(unittest.TestCase):
         self.assertEqual("budget_exhausted", result["stopped_reason"])
         self.assertEqual(["Topic one"], calls)
 
+    def test_parallel_prewarm_runs_topics_concurrently_in_input_order(self):
+        started = threading.Barrier(3, timeout=10)
+
+        def retriever(question, **_options):
+            started.wait()
+            if question == "Topic two":
+                return {
+                    "status": "success",
+                    "auto_ingest": {
+                        "status": "success",
+                        "ingested": [{"document_id": "doc-2"}],
+                    },
+                }
+            return {"status": "success", "evidence": [{"id": "G1"}]}
+
+        result = prewarm_guideline_corpus(
+            topics=["Topic one", "Topic two", "Topic three"],
+            retrieval_options={},
+            retriever=retriever,
+            max_workers=3,
+        )
+
+        self.assertFalse(started.broken)
+        self.assertEqual("success", result["status"])
+        self.assertTrue(result["completed_all"])
+        self.assertEqual(
+            ["Topic one", "Topic two", "Topic three"],
+            [item["topic"] for item in result["topics"]],
+        )
+        self.assertEqual(
+            ["already_covered", "warmed", "already_covered"],
+            [item["outcome"] for item in result["topics"]],
+        )
+
+    def test_parallel_prewarm_stops_all_workers_after_terminal_status(self):
+        started = threading.Barrier(2, timeout=10)
+        calls = []
+
+        def retriever(question, **_options):
+            calls.append(question)
+            started.wait()
+            return {
+                "status": "corpus_empty",
+                "auto_ingest": {"status": "circuit_open", "ingested": []},
+            }
+
+        result = prewarm_guideline_corpus(
+            topics=["Topic one", "Topic two", "Topic three", "Topic four"],
+            retrieval_options={},
+            retriever=retriever,
+            max_workers=2,
+        )
+
+        self.assertCountEqual(["Topic one", "Topic two"], calls)
+        self.assertEqual(2, result["topics_processed"])
+        self.assertEqual(
+            ["Topic one", "Topic two"],
+            [item["topic"] for item in result["topics"]],
+        )
+        self.assertEqual("circuit_open", result["stopped_reason"])
+        self.assertEqual("failed", result["status"])
+
     def test_default_prewarm_taxonomy_is_bounded_and_deidentified(self):
         self.assertEqual(10, len(DEFAULT_PREWARM_TOPICS))
         self.assertEqual(len(DEFAULT_PREWARM_TOPICS), len(set(DEFAULT_PREWARM_TOPICS)))
@@ -326,6 +508,26 @@ class CuratedGuidelineTests(unittest.TestCase):
             structured[1].section_path,
         )
 
+    def test_parallel_pdf_extraction_matches_serial_pass(self):
+        content = synthetic_pdf(40, outline_every=10)
+
+        serial = extract_document_sections(content, "application/pdf", pdf_workers=1)
+        parallel = extract_document_sections(
+            content, "application/pdf", pdf_workers=2
+        )
+
+        self.assertEqual(serial, parallel)
+        self.assertEqual([(0, 20), (20, 40)], _pdf_page_ranges(40, 2))
+        self.assertEqual("Section 1 heading", parallel[0].heading)
+        self.assertEqual(
+            ["Chapter 1", "Chapter 2", "Chapter 3"],
+            [
+                section.section_path
+                for section in parallel
+                if section.section_path.startswith("Chapter")
+            ],
+        )
+
     def test_controlled_download_uses_validated_final_url_and_content_type(self):
         html = b"<h1>Approved guideline</h1><p>Full text</p>"
 
@@ -345,7 +547,40 @@ class CuratedGuidelineTests(unittest.TestCase):
 
         self.assertEqual(SOURCE_URL, document.final_url)
         self.assertEqual("text/html", document.content_type)
-        self.assertEqual(html, document.content)
+        self.assertEqual(html, document.read_content())
+        self.assertEqual(hashlib.sha256(html).hexdigest(), document.sha256())
+
+    def test_controlled_download_streams_in_bounded_chunks(self):
+        body = bytes(range(256)) * 1200
+        response = _FakeResponse(
+            body=body,
+            status=200,
+            url=SOURCE_URL,
+            headers={"Content-Type": "application/pdf"},
+        )
+
+        def download(max_bytes):
+            response.position = 0
+            return download_approved_document(
+                SOURCE_URL,
+                head_opener=lambda request, timeout: _FakeResponse(
+                    status=200, url=request.full_url
+                ),
+                get_opener=lambda _request, timeout: response,
+                resolver=_public_resolver,
+                max_bytes=max_bytes,
+            )
+
+        document = download(len(body))
+
+        self.assertEqual(b"", document.content)
+        self.assertEqual(len(body), document.size)
+        self.assertEqual(hashlib.sha256(body).hexdigest(), document.sha256())
+        self.assertEqual(body, b"".join(document.iter_chunks(4096)))
+        self.assertLessEqual(max(response.reads), 64 * 1024)
+        document.close()
+        with self.assertRaisesRegex(GuidelineIngestionError, "size limit"):
+            download(len(body) - 1)
 
     def test_controlled_download_rejects_get_response_url_change(self):
         with self.assertRaisesRegex(GuidelineIngestionError, "changed URL"):
@@ -405,6 +640,41 @@ class CuratedGuidelineTests(unittest.TestCase):
             for chunk in chunks
         ))
 
+    def test_running_count_packing_matches_reference_chunks(self):
+        for encoder in (_LexicalTokenEncoder(), _cl100k_pattern_encoder()):
+            with mock.patch(
+                "src.handlers.curated_guidelines._token_encoder",
+                return_value=encoder,
+            ):
+                for text, budget, overlap in (
+                    (text, budget, overlap)
+                    for text in CHUNKING_FIXTURES
+                    for budget, overlap in ((32, 0), (48, 8), (96, 8), (340, 50))
+                ):
+                    units = _sentence_units(text, budget)
+                    self.assertEqual(
+                        reference_pack_sentence_units(
+                            [unit for unit, _count in units], budget, overlap
+                        ),
+                        _pack_sentence_units(units, budget, overlap),
+                    )
+
+    def test_token_counts_are_memoized_and_batched(self):
+        encoder = mock.Mock(wraps=_LexicalTokenEncoder())
+        encoder.name = "counting-lexical"
+        texts = [f"Unit {index} lowers blood pressure." for index in range(20)]
+
+        with mock.patch(
+            "src.handlers.curated_guidelines._token_encoder", return_value=encoder
+        ):
+            first = _count_tokens_batch(texts)
+            second = _count_tokens_batch([texts[0], texts[0], "New unit."])
+
+        self.assertEqual([6] * 20, first)
+        self.assertEqual([6, 6, 3], second)
+        encoder.encode_ordinary_batch.assert_called_once()
+        encoder.encode_ordinary.assert_called_once_with("New unit.")
+
     def test_single_oversized_sentence_is_hard_split_within_budget(self):
         chunks = build_child_chunks(
             [ExtractedSection(
@@ -421,6 +691,32 @@ class CuratedGuidelineTests(unittest.TestCase):
         self.assertGreater(len(chunks), 1)
         self.assertTrue(all(chunk.token_count <= 80 for chunk in chunks))
 
+    def test_embedder_batches_by_tokens_and_retries_each_batch(self):
+        texts = [f"chunk {index} " + "word " * (index % 7) for index in range(150)]
+        delays = []
+        embedder = OpenAIEmbedder(
+            "https://models.example.test",
+            "test-key",
+            "test-embedding-v1",
+            max_workers=3,
+            batch_max_tokens=60,
+            sleeper=delays.append,
+        )
+        embedder.client = _FakeEmbeddingsClient(failures={texts[0]: 429})
+
+        vectors = embedder.embed(texts)
+
+        self.assertEqual([[float(len(text)), 1.0] for text in texts], vectors)
+        self.assertEqual([0.25], delays)
+        batches = embedder.client.batches
+        self.assertEqual(2, sum(batch[0] == texts[0] for batch in batches))
+        self.assertGreater(len(batches), 4)
+        self.assertTrue(all(len(batch) <= 64 for batch in batches))
+
+        embedder.client = _FakeEmbeddingsClient(failures={texts[0]: 400})
+        with self.assertRaisesRegex(EmbeddingProviderError, "request failed"):
+            embedder.embed(texts)
+
     def test_ingestion_is_pending_until_reviewed_hash_is_approved(self):
         self._require_store()
         html = (
@@ -530,6 +826,63 @@ class CuratedGuidelineTests(unittest.TestCase):
         self.assertTrue(matches)
         self.assertTrue(all(item["version"] == "2026.2" for item in matches))
 
+    def test_pgvector_backend_backfills_arrays_and_matches_array_ranking(self):
+        self._require_store()
+        with self.store.pool.connection() as connection:
+            available = connection.execute(
+                "SELECT 1 FROM pg_available_extensions WHERE name = 'vector'"
+            ).fetchone()
+        if available is None:
+            self.skipTest("pgvector extension is not installed")
+        first = self._add_pending("2026.1", b"first")
+        self.store.approve(
+            first["document_id"], "reviewer", first["content_hash"], self.embedder
+        )
+        expected = self.store.search(
+            [1.0, 0.2], self.embedder.model, 3, 0.0, date(2026, 1, 10)
+        )
+
+        vector_store = CuratedGuidelineStore(
+            self.postgres_uri, vector_backend="pgvector", vector_dimensions=2
+        )
+        try:
+            migrated = vector_store.search(
+                [1.0, 0.2], self.embedder.model, 3, 0.0, date(2026, 1, 10)
+            )
+            second = self._add_pending("2026.2", b"second")
+            vector_store.approve(
+                second["document_id"],
+                "reviewer",
+                second["content_hash"],
+                self.embedder,
+            )
+            with vector_store.pool.connection() as connection:
+                missing = connection.execute(
+                    """
+                    SELECT COUNT(*) AS count FROM guideline_sections
+                    WHERE embedding_vector IS NULL
+                    """
+                ).fetchone()["count"]
+            activated = vector_store.search(
+                [1.0, 0.2], self.embedder.model, 3, 0.0, date(2026, 1, 10)
+            )
+            with self.assertRaises(ValueError):
+                CuratedGuidelineStore(self.postgres_uri, vector_backend="faiss")
+        finally:
+            vector_store.close()
+
+        self.assertEqual(
+            [(item["section_id"], item["score"]) for item in expected],
+            [(item["section_id"], item["score"]) for item in migrated],
+        )
+        self.assertEqual(
+            [item["content"] for item in expected],
+            [item["content"] for item in migrated],
+        )
+        self.assertEqual(0, missing)
+        self.assertTrue(activated)
+        self.assertTrue(all(item["version"] == "2026.2" for item in activated))
+
     def test_retrieval_expands_neighbor_chunks_for_large_parent(self):
         self._require_store()
         content = " ".join(
@@ -664,15 +1017,371 @@ class CuratedGuidelineTests(unittest.TestCase):
         ))
         self.assertIn("Nguồn chính thức tự động xác minh", result["response"])
         self.assertEqual(1, len(search_calls))
-        self.assertEqual(
+        self.assertCountEqual(
             [WHO_DIABETES_URL, WHO_OBESITY_URL, NICE_URL], download_calls
         )
+        self.assertEqual(
+            [WHO_DIABETES_URL, WHO_OBESITY_URL, NICE_URL],
+            [item["final_url"] for item in result["auto_ingest"]["ingested"]],
+        )
         self.assertEqual(3, len(self.store.list_documents()))
         self.assertTrue(all(
             item["review_status"] == TRUSTED_OFFICIAL_STATUS
             for item in self.store.list_documents()
         ))
 
+    def test_auto_ingest_runs_candidates_concurrently_in_rank_order(self):
+        self._require_store()
+        urls = [WHO_DIABETES_URL, WHO_OBESITY_URL, NICE_URL, CDC_URL]
+        started = threading.Barrier(3, timeout=10)
+        download_calls = []
+
+        def downloader(url):
+            download_calls.append(url)
+            if url != CDC_URL:
+                started.wait()
+            if url == WHO_OBESITY_URL:
+                raise GuidelineIngestionError("download failed")
+            return DownloadedDocument(
+                source_url=url,
+                final_url=url,
+                content_type="text/html",
+                content=f"<h1>Guidance</h1><p>Official {url}</p>".encode("utf-8"),
+            )
+
+        result = auto_ingest_trusted_guidelines(
+            question="Hypertension guideline",
+            store=self.store,
+            embedder=self.embedder,
+            tavily_api_key="tavily-key",
+            searcher=lambda **_kwargs: {
+                "status": "success",
+                "evidence": [
+                    {
+                        "title": f"Guidance {index}",
+                        "final_url": url,
+                        "source_name": "Official",
+                        "publication_date": "2026-01-01",
+                        "source_priority": 20 + index,
+                        "score": 0.9,
+                    }
+                    for index, url in enumerate(urls)
+                ],
+            },
+            downloader=downloader,
+            on_date=date(2026, 1, 10),
+        )
+
+        self.assertFalse(started.broken)
+        self.assertEqual(
+            [WHO_DIABETES_URL, NICE_URL, CDC_URL],
+            [item["final_url"] for item in result["ingested"]],
+        )
+        self.assertEqual(1, result["skipped"])
+        self.assertEqual(4, len(download_calls))
+
+    def test_concurrent_auto_ingest_coalesces_only_for_the_same_model(self):
+        self._require_store()
+        release = threading.Event()
+        search_calls = []
+        results = []
+
+        class _OtherModelEmbedder(_FakeEmbedder):
+            model = "test-embedding-v2"
+
+        def searcher(**_kwargs):
+            search_calls.append(1)
+            release.wait(5)
+            return {"status": "not_found", "evidence": []}
+
+        def ingest(embedder):
+            results.append(auto_ingest_trusted_guidelines(
+                question="Hypertension guideline",
+                store=self.store,
+                embedder=embedder,
+                tavily_api_key="tavily-key",
+                searcher=searcher,
+                on_date=date(2026, 1, 10),
+            ))
+
+        def wait_until(condition):
+            deadline = time.monotonic() + 5
+            while not condition():
+                if time.monotonic() > deadline:
+                    self.fail("condition not reached")
+                time.sleep(0.005)
+
+        threads = [
+            threading.Thread(target=ingest, args=(embedder,))
+            for embedder in (self.embedder, _OtherModelEmbedder(), self.embedder)
+        ]
+        threads[0].start()
+        wait_until(lambda: len(search_calls) == 1)
+        threads[1].start()
+        wait_until(lambda: len(search_calls) == 2)
+        threads[2].start()
+        wait_until(lambda: any(
+            flight.waiters
+            for flight in list(
+                _AUTO_INGEST_FLIGHTS._flights.values()  # pylint: disable=protected-access
+            )
+        ))
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(2, len(search_calls))
+        self.assertEqual(["not_found"] * 3, [item["status"] for item in results])
+
+    def test_queue_mode_enqueues_miss_without_discovery(self):
+        self._require_store()
+        search_calls = []
+
+        def retrieve(question):
+            return retrieve_guidelines_with_auto_ingest(
+                question=question,
+                postgres_uri=self.postgres_uri,
+                endpoint="unused",
+                api_key="unused",
+                embedding_model=self.embedder.model,
+                tavily_api_key="tavily-key",
+                embedder=self.embedder,
+                store=self.store,
+                searcher=lambda **kwargs: search_calls.append(kwargs),
+                auto_ingest_mode="queue",
+            )
+
+        first = retrieve("Hướng dẫn tăng huyết áp")
+        second = retrieve("  hướng dẫn   TĂNG huyết áp ")
+
+        self.assertEqual("indexing", first["status"])
+        self.assertEqual("queued", first["auto_ingest"]["status"])
+        self.assertEqual("indexing", second["status"])
+        self.assertEqual("already_queued", second["auto_ingest"]["status"])
+        self.assertEqual([], search_calls)
+        with self.store.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT topic, status FROM guideline_ingestion_jobs"
+            ).fetchall()
+        self.assertEqual(
+            [{"topic": "Hướng dẫn tăng huyết áp", "status": "queued"}], rows
+        )
+
+    def test_ingestion_worker_runs_jobs_and_retries_transient_failures(self):
+        self._require_store()
+        enqueue_ingestion_job(self.store.pool, "Hypertension guideline")
+        enqueue_ingestion_job(self.store.pool, "Asthma guideline")
+        calls = []
+
+        def retriever(question, **options):
+            calls.append((question, options))
+            if question == "Hypertension guideline":
+                return {
+                    "status": "success",
+                    "auto_ingest": {
+                        "status": "success",
+                        "ingested": [{"document_id": "doc-1"}],
+                    },
+                }
+            return {
+                "status": "corpus_empty",
+                "auto_ingest": {"status": "rate_limited", "ingested": []},
+            }
+
+        counts = run_guideline_ingestion_worker(
+            self.store,
+            {"marker": "test"},
+            retriever=retriever,
+            drain=True,
+            max_attempts=2,
+            retry_delay_seconds=0,
+        )
+
+        self.assertEqual(
+            {"processed": 3, "done": 1, "retried": 1, "failed": 1}, counts
+        )
+        self.assertEqual(
+            ["Hypertension guideline", "Asthma guideline", "Asthma guideline"],
+            [question for question, _options in calls],
+        )
+        self.assertTrue(all(
+            options["store"] is self.store
+            and options["auto_ingest_mode"] == "sync"
+            and options["marker"] == "test"
+            for _question, options in calls
+        ))
+        with self.store.pool.connection() as connection:
+            rows = connection.execute(
+                """
+                SELECT topic, status, attempts, result_status, documents_ingested
+                FROM guideline_ingestion_jobs ORDER BY documents_ingested
+                """
+            ).fetchall()
+        self.assertEqual(
+            [
+                {
+                    "topic": None,
+                    "status": "failed",
+                    "attempts": 2,
+                    "result_status": "rate_limited",
+                    "documents_ingested": 0,
+                },
+                {
+                    "topic": None,
+                    "status": "done",
+                    "attempts": 1,
+                    "result_status": "success",
+                    "documents_ingested": 1,
+                },
+            ],
+            rows,
+        )
+
+    def test_ingestion_jobs_skip_locked_rows_and_reclaim_expired_leases(self):
+        self._require_store()
+        job_id = enqueue_ingestion_job(
+            self.store.pool, "Hypertension guideline"
+        )["job_id"]
+
+        with psycopg.connect(self.postgres_uri) as locker:
+            locker.execute(
+                "SELECT 1 FROM guideline_ingestion_jobs FOR UPDATE"
+            ).fetchall()
+            self.assertIsNone(claim_ingestion_job(self.store.pool))
+
+        first = claim_ingestion_job(self.store.pool)
+        self.assertEqual((job_id, "Hypertension guideline", 1), (
+            first.topic_hash, first.topic, first.attempts
+        ))
+        self.assertIsNone(claim_ingestion_job(self.store.pool))
+
+        later = time.time() + INGESTION_JOB_LEASE_SECONDS + 1
+        reclaimed = claim_ingestion_job(self.store.pool, clock=lambda: later)
+        self.assertEqual((job_id, 2), (reclaimed.topic_hash, reclaimed.attempts))
+        self.assertFalse(finish_ingestion_job(self.store.pool, first, "success"))
+        self.assertTrue(finish_ingestion_job(self.store.pool, reclaimed, "success"))
+        self.assertEqual(
+            "recently_attempted",
+            enqueue_ingestion_job(self.store.pool, "hypertension  GUIDELINE")[
+                "status"
+            ],
+        )
+        self.assertEqual(
+            "queued",
+            enqueue_ingestion_job(
+                self.store.pool,
+                "Hypertension guideline",
+                clock=lambda: later + 2 * 24 * 60 * 60,
+            )["status"],
+        )
+
+    def _write_manifest(self, directory, documents):
+        lines = []
+        for name, content, fields in documents:
+            with open(os.path.join(directory, name), "wb") as handle:
+                handle.write(content)
+            lines.append(json.dumps({
+                "path": name,
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "title": "Guideline",
+                "publisher": "Ministry of Health",
+                "publication_date": "2026-01-01",
+                "effective_from": "2026-01-02",
+                **fields,
+            }))
+        manifest = os.path.join(directory, "manifest.jsonl")
+        with open(manifest, "w", encoding="utf-8") as handle:
+            handle.write("\n".join(lines) + "\n")
+        return manifest
+
+    def test_bulk_ingest_activates_manifest_documents_in_batches(self):
+        self._require_store()
+        internal_url = "https://moh.example/guidelines/hypertension"
+        with tempfile.TemporaryDirectory() as directory:
+            manifest = self._write_manifest(directory, [
+                (
+                    "hypertension-v1.html",
+                    b"<h1>Hypertension</h1><p>Lower blood pressure slowly.</p>",
+                    {"source_url": internal_url, "version": "2026.1"},
+                ),
+                (
+                    "diabetes.txt",
+                    b"# Diabetes\nMonitor glucose every visit.\n",
+                    {"source_url": SOURCE_URL, "version": "2026.1"},
+                ),
+                (
+                    "hypertension-v2.html",
+                    b"<h1>Hypertension</h1><p>Lower blood pressure gradually.</p>",
+                    {"source_url": internal_url, "version": "2026.2"},
+                ),
+                (
+                    "asthma.txt",
+                    b"# Asthma\nReview inhaler technique.\n",
+                    {"source_url": NICE_URL, "version": "2026.1"},
+                ),
+            ])
+            with open(os.path.join(directory, "diabetes.txt"), "ab") as handle:
+                handle.write(b"Edited after review.\n")
+            entries = read_bulk_manifest(manifest)
+            progress = []
+
+            report = bulk_ingest_guidelines(
+                self.store,
+                entries,
+                self.embedder,
+                "clinical-reviewer",
+                workers=2,
+                batch_documents=3,
+                progress=progress.append,
+            )
+            rerun = bulk_ingest_guidelines(
+                self.store, entries, self.embedder, "clinical-reviewer", workers=1
+            )
+
+        self.assertEqual("partial", report["status"])
+        self.assertEqual(
+            ["activated", "failed", "activated", "activated"],
+            [item["status"] for item in report["documents"]],
+        )
+        self.assertIn("sha256", report["documents"][1]["reason"])
+        self.assertEqual(3, report["activated"])
+        self.assertEqual([3, 4], [item["documents_processed"] for item in progress])
+        self.assertEqual(2, len(self.embedder.calls))
+        documents = {
+            item["version"]: item
+            for item in self.store.list_documents()
+            if item["source_url"] == internal_url
+        }
+        self.assertEqual("superseded", documents["2026.1"]["effective_status"])
+        self.assertEqual("active", documents["2026.2"]["effective_status"])
+        self.assertEqual("approved", documents["2026.2"]["review_status"])
+        self.assertEqual("clinical-reviewer", documents["2026.2"]["reviewed_by"])
+        self.assertEqual(
+            ["already_ingested", "failed", "already_ingested", "already_ingested"],
+            [item["status"] for item in rerun["documents"]],
+        )
+        self.assertEqual(2, len(self.embedder.calls))
+
+    def test_bulk_manifest_rejects_paths_outside_documents_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manifest = self._write_manifest(directory, [
+                ("a.txt", b"# A\nText.\n", {"source_url": SOURCE_URL, "version": "1"}),
+            ])
+            with open(manifest, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps({
+                    "path": "../outside.txt",
+                    "sha256": "0" * 64,
+                    "source_url": SOURCE_URL,
+                    "title": "Guideline",
+                    "publisher": "WHO",
+                    "publication_date": "2026-01-01",
+                    "version": "2",
+                    "effective_from": "2026-01-02",
+                }) + "\n")
+
+            with self.assertRaisesRegex(GuidelineIngestionError, "line 2.*leaves"):
+                read_bulk_manifest(manifest)
+
     def test_auto_ingest_rejects_candidate_without_publication_date(self):
         self._require_store()
         download_calls = []
@@ -738,6 +1447,545 @@ class CuratedGuidelineTests(unittest.TestCase):
             )
         )
 
+    def test_corpus_snapshot_is_reused_until_a_write_bumps_generation(self):
+        self._require_store()
+        document = self.store.add_pending_document(
+            _downloaded(),
+            _metadata(effective_until="2026-01-05"),
+            self.embedder.model,
+        )
+        self.store.approve(
+            document["document_id"],
+            "reviewer",
+            document["content_hash"],
+            self.embedder,
+        )
+
+        before_expiry = self.store.search(
+            [1.0, 0.0], self.embedder.model, 3, 0.0, date(2026, 1, 4)
+        )
+        snapshot = self.store._corpus_snapshot(self.embedder.model)
+        after_expiry = self.store.search(
+            [1.0, 0.0], self.embedder.model, 3, 0.0, date(2026, 1, 10)
+        )
+
+        self.assertTrue(before_expiry)
+        self.assertEqual([], after_expiry)
+        self.assertIs(snapshot, self.store._corpus_snapshot(self.embedder.model))
+        self.assertTrue(
+            self.store.has_effective_documents(
+                self.embedder.model, date(2026, 1, 4)
+            )
+        )
+
+        self.store.withdraw(document["document_id"], "reviewer")
+
+        refreshed = self.store._corpus_snapshot(self.embedder.model)
+        self.assertGreater(refreshed.generation, snapshot.generation)
+        self.assertEqual((), refreshed.section_ids)
+        self.assertEqual(
+            [],
+            self.store.search(
+                [1.0, 0.0], self.embedder.model, 3, 0.0, date(2026, 1, 4)
+            ),
+        )
+
+    def test_index_bundle_is_published_and_mapped_by_other_workers(self):
+        self._require_store()
+        with tempfile.TemporaryDirectory() as directory:
+            writer = CuratedGuidelineStore(
+                self.postgres_uri, index_directory=directory
+            )
+            reader = CuratedGuidelineStore(
+                self.postgres_uri, index_directory=directory
+            )
+            try:
+                document = self._add_pending()
+                writer.approve(
+                    document["document_id"],
+                    "reviewer",
+                    document["content_hash"],
+                    self.embedder,
+                )
+                published = [
+                    name
+                    for _root, _directories, files in os.walk(directory)
+                    for name in files
+                ]
+                snapshot = reader._corpus_snapshot(self.embedder.model)
+                expected = self.store.search(
+                    [1.0, 0.2], self.embedder.model, 3, 0.0, date(2026, 1, 10)
+                )
+                mapped = reader.search(
+                    [1.0, 0.2], self.embedder.model, 3, 0.0, date(2026, 1, 10)
+                )
+            finally:
+                writer.close()
+                reader.close()
+
+        self.assertIn("manifest.json", published)
+        self.assertTrue(
+            all(
+                isinstance(block.vectors, np.memmap)
+                for block in snapshot.matrix.blocks().values()
+            )
+        )
+        self.assertTrue(expected)
+        self.assertEqual(
+            [(item["section_id"], item["score"]) for item in expected],
+            [(item["section_id"], item["score"]) for item in mapped],
+        )
+
+    def test_hybrid_retrieval_gates_lexical_winners_and_survives_outage(self):
+        self._require_store()
+        embedder = _QueryOutageEmbedder()
+        document = self.store.add_pending_document(
+            _downloaded(
+                b"<h1>Hypertension</h1><p>Start amlodipine at a low dose.</p>"
+                b"<h2>Diabetes</h2><p>Metformin is first line for glucose.</p>"
+            ),
+            _metadata(),
+            embedder.model,
+        )
+        self.store.approve(
+            document["document_id"],
+            "reviewer",
+            document["content_hash"],
+            embedder,
+        )
+        options = {
+            "postgres_uri": self.postgres_uri,
+            "endpoint": "unused",
+            "api_key": "unused",
+            "embedding_model": embedder.model,
+            "top_k": 1,
+            "min_score": 0.9,
+            "embedder": embedder,
+            "on_date": date(2026, 1, 10),
+            "store": self.store,
+        }
+
+        vector_only = retrieve_curated_guidelines("metformin first line", **options)
+        hybrid = retrieve_curated_guidelines(
+            "metformin first line", retrieval_mode="hybrid", **options
+        )
+        embedder.available = False
+        fallback = retrieve_curated_guidelines(
+            "metformin first line", retrieval_mode="hybrid", **options
+        )
+        unavailable = retrieve_curated_guidelines("metformin first line", **options)
+
+        # The BM25 winner's exact cosine is about 0.71, below min_score 0.9.
+        self.assertEqual("not_found", vector_only["status"])
+        self.assertEqual("not_found", hybrid["status"])
+        self.assertEqual("success", fallback["status"])
+        self.assertIn("Metformin", fallback["evidence"][0]["content"])
+        self.assertGreater(fallback["evidence"][0]["lexical_score"], 0)
+        self.assertIsNone(fallback["evidence"][0]["score"])
+        self.assertEqual("unavailable", unavailable["status"])
+
+    def test_hybrid_search_drops_lexical_winners_below_min_score(self):
+        self._require_store()
+        document = self.store.add_pending_document(
+            _downloaded(
+                b"<h1>Blood pressure</h1><p>Start amlodipine at a low dose.</p>"
+                b"<h2>Diabetes</h2><p>Metformin is first line for glucose.</p>"
+            ),
+            replace(_metadata(), title="WHO Guideline"),
+            self.embedder.model,
+        )
+        self.store.approve(
+            document["document_id"],
+            "reviewer",
+            document["content_hash"],
+            self.embedder,
+        )
+
+        def search(min_score):
+            return self.store.search(
+                [0.0, 1.0],
+                self.embedder.model,
+                1,
+                min_score,
+                date(2026, 1, 10),
+                lexical_query="amlodipine",
+            )
+
+        # BM25 ranks the amlodipine chunk first; its cosine is about 0.71.
+        kept, gated = search(0.0), search(0.9)
+
+        self.assertIn("amlodipine", kept[0]["content"])
+        self.assertAlmostEqual(0.7071, kept[0]["score"], places=3)
+        self.assertEqual(1, len(gated))
+        self.assertIn("Metformin", gated[0]["content"])
+        self.assertAlmostEqual(1.0, gated[0]["score"])
+
+    def test_lexical_postings_are_backfilled_for_existing_sections(self):
+        self._require_store()
+        document = self._add_pending()
+        self.store.approve(
+            document["document_id"],
+            "reviewer",
+            document["content_hash"],
+            self.embedder,
+        )
+        count_sql = "SELECT COUNT(*) AS count FROM guideline_lexical_postings"
+        with self.store.pool.connection() as connection:
+            indexed = connection.execute(count_sql).fetchone()["count"]
+            connection.execute("DELETE FROM guideline_lexical_postings")
+            connection.execute("UPDATE guideline_sections SET lexical_length = NULL")
+
+        restarted = CuratedGuidelineStore(self.postgres_uri)
+        try:
+            with restarted.pool.connection() as connection:
+                backfilled = connection.execute(count_sql).fetchone()["count"]
+            matches = restarted.search(
+                None,
+                self.embedder.model,
+                3,
+                0.0,
+                date(2026, 1, 10),
+                lexical_query="monitor glucose",
+            )
+        finally:
+            restarted.close()
+
+        self.assertGreater(indexed, 0)
+        self.assertEqual(indexed, backfilled)
+        self.assertIn("Monitor glucose", matches[0]["content"])
+
+    def test_new_version_reuses_embeddings_of_unchanged_sections(self):
+        self._require_store()
+        first = self._add_pending("2026.1", b"Unchanged hypertension advice.")
+        self.store.approve(
+            first["document_id"], "reviewer", first["content_hash"], self.embedder
+        )
+        self.embedder.calls.clear()
+        raw = (
+            b"<h1>Hypertension</h1><p>Unchanged hypertension advice.</p>"
+            b"<h2>Diabetes</h2><p>Monitor glucose every visit.</p>"
+        )
+        second = self.store.add_pending_document(
+            downloaded=_downloaded(raw),
+            metadata=_metadata("2026.2"),
+            embedding_model=self.embedder.model,
+        )
+
+        approved = self.store.approve(
+            second["document_id"], "reviewer", second["content_hash"], self.embedder
+        )
+
+        self.assertEqual(2, approved["section_count"])
+        self.assertEqual(1, len(self.embedder.calls))
+        self.assertEqual(1, len(self.embedder.calls[0]))
+        self.assertIn("Monitor glucose every visit.", self.embedder.calls[0][0])
+
+    def test_parent_token_counts_are_stored_and_used_at_search_time(self):
+        self._require_store()
+        document = self._add_pending()
+        self.store.approve(
+            document["document_id"],
+            "reviewer",
+            document["content_hash"],
+            self.embedder,
+        )
+        count_sql = (
+            "SELECT COUNT(*) AS count FROM guideline_parent_sections "
+            "WHERE token_count IS NULL"
+        )
+        with self.store.pool.connection() as connection:
+            after_activation = connection.execute(count_sql).fetchone()["count"]
+            connection.execute(
+                "UPDATE guideline_parent_sections SET token_count = NULL"
+            )
+
+        restarted = CuratedGuidelineStore(self.postgres_uri)
+        try:
+            with restarted.pool.connection() as connection:
+                after_restart = connection.execute(count_sql).fetchone()["count"]
+            with mock.patch(
+                "src.handlers.curated_guidelines._token_encoder",
+                side_effect=AssertionError("tokenized at query time"),
+            ):
+                matches = restarted.search(
+                    [1.0, 0.0], self.embedder.model, 1, 0.5, date(2026, 1, 10)
+                )
+        finally:
+            restarted.close()
+
+        self.assertEqual(0, after_activation)
+        self.assertEqual(0, after_restart)
+        self.assertEqual("parent", matches[0]["context_mode"])
+
+    def test_query_embedding_cache_skips_provider_for_repeated_questions(self):
+        self._require_store()
+        _reset_query_cache_for_tests()
+        self.addCleanup(_reset_query_cache_for_tests)
+        with self.store.pool.connection() as connection:
+            connection.execute("DELETE FROM guideline_query_embeddings")
+        now = [1_000.0]
+        cached = CachingEmbedder(
+            self.embedder,
+            self.store.pool,
+            ttl_seconds=60,
+            max_entries=2,
+            sweep_interval_seconds=0,
+            clock=lambda: now[0],
+        )
+
+        first = cached.embed_query("Hướng dẫn tăng huyết áp")
+        repeated = cached.embed_query("  Hướng dẫn   tăng huyết áp ")
+        _reset_query_cache_for_tests()
+        from_table = cached.embed_query("Hướng dẫn tăng huyết áp")
+        provider_calls = len(self.embedder.calls)
+        cached.embed_query("patient_id P-123 có tăng huyết áp không?")
+        cached.embed_query("patient_id P-123 có tăng huyết áp không?")
+        sensitive_calls = len(self.embedder.calls) - provider_calls
+        for question in ("diabetes care", "obesity care"):
+            now[0] += 1
+            cached.embed_query(question)
+        with self.store.pool.connection() as connection:
+            unswept = connection.execute(
+                "SELECT COUNT(*) AS count FROM guideline_query_embeddings"
+            ).fetchone()["count"]
+        cached.sweep()
+        with self.store.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT * FROM guideline_query_embeddings"
+            ).fetchall()
+        now[0] += 61
+        _reset_query_cache_for_tests()
+        calls_before_expiry = len(self.embedder.calls)
+        cached.embed_query("Hướng dẫn tăng huyết áp")
+        expired = cached.sweep()
+
+        self.assertEqual([1.0, 0.0], first)
+        self.assertEqual(first, repeated)
+        self.assertEqual(first, from_table)
+        self.assertEqual(1, provider_calls)
+        self.assertEqual(2, sensitive_calls)
+        self.assertEqual(3, unswept)
+        self.assertEqual(2, len(rows))
+        self.assertEqual(
+            {"embedding_model", "query_hash", "embedding", "created_at", "expires_at"},
+            set(rows[0]),
+        )
+        self.assertEqual(calls_before_expiry + 1, len(self.embedder.calls))
+        self.assertEqual(2, expired)
+
+    def test_query_embedding_from_table_keeps_the_rows_expiry(self):
+        self._require_store()
+        _reset_query_cache_for_tests()
+        self.addCleanup(_reset_query_cache_for_tests)
+        with self.store.pool.connection() as connection:
+            connection.execute("DELETE FROM guideline_query_embeddings")
+        now = [1_000.0]
+        cached = CachingEmbedder(
+            self.embedder,
+            self.store.pool,
+            ttl_seconds=60,
+            sweep_interval_seconds=0,
+            clock=lambda: now[0],
+        )
+
+        cached.embed_query("Hướng dẫn tăng huyết áp")
+        _reset_query_cache_for_tests()
+        now[0] += 50
+        cached.embed_query("Hướng dẫn tăng huyết áp")
+        calls_from_table = len(self.embedder.calls)
+        now[0] += 20
+        cached.embed_query("Hướng dẫn tăng huyết áp")
+
+        self.assertEqual(1, calls_from_table)
+        self.assertEqual(2, len(self.embedder.calls))
+
+    def test_search_cache_is_shared_across_processes_through_postgres(self):
+        self._require_store()
+        with self.store.pool.connection() as connection:
+            connection.execute("DELETE FROM medical_search_results")
+        now = [1_000.0]
+
+        def process_cache():
+            return SharedSearchResultCache(
+                self.store.pool,
+                max_entries=2,
+                sweep_interval_seconds=0,
+                clock=lambda: now[0],
+            )
+
+        writer, reader = process_cache(), process_cache()
+        result = {"status": "success", "evidence": [{"id": "S1", "score": 0.9}]}
+        writer.put("hypertension", result, 60)
+        shared = reader.get("hypertension")
+        shared["evidence"].clear()
+        repeated = reader.get("hypertension")
+        for key in ("diabetes", "obesity"):
+            now[0] += 1
+            writer.put(key, {"status": "not_found"}, 5)
+        now[0] += 10
+        swept = writer.sweep()
+        with self.store.pool.connection() as connection:
+            keys = [
+                row["cache_key"]
+                for row in connection.execute(
+                    "SELECT cache_key FROM medical_search_results"
+                ).fetchall()
+            ]
+        expired = process_cache().get("diabetes")
+
+        self.assertEqual(result, repeated)
+        self.assertEqual(2, swept)
+        self.assertEqual(["hypertension"], keys)
+        self.assertIsNone(expired)
+        self.assertEqual(
+            {"hits": 1, "misses": 0, "expired": 0, "errors": 0},
+            {key: value for key, value in reader.stats().items() if key != "memory"},
+        )
+        self.assertEqual(1, reader.stats()["memory"]["hits"])
+
+    def test_provider_guard_limits_are_shared_across_processes(self):
+        self._require_store()
+        with self.store.pool.connection() as connection:
+            connection.execute("DELETE FROM medical_search_rate_limits")
+            connection.execute("DELETE FROM medical_search_budget")
+            connection.execute(
+                "UPDATE medical_search_circuit "
+                "SET failures = 0, open_until = NULL WHERE id = 1"
+            )
+        now = [1_000.0]
+        first, second = (
+            PostgresProviderGuard(self.store.pool, clock=lambda: now[0])
+            for _ in range(2)
+        )
+        limits = {
+            "utc_day": "2026-01-01",
+            "rate_limit_per_minute": 2,
+            "daily_budget": 3,
+            "circuit_failure_threshold": 2,
+        }
+
+        claims = [
+            first.claim_call("doctor-a", **limits),
+            second.claim_call("doctor-a", **limits),
+            second.claim_call("doctor-a", **limits),
+        ]
+        now[0] += 30
+        refilled = first.claim_call("doctor-a", **limits)
+        over_budget = second.claim_call("doctor-b", **limits)
+        retry = first.claim_retry("2026-01-01", 3)
+        next_day = second.claim_call("doctor-b", **{
+            **limits, "utc_day": "2026-01-02"
+        })
+        first.record_failure(threshold=2, cooldown_seconds=60)
+        second.record_failure(threshold=2, cooldown_seconds=60)
+        tripped = first.claim_call("doctor-c", **{
+            **limits, "utc_day": "2026-01-03"
+        })
+        second.record_success()
+        recovered = first.claim_call("doctor-c", **{
+            **limits, "utc_day": "2026-01-03"
+        })
+        with self.store.pool.connection() as connection:
+            budget = {
+                str(row["utc_day"]): row["used"]
+                for row in connection.execute(
+                    "SELECT utc_day, used FROM medical_search_budget"
+                ).fetchall()
+            }
+
+        self.assertEqual([None, None, "rate_limited"], claims)
+        self.assertIsNone(refilled)
+        self.assertEqual("budget_exhausted", over_budget)
+        self.assertFalse(retry)
+        self.assertIsNone(next_day)
+        self.assertEqual("circuit_open", tripped)
+        self.assertIsNone(recovered)
+        self.assertEqual(
+            {"2026-01-01": 3, "2026-01-02": 1, "2026-01-03": 1}, budget
+        )
+
+    def test_spooled_download_is_streamed_into_postgres_unchanged(self):
+        self._require_store()
+        raw = b"<h1>Hypertension</h1><p>Tab\there \\ back</p>" + bytes(range(256))
+        body = tempfile.SpooledTemporaryFile(max_size=64)
+        body.write(raw)
+        downloaded = DownloadedDocument(
+            source_url=SOURCE_URL,
+            final_url=SOURCE_URL,
+            content_type="text/html",
+            body=body,
+            content_hash=hashlib.sha256(raw).hexdigest(),
+            size=len(raw),
+        )
+
+        document = self.store.add_pending_document(
+            downloaded=downloaded,
+            metadata=_metadata("2026.1\tspooled"),
+            embedding_model=self.embedder.model,
+        )
+        with self.store.pool.connection() as connection:
+            stored = connection.execute(
+                "SELECT content FROM guideline_document_blobs WHERE document_id = %s",
+                (document["document_id"],),
+            ).fetchone()["content"]
+        downloaded.close()
+
+        self.assertEqual(raw, stored)
+        self.assertEqual(hashlib.sha256(raw).hexdigest(), document["content_hash"])
+        self.assertEqual("2026.1\tspooled", document["version"])
+        self.assertNotIn("raw_content", document)
+
+    def test_startup_moves_inline_raw_content_and_stores_counts(self):
+        pending = self._add_pending(version="2026.1")
+        approved = self.store.approve(
+            pending["document_id"],
+            reviewer="clinical-reviewer",
+            expected_content_hash=pending["content_hash"],
+            embedder=self.embedder,
+        )
+        legacy = self._add_pending(version="2026.2", content=b"version two")
+        with self.store.pool.connection() as connection:
+            connection.execute(
+                "ALTER TABLE guideline_documents ADD COLUMN raw_content BYTEA"
+            )
+            connection.execute(
+                """
+                UPDATE guideline_documents d
+                SET raw_content = b.content, section_count = NULL,
+                    parent_section_count = NULL
+                FROM guideline_document_blobs b
+                WHERE b.document_id = d.document_id
+                """
+            )
+            connection.execute(
+                "DELETE FROM guideline_document_blobs WHERE document_id = %s",
+                (legacy["document_id"],),
+            )
+        self.store.close()
+
+        self.store = CuratedGuidelineStore(self.postgres_uri)
+
+        with self.store.pool.connection() as connection:
+            column = connection.execute(
+                """
+                SELECT 1 FROM pg_attribute
+                WHERE attrelid = 'guideline_documents'::regclass
+                  AND attname = 'raw_content' AND NOT attisdropped
+                """
+            ).fetchone()
+        self.assertIsNone(column)
+        bundle = self.store.get_review_bundle(legacy["document_id"])
+        self.assertIn("version two", bundle["sections"][0]["content"])
+        document = self.store.get_document(approved["document_id"])
+        self.assertEqual(approved["section_count"], document["section_count"])
+        self.assertEqual(
+            approved["parent_section_count"], document["parent_section_count"]
+        )
+        self.assertGreater(document["section_count"], 0)
+        self.assertEqual(0, self.store.get_document(legacy["document_id"])[
+            "section_count"
+        ])
+
     def test_same_url_and_version_are_immutable(self):
         self._add_pending()
 
@@ -0,0 +1,84 @@
+"""Tests for BM25 scoring and rank fusion over curated guideline chunks."""
+import unittest
+
+from src.handlers.guideline_lexical_index import (
+    MAX_QUERY_TERMS,
+    bm25_ranking,
+    first_per_group,
+    lexical_terms,
+    query_terms,
+    reciprocal_rank_fusion,
+    term_frequencies,
+)
+
+
+def _rank(corpus, question):
+    terms = query_terms(question)
+    postings = []
+    frequencies = {}
+    lengths = {}
+    for section_id, text in corpus.items():
+        counts, lengths[section_id] = term_frequencies(text)
+        for term in terms:
+            if term in counts:
+                postings.append((term, section_id, counts[term], lengths[section_id]))
+                frequencies[term] = frequencies.get(term, 0) + 1
+    return bm25_ranking(
+        terms,
+        postings,
+        frequencies,
+        len(corpus),
+        sum(lengths.values()) / len(lengths),
+    )
+
+
+class GuidelineLexicalIndexTests(unittest.TestCase):
+    def test_terms_are_case_folded_and_keep_vietnamese_words(self):
+        self.assertEqual(
+            ["tăng", "huyết", "áp", "metformin", "500", "mg", "5"],
+            lexical_terms("Tăng HUYẾT áp: Metformin 500 mg x 5"),
+        )
+        self.assertEqual(["aspirin"], query_terms("aspirin Aspirin ASPIRIN"))
+        self.assertEqual(
+            MAX_QUERY_TERMS,
+            len(query_terms(" ".join(f"term{index}" for index in range(50)))),
+        )
+
+    def test_rare_exact_term_outranks_common_words(self):
+        corpus = {
+            "a": "Blood pressure treatment with lifestyle changes.",
+            "b": "Blood pressure treatment with amlodipine.",
+            "c": "Blood pressure monitoring at home.",
+        }
+
+        ranking = _rank(corpus, "amlodipine blood pressure")
+
+        self.assertEqual("b", ranking[0][0])
+        self.assertEqual(1.0, ranking[0][2])
+        self.assertEqual({"a", "b", "c"}, {item[0] for item in ranking})
+
+    def test_stopwords_cannot_carry_lexical_coverage(self):
+        corpus = {
+            "a": "Liều của metformin và insulin là cho người lớn.",
+            "b": "Theo dõi huyết áp tại nhà.",
+        }
+
+        self.assertEqual(["amlodipine"], query_terms("amlodipine của và là cho"))
+        self.assertEqual([], _rank(corpus, "amlodipine của và là cho"))
+        self.assertEqual([], query_terms("của và là cho the"))
+
+    def test_reciprocal_rank_fusion_rewards_agreement(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "a"]])
+
+        self.assertEqual(["b", "a", "d", "c"], [item[0] for item in fused])
+        self.assertAlmostEqual(1 / 62 + 1 / 61, fused[0][1])
+
+    def test_first_per_group_keeps_one_section_per_parent(self):
+        groups = {"a": "p1", "b": "p1", "c": "p2"}
+
+        self.assertEqual(["a", "c"], first_per_group(["a", "b", "c"], groups, 5))
+        self.assertEqual(["a"], first_per_group(["a", "b", "c"], groups, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+"""Tests for vectorized curated-guideline candidate scoring."""
+import os
+import random
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+
+from src.handlers.guideline_vector_index import (
+    RETAINED_INDEX_BUNDLES,
+    VECTOR_PRECISIONS,
+    CorpusSnapshot,
+    EmbeddingMatrix,
+    cosine_similarity,
+    first_pass_recall,
+    read_index_bundle,
+    select_top_matches,
+    write_index_bundle,
+)
+
+
+def _reference_selection(vectors, query, min_score, limit, groups, ties):
+    """The original per-row Python ranking used before vectorization."""
+    ranked = []
+    for index, vector in enumerate(vectors):
+        score = cosine_similarity(query, vector)
+        if score >= min_score:
+            ranked.append((index, score))
+    ranked.sort(key=lambda item: (-item[1], ties[item[0]]))
+    selected = []
+    seen = set()
+    for index, score in ranked:
+        if groups[index] in seen:
+            continue
+        selected.append((index, score))
+        seen.add(groups[index])
+        if len(selected) >= limit:
+            break
+    return selected
+
+
+def _select(
+    vectors, query, min_score, limit, groups, ties, precision="float32"
+):
+    calls = []
+
+    def exact(indices):
+        calls.append(list(indices))
+        return [cosine_similarity(query, vectors[index]) for index in indices]
+
+    selected = select_top_matches(
+        EmbeddingMatrix(vectors, precision=precision),
+        query,
+        min_score=min_score,
+        limit=limit,
+        group_keys=groups,
+        tie_keys=ties,
+        exact_scores=exact,
+    )
+    return selected, calls
+
+
+class GuidelineVectorIndexTests(unittest.TestCase):
+    def test_matches_reference_ranking_on_random_corpus(self):
+        generator = random.Random(7)
+        vectors = [
+            [generator.gauss(0, 1) for _dimension in range(48)]
+            for _row in range(400)
+        ]
+        groups = [f"parent-{index // 3}" for index in range(len(vectors))]
+        ties = [f"section-{index:04d}" for index in range(len(vectors))]
+        for _query in range(20):
+            query = [generator.gauss(0, 1) for _dimension in range(48)]
+            for min_score, limit in ((-1.0, 10), (0.0, 3), (0.2, 1)):
+                selected, _calls = _select(
+                    vectors, query, min_score, limit, groups, ties
+                )
+                self.assertEqual(
+                    _reference_selection(
+                        vectors, query, min_score, limit, groups, ties
+                    ),
+                    selected,
+                )
+
+    def test_exact_ties_are_broken_by_section_id(self):
+        vectors = [[1.0, 0.0]] * 50 + [[0.0, 1.0]] * 5
+        ties = [f"s-{index:03d}" for index in reversed(range(len(vectors)))]
+        groups = list(ties)
+
+        selected, _calls = _select(vectors, [1.0, 0.0], 0.5, 10, groups, ties)
+
+        self.assertEqual(
+            _reference_selection(vectors, [1.0, 0.0], 0.5, 10, groups, ties),
+            selected,
+        )
+        self.assertEqual(49, selected[0][0])
+
+    def test_invalid_and_mismatched_rows_keep_sentinel_score(self):
+        vectors = [
+            [1.0, 0.0],
+            [float("nan"), 1.0],
+            [0.0, 0.0],
+            [1.0, 0.0, 0.0],
+            [],
+            [0.6, 0.8],
+        ]
+        ties = [f"s-{index}" for index in range(len(vectors))]
+
+        for query in ([1.0, 0.0], [float("inf"), 0.0], [0.0, 0.0], [1.0, 0.0, 0.0]):
+            selected, _calls = _select(vectors, query, -1.0, 10, ties, ties)
+            self.assertEqual(
+                _reference_selection(vectors, query, -1.0, 10, ties, ties),
+                selected,
+            )
+
+    def test_quantized_precisions_keep_exact_ranking(self):
+        generator = random.Random(13)
+        vectors = [
+            [generator.gauss(0, 1) for _dimension in range(64)]
+            for _row in range(500)
+        ] + [[float("nan")] * 64, [0.0] * 64]
+        groups = [f"parent-{index // 2}" for index in range(len(vectors))]
+        ties = [f"s-{index:04d}" for index in range(len(vectors))]
+        queries = [
+            [generator.gauss(0, 1) for _dimension in range(64)]
+            for _query in range(10)
+        ]
+
+        for precision in VECTOR_PRECISIONS:
+            for query in queries:
+                selected, _calls = _select(
+                    vectors, query, 0.0, 5, groups, ties, precision
+                )
+                self.assertEqual(
+                    _reference_selection(vectors, query, 0.0, 5, groups, ties),
+                    selected,
+                )
+
+    def test_quantized_storage_is_smaller_with_high_first_pass_recall(self):
+        generator = random.Random(17)
+        vectors = [
+            [generator.gauss(0, 1) for _dimension in range(96)]
+            for _row in range(800)
+        ]
+        queries = [
+            [value + generator.gauss(0, 0.3) for value in vectors[index]]
+            for index in range(0, 800, 40)
+        ]
+        matrices = {
+            precision: EmbeddingMatrix(vectors, precision=precision)
+            for precision in VECTOR_PRECISIONS
+        }
+
+        self.assertEqual(
+            matrices["float32"].nbytes, 2 * matrices["float16"].nbytes
+        )
+        self.assertLess(matrices["int8"].nbytes * 3, matrices["float32"].nbytes)
+        self.assertEqual(
+            1.0, first_pass_recall(matrices["float32"], vectors, queries, 10)
+        )
+        self.assertGreaterEqual(
+            first_pass_recall(matrices["float16"], vectors, queries, 10), 0.95
+        )
+        self.assertGreaterEqual(
+            first_pass_recall(matrices["int8"], vectors, queries, 10), 0.9
+        )
+
+    def test_eligible_rows_mask_matches_reference_on_subset(self):
+        generator = random.Random(5)
+        vectors = [
+            [generator.gauss(0, 1) for _dimension in range(16)]
+            for _row in range(300)
+        ]
+        ties = [f"s-{index:04d}" for index in range(len(vectors))]
+        eligible = np.asarray([index % 3 != 0 for index in range(len(vectors))])
+        query = vectors[0]
+
+        selected = select_top_matches(
+            EmbeddingMatrix(vectors),
+            query,
+            min_score=-1.0,
+            limit=5,
+            group_keys=ties,
+            tie_keys=ties,
+            exact_scores=lambda indices: [
+                cosine_similarity(query, vectors[index]) for index in indices
+            ],
+            eligible_rows=eligible,
+        )
+        kept = [index for index in range(len(vectors)) if eligible[index]]
+        reference = _reference_selection(
+            [vectors[index] for index in kept],
+            query,
+            -1.0,
+            5,
+            [ties[index] for index in kept],
+            [ties[index] for index in kept],
+        )
+
+        self.assertEqual(
+            [(kept[index], score) for index, score in reference], selected
+        )
+
+    def test_only_a_bounded_candidate_window_is_rescored(self):
+        generator = random.Random(11)
+        vectors = [
+            [generator.gauss(0, 1) for _dimension in range(32)]
+            for _row in range(2000)
+        ]
+        ties = [f"s-{index:05d}" for index in range(len(vectors))]
+
+        selected, calls = _select(vectors, vectors[0], 0.0, 3, ties, ties)
+
+        self.assertEqual(0, selected[0][0])
+        self.assertLess(sum(len(call) for call in calls), 200)
+
+    def test_index_bundle_round_trips_and_prunes_old_generations(self):
+        vectors = [[1.0, 0.0], [0.6, 0.8], [0.0, 0.0], [1.0, 0.0, 0.0]]
+
+        def snapshot(generation):
+            return CorpusSnapshot(
+                generation=generation,
+                section_ids=("a", "b", "c", "d"),
+                group_keys=("p", "p", "c", "d"),
+                row_documents=np.asarray([0, 0, 1, 1]),
+                effective_from=np.asarray([date(2026, 1, 1).toordinal()] * 2),
+                effective_until=np.asarray(
+                    [date(2026, 1, 5).toordinal(), date.max.toordinal()]
+                ),
+                matrix=EmbeddingMatrix(vectors, precision="int8"),
+            )
+
+        with tempfile.TemporaryDirectory() as directory:
+            for generation in range(1, RETAINED_INDEX_BUNDLES + 3):
+                write_index_bundle(directory, snapshot(generation))
+            latest = RETAINED_INDEX_BUNDLES + 2
+            loaded = read_index_bundle(directory, latest)
+            stale = read_index_bundle(directory, 1)
+            remaining = len(os.listdir(directory))
+            query = [0.8, 0.6]
+            original = snapshot(latest).matrix.score_bounds(query)
+            mapped = loaded.matrix.score_bounds(query)
+
+        self.assertIsNone(stale)
+        self.assertEqual(RETAINED_INDEX_BUNDLES, remaining)
+        self.assertEqual(("a", "b", "c", "d"), loaded.section_ids)
+        self.assertEqual(
+            [True, True, True, True],
+            loaded.effective_rows(date(2026, 1, 4)).tolist(),
+        )
+        self.assertEqual(
+            [False, False, True, True],
+            loaded.effective_rows(date(2026, 1, 10)).tolist(),
+        )
+        np.testing.assert_array_equal(original[0], mapped[0])
+        np.testing.assert_array_equal(original[1], mapped[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Tests for the cached public-address check used before outbound requests."""
+import socket
+import unittest
+
+from src.helpers.host_resolution import (
+    HostResolutionCache,
+    host_has_only_public_addresses,
+)
+
+
+def _record(address):
+    return (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, 443))
+
+
+class HostResolutionCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.now = [100.0]
+        self.answers = {
+            "www.who.int": [_record("93.184.216.34")],
+            "mixed.example": [_record("93.184.216.34"), _record("10.0.0.5")],
+        }
+        self.lookups = []
+
+    def _resolver(self, host, port, type):  # pylint: disable=redefined-builtin
+        self.assertEqual((443, socket.SOCK_STREAM), (port, type))
+        self.lookups.append(host)
+        if host not in self.answers:
+            raise socket.gaierror("unknown host")
+        return self.answers[host]
+
+    def _cache(self, **kwargs):
+        return HostResolutionCache(
+            resolver=self._resolver,
+            ttl_seconds=60,
+            negative_ttl_seconds=5,
+            clock=lambda: self.now[0],
+            **kwargs,
+        )
+
+    def test_positive_and_negative_answers_expire_on_their_own_ttl(self):
+        cache = self._cache()
+
+        public = [cache.has_only_public_addresses("WWW.WHO.INT") for _ in range(2)]
+        missing = [cache.has_only_public_addresses("gone.example") for _ in range(2)]
+        self.now[0] += 10
+        cache.has_only_public_addresses("gone.example")
+        cache.has_only_public_addresses("www.who.int")
+        self.now[0] += 60
+        cache.has_only_public_addresses("www.who.int")
+
+        self.assertEqual([True, True], public)
+        self.assertEqual([False, False], missing)
+        self.assertEqual(
+            ["www.who.int", "gone.example", "gone.example", "www.who.int"],
+            self.lookups,
+        )
+        self.assertEqual(
+            {
+                "hits": 2,
+                "misses": 4,
+                "negative_hits": 1,
+                "evictions": 0,
+                "entries": 2,
+            },
+            cache.stats(),
+        )
+
+    def test_cached_addresses_are_rechecked_and_fail_closed(self):
+        cache = self._cache(max_entries=1)
+        self.answers["empty.example"] = []
+        self.answers["broken.example"] = [_record("not-an-address")]
+
+        self.assertFalse(cache.has_only_public_addresses("mixed.example"))
+        self.assertFalse(cache.has_only_public_addresses("mixed.example"))
+        self.assertFalse(cache.has_only_public_addresses("empty.example"))
+        self.assertFalse(cache.has_only_public_addresses("broken.example"))
+        self.assertEqual(1, cache.stats()["hits"])
+        self.assertEqual(2, cache.stats()["evictions"])
+
+    def test_injected_resolver_bypasses_shared_cache(self):
+        for _ in range(2):
+            self.assertTrue(
+                host_has_only_public_addresses("www.who.int", self._resolver)
+            )
+
+        self.assertEqual(["www.who.int", "www.who.int"], self.lookups)
+
+
+if __name__ == "__main__":
+    unittest.main()
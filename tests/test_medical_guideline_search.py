@@ -1,5 +1,7 @@
 """Tests for allowlisted, privacy-safe medical guideline retrieval."""
 import json
+import threading
+import time
 import unittest
 from urllib.error import HTTPError, URLError
 
@@ -10,6 +12,8 @@ from src.handlers.medical_guideline_search import (
     RATE_LIMIT_RESPONSE,
     SEARCH_UNAVAILABLE,
     SENSITIVE_SEARCH_REFUSAL,
+    SearchResultCache,
+    _SEARCH_FLIGHTS,
     _reset_runtime_state_for_tests,
     contains_sensitive_patient_data,
     is_approved_source_url,
@@ -372,6 +376,189 @@ class MedicalGuidelineSearchTests(unittest.TestCase):
         self.assertTrue(second["cache_hit"])
         self.assertEqual(1, len(calls))
 
+    def test_process_cache_expiry_follows_the_callers_clock(self):
+        now = [1_000.0]
+        calls = []
+
+        def opener(_request, timeout):
+            calls.append(timeout)
+            return _FakeResponse({"results": []})
+
+        def search():
+            return search_medical_guidelines(
+                "Hướng dẫn tăng huyết áp",
+                "secret",
+                opener=opener,
+                source_opener=_approved_source_opener,
+                resolver=_public_resolver,
+                cache_ttl_seconds=300,
+                clock=lambda: now[0],
+            )
+
+        search()
+        now[0] += 299
+        cached = search()
+        now[0] += 2
+        search()
+
+        self.assertTrue(cached["cache_hit"])
+        self.assertEqual(2, len(calls))
+
+    def test_result_cache_is_bounded_lru_with_ttl_and_isolated_copies(self):
+        now = [100.0]
+        cache = SearchResultCache(
+            max_entries=2, sweep_interval_seconds=0, clock=lambda: now[0]
+        )
+        result = {"status": "success", "evidence": [{"id": "S1"}]}
+
+        cache.put("a", result, 10)
+        result["evidence"][0]["id"] = "changed"
+        returned = cache.get("a")
+        returned["evidence"].clear()
+        cache.put("b", {"status": "not_found"}, 60)
+        isolated = cache.get("a")
+        cache.put("c", {"status": "not_found"}, 60)
+        evicted = cache.get("b")
+        cache.put("d", {"status": "not_found"}, 0)
+        disabled = cache.get("d")
+        now[0] += 30
+        swept = cache.sweep()
+        survivor = cache.get("c")
+
+        self.assertEqual([{"id": "S1"}], isolated["evidence"])
+        self.assertIsNone(evicted)
+        self.assertIsNone(disabled)
+        self.assertEqual(1, swept)
+        self.assertEqual({"status": "not_found"}, survivor)
+        self.assertEqual(
+            {
+                "hits": 3,
+                "misses": 2,
+                "evictions": 1,
+                "expired": 1,
+                "entries": 1,
+            },
+            cache.stats(),
+        )
+
+    def test_injected_guard_replaces_process_local_limits(self):
+        class _SharedGuard:
+            def __init__(self):
+                self.claims = []
+
+            def claim_call(self, actor_id, **limits):
+                self.claims.append((actor_id, limits["daily_budget"]))
+                return "budget_exhausted"
+
+        guard = _SharedGuard()
+
+        result = search_medical_guidelines(
+            "Hướng dẫn tăng huyết áp",
+            "secret",
+            opener=lambda *_args, **_kwargs: self.fail("guard ignored"),
+            actor_id="doctor-1",
+            daily_budget=7,
+            cache_ttl_seconds=0,
+            guard=guard,
+        )
+
+        self.assertEqual("budget_exhausted", result["status"])
+        self.assertEqual(BUDGET_EXHAUSTED_RESPONSE, result["response"])
+        self.assertEqual([("doctor-1", 7)], guard.claims)
+
+    def test_result_urls_resolve_concurrently_and_are_reused(self):
+        urls = [
+            "https://www.cdc.gov/flu/hcp/clinical-guidance/index.html",
+            "https://www.who.int/publications/i/item/guide",
+            "https://emohbackup.moh.gov.vn/publish/attach/getfile/1",
+        ]
+        body = {"results": [
+            {"title": f"Guide {index}", "url": url, "content": "Content",
+             "score": 0.9}
+            for index, url in enumerate(urls)
+        ]}
+        barrier = threading.Barrier(len(urls), timeout=5)
+        source_calls = []
+
+        def concurrent_source_opener(request, timeout):
+            source_calls.append(request.full_url)
+            barrier.wait()
+            return _approved_source_opener(request, timeout)
+
+        def search(question, source_opener):
+            return search_medical_guidelines(
+                question,
+                "secret",
+                max_results=5,
+                opener=lambda *_args, **_kwargs: _FakeResponse(body),
+                source_opener=source_opener,
+                resolver=_public_resolver,
+                cache_ttl_seconds=0,
+            )
+
+        first = search("Hướng dẫn cúm", concurrent_source_opener)
+        repeated = search(
+            "Hướng dẫn cúm mùa",
+            lambda *_args, **_kwargs: self.fail("HEAD repeated"),
+        )
+
+        self.assertEqual(
+            [urls[2], urls[1], urls[0]],
+            [item["url"] for item in first["evidence"]],
+        )
+        self.assertEqual(
+            [item["url"] for item in first["evidence"]],
+            [item["url"] for item in repeated["evidence"]],
+        )
+        self.assertCountEqual(urls, source_calls)
+
+    def _wait_until(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("condition not reached")
+            time.sleep(0.005)
+
+    def test_identical_concurrent_misses_share_one_provider_call(self):
+        release = threading.Event()
+        calls = []
+        results = []
+        body = {"results": [{
+            "title": "WHO guidance",
+            "url": "https://www.who.int/publications/i/item/guide",
+            "content": "Approved content",
+            "score": 0.9,
+        }]}
+
+        def opener(_request, timeout):
+            calls.append(timeout)
+            release.wait(5)
+            return _FakeResponse(body)
+
+        threads = [
+            threading.Thread(target=lambda question=question: results.append(
+                self._search(question, opener, actor_id=question)
+            ))
+            for question in ("Hướng dẫn sốt xuất huyết", "hướng dẫn SỐT xuất huyết")
+        ]
+        threads[0].start()
+        self._wait_until(lambda: calls)
+        threads[1].start()
+        self._wait_until(lambda: any(
+            flight.waiters
+            for flight in list(
+                _SEARCH_FLIGHTS._flights.values()  # pylint: disable=protected-access
+            )
+        ))
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        results[0]["evidence"].clear()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(["success", "success"], [r["status"] for r in results])
+        self.assertEqual(1, len(results[1]["evidence"]))
+
     def test_rate_limit_blocks_second_uncached_call(self):
         calls = []
 
@@ -0,0 +1,131 @@
+"""Tests for coalescing identical concurrent computations."""
+import threading
+import time
+import unittest
+
+from src.helpers.single_flight import SingleFlight
+
+
+def _wait_for_waiters(flights, key, count):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flights._lock:  # pylint: disable=protected-access
+            flight = flights._flights.get(key)  # pylint: disable=protected-access
+            if flight is not None and flight.waiters >= count:
+                return
+        time.sleep(0.005)
+    raise AssertionError("waiters did not join the flight")
+
+
+class SingleFlightTests(unittest.TestCase):
+    def _run_waiters(self, flights, key, count, outcomes):
+        def wait_for_result():
+            try:
+                outcomes.append(flights.do(key, lambda: self.fail("ran twice")))
+            except Exception as error:  # pylint: disable=broad-except
+                outcomes.append(error)
+
+        threads = [threading.Thread(target=wait_for_result) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        _wait_for_waiters(flights, key, count)
+        return threads
+
+    def test_waiters_share_one_run_and_receive_private_copies(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        outcomes = []
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"evidence": [{"id": "S1"}]}
+
+        leader = threading.Thread(
+            target=lambda: outcomes.append(flights.do("flu", compute))
+        )
+        leader.start()
+        while flights.in_flight() == 0:
+            time.sleep(0.005)
+        threads = self._run_waiters(flights, "flu", 2, outcomes)
+        release.set()
+        for thread in [leader, *threads]:
+            thread.join(5)
+        results = [result for result, _shared in outcomes]
+        results[0]["evidence"].clear()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual([False, True, True], sorted(s for _r, s in outcomes))
+        self.assertEqual(2, sum(bool(result["evidence"]) for result in results))
+        self.assertEqual(0, flights.in_flight())
+
+    def test_error_reaches_every_waiter_and_releases_the_key(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        outcomes = []
+
+        def compute():
+            release.wait(5)
+            raise ValueError("provider failed")
+
+        leader = threading.Thread(
+            target=self._run_leader, args=(flights, compute, outcomes)
+        )
+        leader.start()
+        while flights.in_flight() == 0:
+            time.sleep(0.005)
+        threads = self._run_waiters(flights, "flu", 1, outcomes)
+        release.set()
+        for thread in [leader, *threads]:
+            thread.join(5)
+
+        self.assertEqual(2, len(outcomes))
+        self.assertTrue(all(isinstance(item, ValueError) for item in outcomes))
+        self.assertIsNot(outcomes[0], outcomes[1])
+        self.assertEqual(({"fresh": True}, False), flights.do(
+            "flu", lambda: {"fresh": True}
+        ))
+
+    def test_uncopyable_result_fails_waiters_instead_of_hanging(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        outcomes = []
+
+        class _Uncopyable:
+            def __deepcopy__(self, _memo):
+                raise TypeError("cannot copy")
+
+        result = _Uncopyable()
+
+        def compute():
+            release.wait(5)
+            return result
+
+        leader = threading.Thread(
+            target=lambda: outcomes.append(flights.do("flu", compute))
+        )
+        leader.start()
+        while flights.in_flight() == 0:
+            time.sleep(0.005)
+        threads = self._run_waiters(flights, "flu", 1, outcomes)
+        release.set()
+        for thread in [leader, *threads]:
+            thread.join(5)
+
+        self.assertFalse(any(thread.is_alive() for thread in [leader, *threads]))
+        self.assertIn((result, False), outcomes)
+        self.assertEqual(
+            [TypeError], [type(item) for item in outcomes if item != (result, False)]
+        )
+
+    @staticmethod
+    def _run_leader(flights, compute, outcomes):
+        try:
+            flights.do("flu", compute)
+        except ValueError as error:
+            outcomes.append(error)
+
+
+if __name__ == "__main__":
+    unittest.main()